@@ -0,0 +1,121 @@
+/**
+ * PatternLoader.js
+ *
+ * Loads precomputed binary pattern files (written by the Python
+ * harmonic_tess.patternfile module) without regenerating geometry.
+ * The vertex and index blocks are viewed in place as typed arrays.
+ */
+import SpatialIndex from './SpatialIndex';
+
+const MAGIC = 'HTPT';
+const VERSION = 1;
+const HEADER_SIZE = 32;
+const FLAG_INDEXED = 1;
+
+const SHAPES = ['triangle', 'square', 'hexagon'];
+const TRANSFORMATIONS = ['none', 'rotation', 'reflection'];
+
+class PatternLoader {
+  constructor(config = {}) {
+    this.config = {
+      baseUrl: '/patterns',
+      ...config
+    };
+
+    this.patterns = new Map();
+    this.indexes = new Map();
+  }
+
+  /**
+   * Parse a pattern file held in an ArrayBuffer
+   *
+   * @param {ArrayBuffer} buffer - Raw file contents
+   * @returns {Object} Header fields plus `vertices` (Float32Array, x/y pairs)
+   *   and `faces` (Int32Array of vertex index triples, or null)
+   */
+  parse = (buffer) => {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== MAGIC) {
+      throw new Error('Not a harmonic tessellation pattern file');
+    }
+
+    const version = view.getUint16(4, true);
+    if (version !== VERSION) {
+      throw new Error(`Unsupported pattern file version ${version}`);
+    }
+
+    const flags = view.getUint16(6, true);
+    const vertexCount = view.getUint32(12, true);
+    const faceCount = view.getUint32(16, true);
+    const vertexOffset = view.getUint32(24, true);
+    const indexOffset = view.getUint32(28, true);
+
+    return {
+      complexity: view.getUint8(8),
+      shape: SHAPES[view.getUint8(9)],
+      transformation: TRANSFORMATIONS[view.getUint8(10)],
+      size: view.getFloat32(20, true),
+      vertices: new Float32Array(buffer, vertexOffset || HEADER_SIZE, vertexCount * 2),
+      faces: (flags & FLAG_INDEXED) ? new Int32Array(buffer, indexOffset, faceCount * 3) : null
+    };
+  };
+
+  /**
+   * Fetch and parse the library pattern for a shape and complexity
+   *
+   * @param {Object} params
+   * @param {string} params.shape - Base shape ('triangle', 'square', 'hexagon')
+   * @param {number} params.complexity - Subdivision level (1-8)
+   * @returns {Promise<Object>} Parsed pattern (see parse)
+   */
+  load = async ({ shape = 'triangle', complexity }) => {
+    const key = `${shape}-${complexity}`;
+    if (this.patterns.has(key)) {
+      return this.patterns.get(key);
+    }
+
+    const response = await fetch(`${this.config.baseUrl}/${key}.htp`);
+    if (!response.ok) {
+      throw new Error(`Failed to load pattern ${key}: ${response.status}`);
+    }
+
+    const pattern = this.parse(await response.arrayBuffer());
+    this.patterns.set(key, pattern);
+    return pattern;
+  };
+
+  /**
+   * Fetch the spatial index written next to a library pattern
+   * (`python -m harmonic_tess patterns <dir> --spatial`)
+   *
+   * @param {Object} params - As for load
+   * @returns {Promise<SpatialIndex>} Grid over the pattern for hit-testing
+   */
+  loadIndex = async ({ shape = 'triangle', complexity }) => {
+    const key = `${shape}-${complexity}`;
+    if (this.indexes.has(key)) {
+      return this.indexes.get(key);
+    }
+
+    const pattern = await this.load({ shape, complexity });
+    const response = await fetch(`${this.config.baseUrl}/${key}.htg`);
+    if (!response.ok) {
+      throw new Error(`Failed to load spatial index ${key}: ${response.status}`);
+    }
+
+    const index = new SpatialIndex(await response.arrayBuffer(), pattern);
+    this.indexes.set(key, index);
+    return index;
+  };
+
+  /**
+   * Clean up loaded patterns
+   */
+  cleanup = () => {
+    this.patterns.clear();
+    this.indexes.clear();
+  };
+}
+
+export default PatternLoader;
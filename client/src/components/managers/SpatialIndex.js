@@ -0,0 +1,161 @@
+/**
+ * SpatialIndex.js
+ *
+ * Uniform-grid spatial index over a loaded pattern, read from the grid
+ * files written next to each pattern by the Python harmonic_tess.spatial
+ * module. Lets touch picking look at one grid cell instead of scanning
+ * every vertex. Query points are in pattern coordinates, so a touch on a
+ * rotated or reflected frame is mapped back through the inverse transform
+ * first.
+ */
+const MAGIC = 'HTGR';
+const VERSION = 1;
+const HEADER_SIZE = 40;
+const EPSILON = 1e-6;
+
+class SpatialIndex {
+  /**
+   * Parse a grid file held in an ArrayBuffer
+   *
+   * @param {ArrayBuffer} buffer - Raw grid file contents
+   * @param {Object} pattern - Parsed pattern (see PatternLoader.parse) the grid indexes
+   */
+  constructor(buffer, pattern) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== MAGIC) {
+      throw new Error('Not a harmonic tessellation grid file');
+    }
+
+    const version = view.getUint16(4, true);
+    if (version !== VERSION) {
+      throw new Error(`Unsupported grid file version ${version}`);
+    }
+
+    this.columns = view.getUint32(8, true);
+    this.rows = view.getUint32(12, true);
+    this.originX = view.getFloat32(16, true);
+    this.originY = view.getFloat32(20, true);
+    this.cellSize = view.getFloat32(24, true);
+    const vertexCount = view.getUint32(28, true);
+    const faceEntryCount = view.getUint32(32, true);
+    if (vertexCount * 2 !== pattern.vertices.length) {
+      throw new Error('Grid file does not match the pattern');
+    }
+
+    const cellCount = this.columns * this.rows;
+    let offset = HEADER_SIZE;
+    const block = (count) => {
+      const array = new Uint32Array(buffer, offset, count);
+      offset += count * 4;
+      return array;
+    };
+    this.vertexStarts = block(cellCount + 1);
+    this.vertexEntries = block(vertexCount);
+    this.faceStarts = block(cellCount + 1);
+    this.faceEntries = block(faceEntryCount);
+
+    this.vertices = pattern.vertices;
+    this.faces = pattern.faces;
+  }
+
+  cellX = (x) => Math.floor((x - this.originX) / this.cellSize);
+
+  cellY = (y) => Math.floor((y - this.originY) / this.cellSize);
+
+  /**
+   * Visit the vertices in a block of cells (clipped to the grid)
+   */
+  forEachVertex = (x0, y0, x1, y1, callback) => {
+    const left = Math.max(x0, 0);
+    const right = Math.min(x1, this.columns - 1);
+    for (let y = Math.max(y0, 0); y <= Math.min(y1, this.rows - 1); y++) {
+      const end = this.vertexStarts[y * this.columns + right + 1];
+      for (let i = this.vertexStarts[y * this.columns + left]; i < end; i++) {
+        callback(this.vertexEntries[i]);
+      }
+    }
+  };
+
+  distance = (index, x, y) => Math.hypot(this.vertices[index * 2] - x, this.vertices[index * 2 + 1] - y);
+
+  /**
+   * Find the face containing a point
+   *
+   * @returns {number} Face index, or -1 outside the pattern
+   */
+  faceAt = (x, y) => {
+    const cx = this.cellX(x);
+    const cy = this.cellY(y);
+    if (!this.faces || cx < 0 || cy < 0 || cx >= this.columns || cy >= this.rows) {
+      return -1;
+    }
+
+    const v = this.vertices;
+    const tolerance = EPSILON * this.cellSize * this.cellSize;
+    const side = (a, b) => (v[b * 2] - v[a * 2]) * (y - v[a * 2 + 1]) - (v[b * 2 + 1] - v[a * 2 + 1]) * (x - v[a * 2]);
+    const cell = cy * this.columns + cx;
+    for (let i = this.faceStarts[cell]; i < this.faceStarts[cell + 1]; i++) {
+      const face = this.faceEntries[i];
+      const a = this.faces[face * 3];
+      const b = this.faces[face * 3 + 1];
+      const c = this.faces[face * 3 + 2];
+      const sides = [side(a, b), side(b, c), side(c, a)];
+      const negative = sides.some((d) => d < -tolerance);
+      const positive = sides.some((d) => d > tolerance);
+      if (!(negative && positive)) {
+        return face;
+      }
+    }
+    return -1;
+  };
+
+  /**
+   * Find the vertices within a radius of a point
+   *
+   * @returns {Array<{index: number, distance: number}>} Nearest first
+   */
+  within = (x, y, radius) => {
+    const found = [];
+    this.forEachVertex(this.cellX(x - radius), this.cellY(y - radius), this.cellX(x + radius), this.cellY(y + radius),
+      (index) => {
+        const distance = this.distance(index, x, y);
+        if (distance <= radius) {
+          found.push({ index, distance });
+        }
+      });
+    return found.sort((a, b) => a.distance - b.distance);
+  };
+
+  /**
+   * Find the k vertices nearest a point, growing the searched block of
+   * cells until the k-th distance lies inside it
+   *
+   * @returns {Array<{index: number, distance: number}>} Nearest first
+   */
+  nearest = (x, y, k = 1) => {
+    const count = Math.min(k, this.vertexEntries.length);
+    const cx = this.cellX(x);
+    const cy = this.cellY(y);
+    const px = (x - this.originX) / this.cellSize;
+    const py = (y - this.originY) / this.cellSize;
+
+    for (let ring = 0; ; ) {
+      const found = [];
+      this.forEachVertex(cx - ring, cy - ring, cx + ring, cy + ring,
+        (index) => found.push({ index, distance: this.distance(index, x, y) }));
+      const coversGrid = cx - ring <= 0 && cy - ring <= 0 && cx + ring >= this.columns - 1 && cy + ring >= this.rows - 1;
+      if (found.length >= count || coversGrid) {
+        found.sort((a, b) => a.distance - b.distance);
+        // anything outside the searched block is at least this far away
+        const margin = Math.min(px - (cx - ring), cx + ring + 1 - px, py - (cy - ring), cy + ring + 1 - py) * this.cellSize;
+        if (coversGrid || found[count - 1].distance <= margin) {
+          return found.slice(0, count);
+        }
+      }
+      ring = found.length < count && ring ? ring * 2 : ring + 1;
+    }
+  };
+}
+
+export default SpatialIndex;
@@ -0,0 +1,4 @@
+"""
+harmonic tessellations - shared prompt pipeline helpers
+
+"""
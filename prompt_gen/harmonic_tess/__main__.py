@@ -0,0 +1,3 @@
+from harmonic_tess.cli import main
+
+main()
@@ -0,0 +1,167 @@
+"""
+harmonic tessellations - offline audio rendering
+
+Renders the client's pattern-to-sound mapping (`AudioManager.scheduleNotes`)
+into a PCM buffer instead of one OscillatorNode + GainNode per vertex: every
+vertex gets a pentatonic ratio of 220 Hz by index, a 0.1 s linear attack to a
+gain of 0.1 and an exponential decay to 0.001 at 0.5 s, summed into a master
+gain of 0.5.
+
+All notes of a pattern start together with the same envelope, so vertices on
+the same pitch are just one sine with a larger amplitude.  `frequency_bins`
+collapses them first, and the additive synthesis in `render_notes` costs
+O(distinct pitches x samples) rather than O(vertices x samples).  The result
+can be written as 16-bit WAV or streamed as raw PCM chunks.
+"""
+
+import io
+import os
+import wave
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 44100
+BASE_FREQUENCY = 220.0  # A3
+PENTATONIC_RATIOS = (1.0, 1.125, 1.25, 1.5, 1.667)
+ATTACK = 0.1
+NOTE_DURATION = 0.5
+PEAK_GAIN = 0.1
+FLOOR_GAIN = 0.001
+MASTER_GAIN = 0.5
+BIN_RESOLUTION = 0.01  # Hz
+BINS_PER_BLOCK = 64
+
+
+def note_frequencies(count: int, base=BASE_FREQUENCY, ratios=PENTATONIC_RATIOS) -> np.ndarray:
+    """Frequency of each of ``count`` vertices, cycling through ``ratios`` by index like `mapToFrequency`."""
+    return base * np.asarray(ratios, dtype=np.float64)[np.arange(count) % len(ratios)]
+
+
+def envelope_at(t, attack=ATTACK, duration=NOTE_DURATION, floor=FLOOR_GAIN / PEAK_GAIN) -> np.ndarray:
+    """Envelope level (peak 1) at ``t`` seconds after note start: linear ramp up, exponential ramp down to ``floor``."""
+    t = np.asarray(t, dtype=np.float64)
+    # Web Audio exponentialRampToValueAtTime: v0 * (v1 / v0) ** ((t - t0) / (t1 - t0))
+    level = np.where(t < attack, t / attack, floor ** ((t - attack) / (duration - attack)))
+    return np.where((t < 0) | (t >= duration), 0.0, level)
+
+
+def envelope(sample_rate=SAMPLE_RATE, attack=ATTACK, duration=NOTE_DURATION, floor=FLOOR_GAIN / PEAK_GAIN) -> np.ndarray:
+    """One note's envelope sampled at ``sample_rate``."""
+    t = np.arange(int(round(duration * sample_rate)), dtype=np.float64) / sample_rate
+    return envelope_at(t, attack, duration, floor)
+
+
+def frequency_bins(frequencies, amplitudes=None, resolution=BIN_RESOLUTION) -> tuple:
+    """Merge notes whose frequencies round to the same ``resolution`` bin, summing their amplitudes."""
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    if amplitudes is None:
+        amplitudes = np.full(len(frequencies), PEAK_GAIN)
+    bins, inverse = np.unique(np.round(frequencies / resolution), return_inverse=True)
+    summed = np.bincount(inverse, weights=np.asarray(amplitudes, dtype=np.float64), minlength=len(bins))
+    return bins * resolution, summed
+
+
+def render_notes(frequencies, amplitudes, sample_rate=SAMPLE_RATE, duration=NOTE_DURATION,
+                 attack=ATTACK) -> np.ndarray:
+    """Additive synthesis of simultaneous notes sharing one envelope; returns float32 mono samples."""
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    amplitudes = np.asarray(amplitudes, dtype=np.float64)
+    shape = envelope(sample_rate, attack, duration)
+    t = np.arange(len(shape), dtype=np.float64) / sample_rate
+    mix = np.zeros(len(shape), dtype=np.float64)
+    # blocks keep the (bins x samples) phase matrix bounded when there are many distinct pitches
+    for start in range(0, len(frequencies), BINS_PER_BLOCK):
+        block = slice(start, start + BINS_PER_BLOCK)
+        mix += amplitudes[block] @ np.sin(2.0 * np.pi * np.outer(frequencies[block], t))
+    return (mix * shape).astype(np.float32)
+
+
+def render_pattern(vertices, sample_rate=SAMPLE_RATE, master_gain=MASTER_GAIN, normalize=False) -> np.ndarray:
+    """Render one `scheduleNotes` call for ``vertices`` (any array with one row per vertex).
+
+    Like the browser, the unnormalised sum clips once enough vertices share a
+    pitch; ``normalize`` scales the peak to ``master_gain`` instead.
+    """
+    frequencies, amplitudes = frequency_bins(note_frequencies(len(vertices)))
+    samples = render_notes(frequencies, amplitudes, sample_rate)
+    if normalize:
+        peak = float(np.abs(samples).max(initial=0.0))
+        return samples * np.float32(master_gain / peak) if peak else samples
+    return samples * np.float32(master_gain)
+
+
+def render_events(events, sample_rate=SAMPLE_RATE, master_gain=MASTER_GAIN, total_duration=None) -> np.ndarray:
+    """Mix note events (objects with time, frequency, amplitude and duration) into one buffer.
+
+    Each note keeps the standard envelope shape but is cut off after its own
+    duration, as when a voice is stolen.
+    """
+    events = list(events)
+    if total_duration is None:
+        total_duration = max((event.time + NOTE_DURATION for event in events), default=0.0)
+    mix = np.zeros(int(round(total_duration * sample_rate)), dtype=np.float64)
+    shape = envelope(sample_rate)
+    t = np.arange(len(shape), dtype=np.float64) / sample_rate
+    for event in events:
+        start = int(round(event.time * sample_rate))
+        length = min(int(round(min(event.duration, NOTE_DURATION) * sample_rate)), len(mix) - start)
+        if length <= 0:
+            continue
+        note = event.amplitude * np.sin(2.0 * np.pi * event.frequency * t[:length]) * shape[:length]
+        mix[start:start + length] += note
+    return (mix * master_gain).astype(np.float32)
+
+
+def to_pcm16(samples: np.ndarray) -> np.ndarray:
+    """Clip float samples to [-1, 1] and convert to little-endian 16-bit PCM."""
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).round().astype("<i2")
+
+
+def pcm_chunks(samples: np.ndarray, chunk_frames=4096):
+    """Yield raw 16-bit PCM bytes in chunks of ``chunk_frames`` samples."""
+    pcm = to_pcm16(samples)
+    for start in range(0, len(pcm), chunk_frames):
+        yield pcm[start:start + chunk_frames].tobytes()
+
+
+def wav_bytes(samples: np.ndarray, sample_rate=SAMPLE_RATE) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(to_pcm16(samples).tobytes())
+    return buffer.getvalue()
+
+
+def write_wav(path, samples: np.ndarray, sample_rate=SAMPLE_RATE):
+    """Write mono 16-bit WAV atomically."""
+    path = Path(path)
+    tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(wav_bytes(samples, sample_rate))
+    tmp_path.replace(path)
+
+
+def main(argv=None):
+    import argparse
+
+    from harmonic_tess.tessellation import BASE_SHAPES, generate_pattern, vertex_list
+
+    parser = argparse.ArgumentParser(description="Render the audio for a pattern to a WAV file.")
+    parser.add_argument("output", help="output .wav path")
+    parser.add_argument("--shape", default="triangle", choices=BASE_SHAPES)
+    parser.add_argument("--complexity", type=int, default=3)
+    parser.add_argument("--sample-rate", type=int, default=SAMPLE_RATE)
+    parser.add_argument("--normalize", action="store_true", help="scale the peak to the master gain instead of clipping")
+    args = parser.parse_args(argv)
+
+    vertices = vertex_list(generate_pattern(args.shape, args.complexity))
+    samples = render_pattern(vertices, args.sample_rate, normalize=args.normalize)
+    write_wav(args.output, samples, args.sample_rate)
+    print(f"{args.output}  {len(vertices)} vertices, {len(samples) / args.sample_rate:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+harmonic tessellations - completion backends
+
+The completion client talks to whatever `create_backend` returns; every
+backend exposes the slice of the SDK client the pipeline uses
+(``messages.create`` and ``messages.stream``).
+
+- ``live``:   the Anthropic SDK client.
+- ``record``: the live client, saving every request/response pair to a
+              JSONL cassette.
+- ``replay``: serves responses from the cassette only; an unrecorded request
+              is an error.
+- ``mock``:   like replay, but unrecorded requests get a synthetic response,
+              so orchestration and caching can be load-tested without a
+              cassette.
+
+Replay and mock pace their responses with a fixed ``latency`` (seconds to
+first token) and a ``tokens_per_second`` output rate, and need neither the
+SDK nor network access.  Message Batches are only available on live/record.
+
+The completion client builds its backend from HARMONIC_TESS_BACKEND,
+HARMONIC_TESS_CASSETTE, HARMONIC_TESS_LATENCY, HARMONIC_TESS_TOKENS_PER_SECOND
+and HARMONIC_TESS_MOCK_OUTPUT_TOKENS.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_NAMES = ("live", "record", "replay", "mock")
+BATCH_BACKENDS = ("live", "record")
+DEFAULT_CASSETTE = "cassette.jsonl"
+CHARS_PER_TOKEN = 4
+
+
+def live_client():
+    import anthropic
+
+    try:
+        from data.data import API_KEY
+    except ImportError:
+        API_KEY = None  # fall back to ANTHROPIC_API_KEY in the environment
+    return anthropic.Anthropic(api_key=API_KEY, max_retries=0)
+
+
+def request_key(request: dict) -> str:
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _namespace(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_namespace(item) for item in value]
+    return value
+
+
+def _response_dict(message) -> dict:
+    return {
+        "id": message.id,
+        "model": message.model,
+        "content": [{"type": "text", "text": block.text} for block in message.content if block.type == "text"],
+        "stop_reason": message.stop_reason,
+        "usage": {
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens,
+            "cache_read_input_tokens": getattr(message.usage, "cache_read_input_tokens", None) or 0,
+            "cache_creation_input_tokens": getattr(message.usage, "cache_creation_input_tokens", None) or 0,
+        },
+    }
+
+
+class Cassette:
+    """Request/response pairs keyed by a hash of the full request, stored as JSONL."""
+
+    def __init__(self, path=DEFAULT_CASSETTE):
+        self.path = Path(path)
+        self.responses = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.responses[entry["key"]] = entry["response"]
+
+    def get(self, request: dict):
+        return self.responses.get(request_key(request))
+
+    def save(self, request: dict, response: dict):
+        key = request_key(request)
+        with self._lock:
+            self.responses[key] = response
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "request": request, "response": response}, ensure_ascii=False) + "\n")
+
+
+class _RecordingStream:
+    def __init__(self, stream, on_final):
+        self._stream = stream
+        self._on_final = on_final
+
+    @property
+    def text_stream(self):
+        return self._stream.text_stream
+
+    def get_final_message(self):
+        message = self._stream.get_final_message()
+        self._on_final(message)
+        return message
+
+
+class _RecordingStreamManager:
+    def __init__(self, manager, on_final):
+        self._manager = manager
+        self._on_final = on_final
+
+    def __enter__(self):
+        return _RecordingStream(self._manager.__enter__(), self._on_final)
+
+    def __exit__(self, *exc):
+        return self._manager.__exit__(*exc)
+
+
+class _RecordingMessages:
+    def __init__(self, client, cassette: Cassette):
+        self._client = client
+        self._cassette = cassette
+
+    def create(self, **request):
+        message = self._client.messages.create(**request)
+        self._cassette.save(request, _response_dict(message))
+        return message
+
+    def stream(self, **request):
+        manager = self._client.messages.stream(**request)
+        return _RecordingStreamManager(manager, lambda message: self._cassette.save(request, _response_dict(message)))
+
+
+class RecordingClient:
+    """Pass requests through to ``client`` and save every response to ``cassette``."""
+
+    def __init__(self, client, cassette: Cassette):
+        self.messages = _RecordingMessages(client, cassette)
+        self.messages.batches = client.messages.batches
+
+
+class _ReplayStream:
+    def __init__(self, response: dict, pace):
+        self._response = response
+        self._pace = pace
+
+    @property
+    def text_stream(self):
+        text = "".join(block["text"] for block in self._response["content"])
+        self._pace.first_token()
+        for offset in range(0, len(text), CHARS_PER_TOKEN):
+            self._pace.tokens(1)
+            yield text[offset:offset + CHARS_PER_TOKEN]
+
+    def get_final_message(self):
+        return _namespace(self._response)
+
+
+class _ReplayStreamManager:
+    def __init__(self, response: dict, pace):
+        self._stream = _ReplayStream(response, pace)
+
+    def __enter__(self):
+        return self._stream
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Pace:
+    def __init__(self, latency: float, tokens_per_second):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+
+    def first_token(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def tokens(self, count: int):
+        if self.tokens_per_second:
+            time.sleep(count / self.tokens_per_second)
+
+
+class _ReplayMessages:
+    def __init__(self, cassette: Cassette, pace: _Pace, synthesize):
+        self._cassette = cassette
+        self._pace = pace
+        self._synthesize = synthesize
+
+    def _response(self, request: dict) -> dict:
+        response = self._cassette.get(request)
+        if response is None:
+            if self._synthesize is None:
+                raise LookupError(f"no recorded response for request {request_key(request)[:12]} "
+                                  f"in {self._cassette.path}")
+            response = self._synthesize(request)
+        return response
+
+    def create(self, **request):
+        response = self._response(request)
+        self._pace.first_token()
+        self._pace.tokens(response["usage"]["output_tokens"])
+        return _namespace(response)
+
+    def stream(self, **request):
+        return _ReplayStreamManager(self._response(request), self._pace)
+
+
+def synthetic_response(request: dict, output_tokens=None) -> dict:
+    """A deterministic stand-in response sized like a real one (``max_tokens`` by default)."""
+    output_tokens = output_tokens or request["max_tokens"]
+    key = request_key(request)
+    text = (f"[mock completion {key[:12]}] " * (output_tokens * CHARS_PER_TOKEN // 32 + 1))
+    text = text[:output_tokens * CHARS_PER_TOKEN]
+    input_chars = len(json.dumps(request["messages"])) + len(json.dumps(request.get("system") or ""))
+    return {
+        "id": f"msg_mock_{key[:12]}",
+        "model": request["model"],
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "usage": {
+            "input_tokens": input_chars // CHARS_PER_TOKEN,
+            "output_tokens": output_tokens,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+        },
+    }
+
+
+class ReplayClient:
+    """
+    Serve responses from ``cassette`` with synthetic pacing.
+
+    With ``synthesize`` (a callable taking the request) unrecorded requests are
+    answered by it instead of raising LookupError.
+    """
+
+    def __init__(self, cassette: Cassette, latency=0.0, tokens_per_second=None, synthesize=None):
+        self.messages = _ReplayMessages(cassette, _Pace(latency, tokens_per_second), synthesize)
+
+
+def create_backend(name="live", cassette=DEFAULT_CASSETTE, latency=0.0, tokens_per_second=None,
+                   mock_output_tokens=None):
+    if name == "live":
+        return live_client()
+    if name == "record":
+        return RecordingClient(live_client(), Cassette(cassette))
+    if name == "replay":
+        return ReplayClient(Cassette(cassette), latency, tokens_per_second)
+    if name == "mock":
+        return ReplayClient(Cassette(cassette), latency, tokens_per_second,
+                            synthesize=lambda request: synthetic_response(request, mock_output_tokens))
+    raise ValueError(f"unknown backend {name!r}; expected one of {', '.join(BACKEND_NAMES)}")
@@ -0,0 +1,194 @@
+"""
+harmonic tessellations - batch variant runs
+
+A variants file is JSONL with one prompt variant per line:
+
+    {"variant_id": "low-complexity", "stage": "part1", "overrides": {"INPUT_DATA": "..."}}
+
+``overrides`` replaces any of the stage's prompt elements (or ``PREFILL``);
+a value of the form ``{"path": "..."}`` is read from that file.  Every
+variant is expanded against its stage's element templates and the requests
+are either submitted as one Message Batches job or run through a bounded
+thread pool.  Results are written as JSONL keyed by variant id, so ids must
+be unique within a file.
+"""
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from harmonic_tess import metrics
+from harmonic_tess.backends import BATCH_BACKENDS
+from harmonic_tess.client import (
+    MODEL_NAME, build_request, continue_completion, get_cache, get_client, get_completion, get_scheduler,
+    message_text, record_usage, should_continue,
+)
+from harmonic_tess.prompt import FromFile, PromptBuilder
+from harmonic_tess.ratelimit import call_with_retries
+from harmonic_tess.stages import get_stage
+
+VARIANT_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
+
+
+def load_variants(path) -> list:
+    """Read a variants file; ids must be unique, since results (and batch custom_ids) are keyed by them."""
+    variants = []
+    seen = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            variant = json.loads(line)
+            if not isinstance(variant, dict):
+                raise ValueError(f"{path}:{line_number}: a variant must be a JSON object")
+            variant_id = variant.get("variant_id", "")
+            if not isinstance(variant_id, str) or not VARIANT_ID_PATTERN.match(variant_id):
+                raise ValueError(f"{path}:{line_number}: variant_id must match {VARIANT_ID_PATTERN.pattern}")
+            if variant_id in seen:
+                raise ValueError(f"{path}:{line_number}: duplicate variant_id {variant_id!r} "
+                                 f"(first used on line {seen[variant_id]})")
+            seen[variant_id] = line_number
+            variants.append(variant)
+    return variants
+
+
+def _override_value(value):
+    if isinstance(value, dict) and "path" in value:
+        return FromFile(value["path"])
+    return value
+
+
+def stage_variants(variants) -> dict:
+    """Group loaded variants as ``{stage: [(variant_id, overrides), ...]}`` for `runner.PipelineRunner`."""
+    grouped = {}
+    for variant in variants:
+        overrides = {name: _override_value(value) for name, value in variant.get("overrides", {}).items()}
+        grouped.setdefault(get_stage(variant["stage"]).name, []).append((variant["variant_id"], overrides))
+    return grouped
+
+
+def expand_variants(variants, base_dir=None, model=MODEL_NAME) -> list:
+    """Build the completion parameters for every variant."""
+    expanded = []
+    for variant in variants:
+        stage = get_stage(variant["stage"])
+        overrides = {name: _override_value(value) for name, value in variant.get("overrides", {}).items()}
+        builder = PromptBuilder.for_stage(stage, base_dir=base_dir, overrides=overrides)
+        expanded.append({
+            "variant_id": variant["variant_id"],
+            "stage": stage.name,
+            "params": dict(
+                model=model,
+                system_prompt=stage.system_prompt,
+                prompt=builder.build(),
+                prompt_prefix=builder.prompt_prefix,
+                prefill=builder.prefill,
+                max_tokens=stage.max_tokens,
+                token_budget=stage.token_budget,
+                temperature=stage.temperature,
+            ),
+        })
+    return expanded
+
+
+def run_pool(expanded, max_workers=4) -> dict:
+    """Run every request on a bounded thread pool; returns results keyed by variant id."""
+
+    def run(item):
+        try:
+            with metrics.context(stage=item["stage"], variant=item["variant_id"]):
+                return {"status": "succeeded", "text": get_completion(**item["params"])}
+        except Exception as err:
+            return {"status": "errored", "error": repr(err)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outcomes = executor.map(run, expanded)
+        return {item["variant_id"]: outcome for item, outcome in zip(expanded, outcomes)}
+
+
+def run_batch(expanded, poll_interval=30.0) -> dict:
+    """Submit every uncached request as a single Message Batches job and wait for it to end."""
+    cache = get_cache()
+    results = {}
+    pending = []
+    for item in expanded:
+        text = cache.get(cache.make_key(**item["params"]))
+        if text is None:
+            pending.append(item)
+        else:
+            results[item["variant_id"]] = {"status": "succeeded", "text": text}
+
+    if not pending:
+        return results
+
+    client = get_client()
+    scheduler = get_scheduler()
+    requests = [{"custom_id": item["variant_id"], "params": build_request(item["params"])} for item in pending]
+    batch = call_with_retries(lambda: client.messages.batches.create(requests=requests), scheduler, 0)
+    batch_id = batch.id
+    while batch.processing_status != "ended":
+        time.sleep(poll_interval)
+        batch = call_with_retries(lambda: client.messages.batches.retrieve(batch_id), scheduler, 0)
+
+    items_by_id = {item["variant_id"]: item for item in pending}
+    for entry in client.messages.batches.results(batch_id):
+        if entry.result.type == "succeeded":
+            params = items_by_id[entry.custom_id]["params"]
+            message = entry.result.message
+            text = message_text(message)
+            generated_tokens = message.usage.output_tokens
+            with metrics.context(stage=items_by_id[entry.custom_id]["stage"], variant=entry.custom_id):
+                record_usage(message, model=params["model"], batch=True)
+                if should_continue(message.stop_reason, generated_tokens, params):
+                    # one failed continuation must not lose the rest of the batch
+                    try:
+                        text = continue_completion(params, text, generated_tokens)
+                    except Exception as err:
+                        results[entry.custom_id] = {"status": "errored", "error": repr(err)}
+                        continue
+            cache.put(cache.make_key(**params), text, **params)
+            results[entry.custom_id] = {"status": "succeeded", "text": text}
+        else:
+            error = getattr(entry.result, "error", None)
+            results[entry.custom_id] = {"status": entry.result.type, "error": repr(error) if error else ""}
+    return results
+
+
+def write_results(path, expanded, results):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in expanded:
+            record = {"variant_id": item["variant_id"], "stage": item["stage"]}
+            record.update(results.get(item["variant_id"], {"status": "missing"}))
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run prompt variants from a JSONL file.")
+    parser.add_argument("variants", help="JSONL file of variant overrides")
+    parser.add_argument("-o", "--output", default="variant_results.jsonl", help="JSONL file to write results to")
+    parser.add_argument("--mode", choices=("batch", "pool"), default=None,
+                        help="submit one Message Batches job, or run a bounded concurrent pool "
+                             "(default: batch on the live and record backends, pool otherwise)")
+    parser.add_argument("--max-workers", type=int, default=4, help="pool size in --mode pool")
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="seconds between batch status checks")
+    args = parser.parse_args(argv)
+
+    mode = args.mode
+    if mode is None:
+        mode = "batch" if os.environ.get("HARMONIC_TESS_BACKEND", "live") in BATCH_BACKENDS else "pool"
+    expanded = expand_variants(load_variants(args.variants))
+    if mode == "batch":
+        results = run_batch(expanded, poll_interval=args.poll_interval)
+    else:
+        results = run_pool(expanded, max_workers=args.max_workers)
+    write_results(args.output, expanded, results)
+    print(f"wrote {len(expanded)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
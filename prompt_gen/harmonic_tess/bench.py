@@ -0,0 +1,267 @@
+"""
+harmonic tessellations - benchmarks
+
+    python -m harmonic_tess.bench tessellation --max-complexity 8
+    python -m harmonic_tess.bench mesh
+    python -m harmonic_tess.bench transform --frames 60
+    python -m harmonic_tess.bench lod --fps 60 --vertex-budget 5000
+    python -m harmonic_tess.bench spatial --complexity 8 --queries 1000
+    python -m harmonic_tess.bench imports
+
+Timings are the best of ``repeat`` runs, in milliseconds.
+
+``imports`` imports each entry module in a fresh interpreter and checks it
+against `IMPORT_BUDGETS` and that it does not pull in the SDK or NumPy; it
+exits non-zero on a regression, and ``tests/test_imports.py`` runs the same
+check under pytest.
+"""
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# milliseconds for a cold import of each entry point in a fresh interpreter
+IMPORT_BUDGETS = {
+    "harmonic_tess.cli": 10,
+    "harmonic_tess.extract": 40,
+    "harmonic_tess.pipeline": 80,
+    "harmonic_tess.runner": 80,
+    "harmonic_tess.batch": 80,
+}
+HEAVY_MODULES = ("anthropic", "httpx", "numpy", "sqlite3")
+
+
+def best_of(fn, repeat=5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def _subdivide_loop(vertices: list) -> list:
+    """Per-vertex subdivision as `PatternManager.subdivideOnce` does it, as the baseline."""
+    def midpoint(a, b):
+        return [(a[0] + b[0]) / 2, (a[1] + b[1]) / 2]
+
+    result = []
+    for i in range(0, len(vertices), 3):
+        p1, p2, p3 = vertices[i:i + 3]
+        m1, m2, m3 = midpoint(p1, p2), midpoint(p2, p3), midpoint(p3, p1)
+        result.extend([p1, m1, m3, m1, p2, m2, m3, m2, p3, m1, m2, m3])
+    return result
+
+
+def bench_tessellation(max_complexity=8, shape="triangle", repeat=5, baseline=True) -> list:
+    """Per-level timings of one subdivision step, vectorized and (optionally) per-vertex."""
+    from harmonic_tess.tessellation import generate_pattern, subdivide, vertex_list
+
+    rows = []
+    for complexity in range(2, max_complexity + 1):
+        parent = generate_pattern(shape, complexity - 1)
+        row = {
+            "complexity": complexity,
+            "vertices": parent.shape[0] * 4 * 3,
+            "vectorized_ms": best_of(lambda: subdivide(parent), repeat),
+            "full_pattern_ms": best_of(lambda: generate_pattern(shape, complexity), repeat),
+        }
+        if baseline:
+            parent_list = vertex_list(parent).tolist()
+            row["per_vertex_ms"] = best_of(lambda: _subdivide_loop(parent_list), max(1, repeat // 2))
+        rows.append(row)
+    return rows
+
+
+def bench_mesh(max_complexity=8, shape="triangle", repeat=5) -> list:
+    """Indexed-mesh generation against the triangle buffer: time, vertex count and bytes per level."""
+    from harmonic_tess.mesh import generate_mesh
+    from harmonic_tess.tessellation import generate_pattern
+
+    rows = []
+    for complexity in range(1, max_complexity + 1):
+        pattern = generate_pattern(shape, complexity)
+        mesh = generate_mesh(shape, complexity)
+        rows.append({
+            "complexity": complexity,
+            "soup_vertices": pattern.shape[0] * 3,
+            "mesh_vertices": len(mesh.vertices),
+            "soup_bytes": pattern.nbytes,
+            "mesh_bytes": mesh.nbytes,
+            "soup_ms": best_of(lambda: generate_pattern(shape, complexity), repeat),
+            "mesh_ms": best_of(lambda: generate_mesh(shape, complexity), repeat),
+        })
+    return rows
+
+
+def bench_transform(complexity=8, frames=60, shape="triangle", repeat=3) -> list:
+    """An animation block of ``frames`` rotation steps: batched matrices against per-frame and per-vertex trig."""
+    import math
+
+    from harmonic_tess.tessellation import generate_pattern, vertex_list
+    from harmonic_tess.transform import apply, apply_batch, rotation, rotation_frames
+
+    vertices = vertex_list(generate_pattern(shape, complexity))
+    matrices = rotation_frames(frames)
+    angles = [0.001 * 1000.0 * frame / 60 for frame in range(frames)]
+
+    def per_vertex():
+        sample = vertices[:len(vertices) // 16].tolist()
+        for angle in angles:
+            [[x * math.cos(angle) - y * math.sin(angle), x * math.sin(angle) + y * math.cos(angle)]
+             for x, y in sample]
+
+    return [{
+        "vertices": len(vertices),
+        "frames": frames,
+        "batched_ms": best_of(lambda: apply_batch(vertices, matrices), repeat),
+        "per_frame_ms": best_of(lambda: [apply(vertices, rotation(angle)) for angle in angles], repeat),
+        "per_vertex_ms": best_of(per_vertex, 1) * 16,
+    }]
+
+
+def bench_lod(max_complexity=8, shape="triangle", fps=60, vertex_budget=None) -> list:
+    """Per-level costs of a pattern pyramid and the level chosen for the frame budget."""
+    from harmonic_tess.lod import LODSelector, PatternPyramid, frame_budget_ms
+
+    selector = LODSelector(PatternPyramid(shape, max_complexity))
+    selector.measure()
+    chosen = selector.select(frame_budget_ms(fps), vertex_budget)
+    rows = selector.cost_table()
+    for row in rows:
+        row["selected"] = "*" if row["complexity"] == chosen else ""
+    return rows
+
+
+def bench_spatial(complexity=8, queries=1000, shape="triangle", repeat=3) -> list:
+    """Grid build time and per-query times against a linear scan over every vertex / face, in microseconds."""
+    import numpy as np
+
+    from harmonic_tess.mesh import generate_mesh
+    from harmonic_tess.spatial import SpatialGrid
+
+    mesh = generate_mesh(shape, complexity)
+    grid = SpatialGrid.build(mesh.vertices, mesh.faces)
+    low, high = mesh.vertices.min(axis=0), mesh.vertices.max(axis=0)
+    points = np.random.default_rng(0).uniform(low, high, size=(queries, 2))
+    corners = mesh.vertices[mesh.faces]
+
+    def scan_nearest(point):
+        return np.argmin(np.hypot(*(mesh.vertices - point).T))
+
+    def scan_face(point):
+        a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+        sides = [(v[:, 0] - u[:, 0]) * (point[1] - u[:, 1]) - (v[:, 1] - u[:, 1]) * (point[0] - u[:, 0])
+                 for u, v in ((a, b), (b, c), (c, a))]
+        return np.flatnonzero(np.all(np.array(sides) >= 0, axis=0) | np.all(np.array(sides) <= 0, axis=0))
+
+    def per_query(fn, sample=points):
+        return best_of(lambda: [fn(point) for point in sample], repeat) * 1000.0 / len(sample)
+
+    scan_sample = points[:max(1, queries // 10)]
+    return [{
+        "vertices": len(mesh.vertices),
+        "faces": len(mesh.faces),
+        "cells": grid.columns * grid.rows,
+        "index_bytes": grid.nbytes,
+        "build_ms": best_of(lambda: SpatialGrid.build(mesh.vertices, mesh.faces), repeat),
+        "face_at_us": per_query(grid.face_at),
+        "scan_face_us": per_query(scan_face, scan_sample),
+        "nearest_us": per_query(grid.nearest),
+        "scan_nearest_us": per_query(scan_nearest, scan_sample),
+        "within_us": per_query(lambda point: grid.within(point, grid.cell_size)),
+    }]
+
+
+def bench_imports(budgets=None, repeat=5) -> list:
+    """Best-of-``repeat`` import time of each module in a fresh interpreter, against its budget."""
+    budgets = IMPORT_BUDGETS if budgets is None else budgets
+    script = ("import json, sys, time; start = time.perf_counter(); import {module}; "
+              "print(json.dumps([(time.perf_counter() - start) * 1000, "
+              f"[name for name in {HEAVY_MODULES!r} if name in sys.modules]]))")
+    rows = []
+    for module, budget in budgets.items():
+        best = float("inf")
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, "-c", script.format(module=module)], capture_output=True,
+                                    text=True, check=True, cwd=Path(__file__).resolve().parents[1]).stdout
+            elapsed, heavy = json.loads(output)
+            best = min(best, elapsed)
+        rows.append({
+            "module": module,
+            "import_ms": best,
+            "budget_ms": float(budget),
+            "heavy": ",".join(heavy) or "-",
+            "ok": "yes" if best <= budget and not heavy else "NO",
+        })
+    return rows
+
+
+def print_rows(rows: list):
+    if not rows:
+        return
+    columns = list(rows[0])
+    print("".join(f"{column:>18}" for column in columns))
+    for row in rows:
+        print("".join(f"{row[column]:>18.3f}" if isinstance(row[column], float) else f"{row[column]:>18}"
+                      for column in columns))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run harmonic tessellation benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    tessellation = subparsers.add_parser("tessellation", help="per-level subdivision timings")
+    tessellation.add_argument("--max-complexity", type=int, default=8)
+    tessellation.add_argument("--shape", default="triangle")
+    tessellation.add_argument("--repeat", type=int, default=5)
+    tessellation.add_argument("--no-baseline", action="store_true", help="skip the per-vertex baseline")
+
+    mesh = subparsers.add_parser("mesh", help="indexed mesh against triangle buffer")
+    mesh.add_argument("--max-complexity", type=int, default=8)
+    mesh.add_argument("--shape", default="triangle")
+    mesh.add_argument("--repeat", type=int, default=5)
+
+    transform = subparsers.add_parser("transform", help="batched animation transforms")
+    transform.add_argument("--complexity", type=int, default=8)
+    transform.add_argument("--frames", type=int, default=60)
+    transform.add_argument("--shape", default="triangle")
+
+    lod = subparsers.add_parser("lod", help="pattern pyramid costs and level-of-detail selection")
+    lod.add_argument("--max-complexity", type=int, default=8)
+    lod.add_argument("--shape", default="triangle")
+    lod.add_argument("--fps", type=float, default=60)
+    lod.add_argument("--vertex-budget", type=int, default=None)
+
+    spatial = subparsers.add_parser("spatial", help="spatial index queries against linear scans")
+    spatial.add_argument("--complexity", type=int, default=8)
+    spatial.add_argument("--queries", type=int, default=1000)
+    spatial.add_argument("--shape", default="triangle")
+
+    imports = subparsers.add_parser("imports", help="entry-point import times against their budgets")
+    imports.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args(argv)
+    if args.benchmark == "tessellation":
+        print_rows(bench_tessellation(args.max_complexity, args.shape, args.repeat, not args.no_baseline))
+    elif args.benchmark == "mesh":
+        print_rows(bench_mesh(args.max_complexity, args.shape, args.repeat))
+    elif args.benchmark == "transform":
+        print_rows(bench_transform(args.complexity, args.frames, args.shape))
+    elif args.benchmark == "lod":
+        print_rows(bench_lod(args.max_complexity, args.shape, args.fps, args.vertex_budget))
+    elif args.benchmark == "spatial":
+        print_rows(bench_spatial(args.complexity, args.queries, args.shape))
+    elif args.benchmark == "imports":
+        rows = bench_imports(repeat=args.repeat)
+        print_rows(rows)
+        if any(row["ok"] != "yes" for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
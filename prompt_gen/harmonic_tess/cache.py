@@ -0,0 +1,125 @@
+"""
+harmonic tessellations - completion cache
+
+Completions are stored content-addressed on every request parameter that can
+change the output (model, system prompt, prompt, prefill, max_tokens,
+temperature), so identical calls within a run or across runs are only billed
+once.  Entries live in memory for the current process and as one JSON file per
+key on disk; the disk store is bounded by entry count and total bytes with
+least-recently-used eviction (file mtime is bumped on every hit).  A cache
+instance may be shared between threads.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = ".completion_cache"
+
+
+class CompletionCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(**params) -> str:
+        """Hash the request parameters into a stable cache key."""
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str):
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: str):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            # the disk LRU orders by mtime, so memory hits must count there too
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+            return self.memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        os.utime(path)
+        self._remember(key, text)
+        self.hits += 1
+        return text
+
+    def put(self, key: str, text: str, **params):
+        with self._lock:
+            self._remember(key, text)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"params": params, "text": text}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def get_or_create(self, create, **params) -> str:
+        """Return the cached completion for ``params`` or call ``create(**params)`` and store it."""
+        key = self.make_key(**params)
+        text = self.get(key)
+        if text is None:
+            text = create(**params)
+            self.put(key, text, **params)
+        return text
+
+    def _remember(self, key: str, text: str):
+        self.memory[key] = text
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _evict(self):
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self.memory.pop(path.stem, None)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            for path in self.directory.glob("*.json"):
+                path.unlink()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
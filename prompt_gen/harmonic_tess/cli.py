@@ -0,0 +1,53 @@
+"""
+harmonic tessellations - command line
+
+One entry point for the package's tools:
+
+    python -m harmonic_tess run [stages ...]       stages in dependency order
+    python -m harmonic_tess stage part2 --stream   a single stage
+    python -m harmonic_tess batch variants.jsonl -o results.jsonl
+    python -m harmonic_tess extract harmonic_tessellation_refined.txt
+    python -m harmonic_tess bench imports          import times against their budgets
+
+Parsing the command imports nothing but this module; the subcommand's module
+(and with it the SDK or NumPy, if it needs them) is imported only when it
+runs, so short-lived worker processes pay only for the tool they use.
+"""
+
+import importlib
+import sys
+
+COMMANDS = {
+    "run": ("harmonic_tess.runner", "run stages (and variants) in dependency order"),
+    "stage": ("harmonic_tess.pipeline", "run a single stage"),
+    "batch": ("harmonic_tess.batch", "run prompt variants as a batch job or on a thread pool"),
+    "extract": ("harmonic_tess.extract", "write component files from a stage output"),
+    "bench": ("harmonic_tess.bench", "geometry benchmarks and the import-time budget"),
+    "metrics": ("harmonic_tess.metrics", "summarise recorded completion call metrics"),
+    "patterns": ("harmonic_tess.patternfile", "precompute a library of binary pattern files"),
+    "audio": ("harmonic_tess.audio", "render a pattern's audio to WAV"),
+    "serve": ("harmonic_tess.stream_server", "stream pattern animations over HTTP"),
+    "loadtest": ("harmonic_tess.loadtest", "measure streaming clients per core"),
+}
+
+
+def usage() -> str:
+    lines = ["usage: python -m harmonic_tess <command> [options]", "", "commands:"]
+    lines.extend(f"  {name:<10}{description}" for name, (_, description) in COMMANDS.items())
+    lines.append("")
+    lines.append("Run a command with --help for its options.")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"unknown command {command!r}\n\n{usage()}", file=sys.stderr)
+        sys.exit(2)
+    # argparse names the program after argv[0]
+    sys.argv[0] = f"harmonic_tess {command}"
+    importlib.import_module(COMMANDS[command][0]).main(rest)
@@ -0,0 +1,291 @@
+"""
+harmonic tessellations - completion client
+
+The Anthropic client (and the SDK import itself) is only constructed on first
+use, so the pipeline can be imported by workers without network setup.
+HARMONIC_TESS_BACKEND selects a record/replay/mock backend instead of the
+live API; see `harmonic_tess.backends` for the related settings.
+
+A request may carry a ``prompt_prefix``: the stage elements that are identical
+across stages and variants.  It is sent as the first block of the user turn
+with a prompt-caching breakpoint, so repeated calls only pay for it once
+while the cache is warm.  Cache reads and writes are reported per call.
+
+Calls go through the rate-limiting scheduler in `harmonic_tess.ratelimit`,
+which also owns retries (the SDK's own retries are turned off).  Limits are
+read from HARMONIC_TESS_REQUESTS_PER_MINUTE / HARMONIC_TESS_TOKENS_PER_MINUTE.
+Latency, tokens and cost of every call are recorded by `harmonic_tess.metrics`.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from harmonic_tess import metrics
+from harmonic_tess.cache import CompletionCache
+from harmonic_tess.prompt import estimate_tokens
+from harmonic_tess.ratelimit import BULK, RequestScheduler, call_with_retries
+
+MODEL_NAME = "claude-3-opus-20240229"
+
+_client = None
+_cache = None
+_scheduler = None
+_lock = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+
+def get_client():
+    """The configured completion backend (see `harmonic_tess.backends`), created on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            from harmonic_tess.backends import DEFAULT_CASSETTE, create_backend
+
+            tokens_per_second = os.environ.get("HARMONIC_TESS_TOKENS_PER_SECOND")
+            mock_output_tokens = os.environ.get("HARMONIC_TESS_MOCK_OUTPUT_TOKENS")
+            _client = create_backend(
+                os.environ.get("HARMONIC_TESS_BACKEND", "live"),
+                cassette=os.environ.get("HARMONIC_TESS_CASSETTE", DEFAULT_CASSETTE),
+                latency=float(os.environ.get("HARMONIC_TESS_LATENCY", 0.0)),
+                tokens_per_second=float(tokens_per_second) if tokens_per_second else None,
+                mock_output_tokens=int(mock_output_tokens) if mock_output_tokens else None,
+            )
+    return _client
+
+
+def set_client(client):
+    """Use ``client`` (e.g. a backend from `harmonic_tess.backends`) for all further calls."""
+    global _client
+    with _lock:
+        _client = client
+
+
+def get_cache() -> CompletionCache:
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = CompletionCache()
+    return _cache
+
+
+def get_scheduler() -> RequestScheduler:
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler(
+                requests_per_minute=float(os.environ.get("HARMONIC_TESS_REQUESTS_PER_MINUTE", 50)),
+                tokens_per_minute=float(os.environ.get("HARMONIC_TESS_TOKENS_PER_MINUTE", 40000)),
+            )
+    return _scheduler
+
+
+def request_tokens(request: dict) -> int:
+    """Estimated input tokens of a Messages API request, for rate limiting."""
+    texts = [request["system"] or ""]
+    for message in request["messages"]:
+        content = message["content"]
+        if isinstance(content, str):
+            texts.append(content)
+        else:
+            texts.extend(block["text"] for block in content)
+    return sum(estimate_tokens(text) for text in texts)
+
+
+def send(request: dict, priority=BULK):
+    """Create a message, waiting for the rate limiter and retrying transient failures."""
+    return call_with_retries(lambda: get_client().messages.create(**request), get_scheduler(),
+                             request_tokens(request), priority)
+
+
+def open_stream(request: dict, priority=BULK):
+    """Open a message stream with the same scheduling as `send`; returns ``(manager, stream)``."""
+
+    def enter():
+        manager = get_client().messages.stream(**request)
+        return manager, manager.__enter__()
+
+    return call_with_retries(enter, get_scheduler(), request_tokens(request), priority)
+
+
+def build_request(params: dict, continuation="", generated_tokens=0) -> dict:
+    """Messages API arguments for ``params``, optionally continuing after ``continuation``."""
+    prefill = params["prefill"] + continuation
+    if continuation:
+        # the API rejects a final assistant turn that ends in whitespace
+        prefill = prefill.rstrip()
+    content = params["prompt"]
+    if params.get("prompt_prefix"):
+        content = [
+            {"type": "text", "text": params["prompt_prefix"], "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": params["prompt"]},
+        ]
+    return dict(
+        model=params["model"],
+        max_tokens=min(params["max_tokens"], params["token_budget"] - generated_tokens),
+        temperature=params["temperature"],
+        system=params["system_prompt"],
+        messages=[
+          {"role": "user", "content": content},
+          {"role": "assistant", "content": prefill}
+        ]
+    )
+
+
+def record_usage(message, usage=None, model=MODEL_NAME, started=None, first_token=None, batch=False) -> dict:
+    """
+    Log the token usage of one API call, including prompt-cache hits and misses, and append it to ``usage``.
+
+    ``started`` / ``first_token`` are `time.perf_counter` readings taken
+    before the call and at its first streamed delta; the entry is also
+    recorded in the metrics store.
+    """
+    now = time.perf_counter()
+    entry = {
+        "input_tokens": message.usage.input_tokens,
+        "output_tokens": message.usage.output_tokens,
+        "cache_read_input_tokens": getattr(message.usage, "cache_read_input_tokens", None) or 0,
+        "cache_creation_input_tokens": getattr(message.usage, "cache_creation_input_tokens", None) or 0,
+        "stop_reason": message.stop_reason,
+        "latency": now - started if started is not None else None,
+        "ttft": first_token - started if started is not None and first_token is not None else None,
+    }
+    log.info("prompt cache: %(cache_read_input_tokens)d read, %(cache_creation_input_tokens)d written, "
+             "%(input_tokens)d uncached input tokens", entry)
+    metrics.record_call(entry, model, batch=batch)
+    if usage is not None:
+        usage.append(entry)
+    return entry
+
+
+def format_usage(usage: list) -> str:
+    lines = []
+    for number, entry in enumerate(usage, 1):
+        status = "hit" if entry["cache_read_input_tokens"] else "miss"
+        lines.append(
+            f"call {number}: prompt cache {status} ({entry['cache_read_input_tokens']} read, "
+            f"{entry['cache_creation_input_tokens']} written), {entry['input_tokens']} uncached input, "
+            f"{entry['output_tokens']} output tokens, stop reason {entry['stop_reason']}"
+        )
+    return "\n".join(lines)
+
+
+def message_text(message) -> str:
+    return "".join(block.text for block in message.content if block.type == "text")
+
+
+def should_continue(stop_reason, generated_tokens: int, params: dict) -> bool:
+    """A response cut off by max_tokens is continued until the token budget is spent."""
+    return stop_reason == "max_tokens" and generated_tokens < params["token_budget"]
+
+
+def continue_completion(params: dict, text="", generated_tokens=0, usage=None, priority=BULK) -> str:
+    """Request completions for ``params``, re-prefilling with the text so far while the output is truncated."""
+    while True:
+        # the continuation prefill drops trailing whitespace and the model writes it again, so drop it here too
+        text = text.rstrip()
+        started = time.perf_counter()
+        message = send(build_request(params, text, generated_tokens), priority)
+        record_usage(message, usage, params["model"], started)
+        text += message_text(message)
+        generated_tokens += message.usage.output_tokens
+        if not should_continue(message.stop_reason, generated_tokens, params):
+            return text
+
+
+def get_completion(prompt: str, system_prompt="", prefill="", model=MODEL_NAME, max_tokens=2000,
+                   temperature=0.0, token_budget=8000, prompt_prefix="", use_cache=True, usage=None,
+                   priority=BULK):
+    """
+    Return the completion for ``prompt``.
+
+    Each request generates at most ``max_tokens``; a response that stops on
+    max_tokens is continued automatically until ``token_budget`` output
+    tokens have been generated in total.
+    """
+    params = dict(
+        model=model,
+        system_prompt=system_prompt,
+        prompt=prompt,
+        prefill=prefill,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        token_budget=token_budget,
+        prompt_prefix=prompt_prefix,
+    )
+
+    def create(**params):
+        return continue_completion(params, usage=usage, priority=priority)
+
+    if not use_cache:
+        return create(**params)
+    return get_cache().get_or_create(create, **params)
+
+
+def stream_completion(prompt: str, system_prompt="", prefill="", model=MODEL_NAME, max_tokens=2000,
+                      temperature=0.0, token_budget=8000, prompt_prefix="", use_cache=True, resume_text="",
+                      usage=None, priority=BULK):
+    """
+    Yield the completion as text deltas while it is generated.
+
+    Truncated responses are continued as in `get_completion`.
+    ``resume_text`` is output already received from an interrupted stream for
+    the same request: it is appended to the prefill so generation picks up
+    where it stopped, and only the new deltas are yielded.  Trailing
+    whitespace is held back until the next delta (or the end of the
+    response), because a continuation prefill cannot end in whitespace and
+    the model writes it again; ``resume_text`` should not end in whitespace
+    for the same reason.  The stitched
+    completion is cached under the original request, so a cached result is
+    yielded as a single chunk.
+    """
+    params = dict(
+        model=model,
+        system_prompt=system_prompt,
+        prompt=prompt,
+        prefill=prefill,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        token_budget=token_budget,
+        prompt_prefix=prompt_prefix,
+    )
+    cache = get_cache() if use_cache else None
+    key = CompletionCache.make_key(**params)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached[len(resume_text):] if cached.startswith(resume_text) else cached
+            return
+
+    text = resume_text.rstrip()
+    generated_tokens = 0
+    while True:
+        started = time.perf_counter()
+        first_token = None
+        held = ""
+        manager, stream = open_stream(build_request(params, text, generated_tokens), priority)
+        try:
+            for delta in stream.text_stream:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                delta = held + delta
+                released = delta.rstrip()
+                held = delta[len(released):]
+                if released:
+                    text += released
+                    yield released
+            message = stream.get_final_message()
+        finally:
+            manager.__exit__(None, None, None)
+        record_usage(message, usage, params["model"], started, first_token)
+        generated_tokens += message.usage.output_tokens
+        if not should_continue(message.stop_reason, generated_tokens, params):
+            if held:
+                text += held
+                yield held
+            break
+
+    if cache is not None:
+        cache.put(key, text, **params)
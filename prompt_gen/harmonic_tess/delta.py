@@ -0,0 +1,128 @@
+"""
+harmonic tessellations - frame delta encoding
+
+The client replaces its whole vertex array every frame, although under a
+pure rotation every frame is the same geometry under a different matrix.
+`FrameEncoder` sends each frame as the smallest of:
+
+- a keyframe: every vertex, float32 x/y pairs (8 bytes per vertex);
+- a transform: the top two rows of the 3x3 matrix taking the pattern's rest
+  vertices to this frame (6 float32, 24 bytes), when the matrix is known;
+- a sparse delta against the previous frame sent: u32 count, u32 indices,
+  float32 x/y values (4 + 12 bytes per changed vertex).
+
+A keyframe is forced every ``keyframe_interval`` frames so a client that
+joined late or lost state resynchronises.  Transforms are absolute (relative
+to the rest pose), so a dropped transform frame costs nothing; a delta is
+relative to the previous frame the encoder emitted.  `FrameDecoder` is the
+matching receiver.
+"""
+
+import struct
+
+import numpy as np
+
+from harmonic_tess.transform import apply
+
+KEYFRAME = "keyframe"
+TRANSFORM = "transform"
+DELTA = "delta"
+KEYFRAME_INTERVAL = 60
+COUNT = struct.Struct("<I")
+
+
+def keyframe_size(vertex_count: int) -> int:
+    return vertex_count * 8
+
+
+def delta_size(changed: int) -> int:
+    return COUNT.size + changed * 12
+
+
+def transform_payload(matrix: np.ndarray) -> bytes:
+    return np.ascontiguousarray(matrix[:2, :], dtype="<f4").tobytes()
+
+
+def delta_payload(indices: np.ndarray, values: np.ndarray) -> bytes:
+    return b"".join([COUNT.pack(len(indices)), np.ascontiguousarray(indices, dtype="<u4").tobytes(),
+                     np.ascontiguousarray(values, dtype="<f4").tobytes()])
+
+
+class FrameEncoder:
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL, tolerance=0.0):
+        self.keyframe_interval = keyframe_interval
+        self.tolerance = tolerance
+        self.previous = None  # vertices as the receiver has them
+        self.previous_matrix = None
+        self.since_keyframe = 0
+        self.counts = {KEYFRAME: 0, TRANSFORM: 0, DELTA: 0}
+        self.bytes = {KEYFRAME: 0, TRANSFORM: 0, DELTA: 0}
+
+    def encode(self, vertices=None, matrix=None, keyframe=False) -> tuple:
+        """
+        Encode one frame; returns ``(kind, payload)``.
+
+        ``vertices`` may be an (N, 2) array or a zero-argument callable
+        returning one, so callers that know the frame's matrix only
+        materialise vertices for keyframes.  A known ``matrix`` is assumed to
+        map the rest vertices onto ``vertices``.
+        """
+        due = keyframe or self.since_keyframe + 1 >= self.keyframe_interval
+        if due or (self.previous is None and self.previous_matrix is None):
+            return self._keyframe(vertices, matrix)
+
+        if matrix is not None:
+            if self.previous_matrix is not None and np.array_equal(matrix, self.previous_matrix):
+                return self._emit(DELTA, delta_payload(np.zeros(0), np.zeros((0, 2))))
+            self.previous_matrix = matrix
+            # the receiver's vertices are now rest x matrix; a later matrix-less frame needs them for its delta
+            self.previous = None
+            return self._emit(TRANSFORM, transform_payload(matrix))
+
+        vertices = np.asarray(vertices() if callable(vertices) else vertices, dtype=np.float32)
+        if self.previous is None or self.previous.shape != vertices.shape:
+            return self._keyframe(vertices, None)
+        changed = np.flatnonzero(np.any(np.abs(vertices - self.previous) > self.tolerance, axis=1))
+        if delta_size(len(changed)) >= keyframe_size(len(vertices)):
+            return self._keyframe(vertices, None)
+        self.previous[changed] = vertices[changed]
+        self.previous_matrix = None
+        return self._emit(DELTA, delta_payload(changed, vertices[changed]))
+
+    def _keyframe(self, vertices, matrix) -> tuple:
+        vertices = np.ascontiguousarray(vertices() if callable(vertices) else vertices, dtype="<f4")
+        self.previous = vertices.copy() if matrix is None else None
+        self.previous_matrix = matrix
+        self.since_keyframe = -1
+        return self._emit(KEYFRAME, vertices.tobytes())
+
+    def _emit(self, kind: str, payload: bytes) -> tuple:
+        self.since_keyframe += 1
+        self.counts[kind] += 1
+        self.bytes[kind] += len(payload)
+        return kind, payload
+
+
+class FrameDecoder:
+    def __init__(self, rest_vertices: np.ndarray):
+        self.rest = np.asarray(rest_vertices, dtype=np.float32)
+        self.vertices = None
+
+    def decode(self, kind: str, payload) -> np.ndarray:
+        """Apply one encoded frame and return the current vertices."""
+        if kind == KEYFRAME:
+            self.vertices = np.frombuffer(payload, dtype="<f4").reshape(-1, 2).copy()
+        elif kind == TRANSFORM:
+            matrix = np.eye(3, dtype=np.float32)
+            matrix[:2, :] = np.frombuffer(payload, dtype="<f4").reshape(2, 3)
+            self.vertices = apply(self.rest, matrix)
+        elif kind == DELTA:
+            if self.vertices is None:
+                raise ValueError("delta frame received before a keyframe")
+            (count,) = COUNT.unpack_from(payload)
+            indices = np.frombuffer(payload, dtype="<u4", count=count, offset=COUNT.size)
+            values = np.frombuffer(payload, dtype="<f4", count=count * 2, offset=COUNT.size + 4 * count)
+            self.vertices[indices] = values.reshape(-1, 2)
+        else:
+            raise ValueError(f"unknown frame kind {kind!r}")
+        return self.vertices
@@ -0,0 +1,284 @@
+"""
+harmonic tessellations - streaming extraction of tagged sections and code
+
+Stage outputs are XML-tagged blobs (``<geometric_framework>``,
+``<complete_implementation>``, ``<audio_system>``, ...) with fenced code
+blocks inside.  `StreamingExtractor` consumes completion deltas as they
+arrive and emits a `Section` as soon as its closing tag arrives and a
+`CodeBlock` as soon as its closing fence does.  Only the section tags the
+stage prompts ask for (`SECTION_TAGS`) are recognised, and only outside code
+fences, so ``<div>`` or ``<li>`` in prose or JSX is left alone.
+
+`ComponentWriter` turns code blocks into files under a target tree such as
+``client/src/components``.  A file name in the block's leading comment (the
+``/** AudioManager.js`` header the components carry) wins if its suffix fits
+the block's language, so JS never lands in a ``.css`` file; otherwise the
+innermost enclosing tag is looked up in ``tag_files``.  Existing files
+are found wherever they live in the tree; new ``*Manager`` / ``*Loader``
+files go under ``managers/``, controls under ``ui/``.
+
+Files are written to a staging tree (`DEFAULT_STAGING`, mirroring the
+target's layout) so they can be reviewed and diffed first; only with
+``overwrite`` are the components in the target tree replaced.
+
+    python -m harmonic_tess.extract harmonic_tessellation_refined.txt --target ../client/src/components
+    python -m harmonic_tess.extract harmonic_tessellation_refined.txt --overwrite
+"""
+
+import logging
+import re
+import textwrap
+from dataclasses import dataclass
+from pathlib import Path
+
+from harmonic_tess.manifest import write_atomic
+
+TAG = re.compile(r"<(/?)([a-z][a-z0-9_]*)>")
+FILENAME = re.compile(r"\b([A-Za-z][\w-]*\.(?:jsx?|css))\b")
+COMMENT_LINE = re.compile(r"^\s*(//|/\*|\*)")
+HEADER_LINES = 3
+JS_LANGUAGES = ("", "js", "jsx", "javascript")
+CSS_LANGUAGES = ("css",)
+DEFAULT_TARGET = "../client/src/components"
+DEFAULT_STAGING = ".extracted"
+
+log = logging.getLogger(__name__)
+
+# tags the stage prompts ask for, and the component each one implements
+DEFAULT_TAG_FILES = {
+    "audio_system": "managers/AudioManager.js",
+    "geometric_engine": "managers/PatternManager.js",
+    "performance_optimization": "managers/PerformanceManager.js",
+    "interface_controls": "ui/Controls.js",
+    "visualization_code": "HarmonicTessellations.js",
+    "component_implementation": "HarmonicTessellations.js",
+}
+
+# every section tag the stage prompts and examples ask the response to use
+SECTION_TAGS = frozenset(DEFAULT_TAG_FILES) | {
+    "alpha_protocol_constraints", "audio", "complete_implementation", "complexity_analysis",
+    "component_architecture", "error_handling", "geometric_framework", "geometric_principles", "geometry",
+    "implementation", "implementation_gaps", "improvement_recommendations", "interdisciplinary_connection",
+    "interface_requirements", "limitation_handling", "musical_mapping", "optimization_notes",
+    "optimization_strategies", "performance", "performance_analysis", "proof", "rating_justification",
+    "space_complexity", "specific_questions", "state_management", "statement", "step",
+    "tessellation_principles", "theorem", "time_complexity", "transformation_rules", "webtastic_assessment",
+    "webtastic_scale_targets",
+}
+
+
+@dataclass
+class Section:
+    path: tuple
+    name: str
+    text: str
+
+
+@dataclass
+class CodeBlock:
+    path: tuple
+    language: str
+    code: str
+
+    @property
+    def filename(self) -> str:
+        """The file named in the block's leading comment (``/** AudioManager.js``), if any.
+
+        Only comment lines before the first line of code count, so an
+        ``import './Controls.css';`` is never taken for the block's own name.
+        """
+        lines = [line for line in self.code.splitlines() if line.strip()]
+        for line in lines[:HEADER_LINES]:
+            if not COMMENT_LINE.match(line):
+                break
+            match = FILENAME.search(line)
+            if match:
+                return match.group(1)
+        return None
+
+    @property
+    def suffixes(self) -> tuple:
+        """File suffixes this block's language may be written to."""
+        if self.language in JS_LANGUAGES:
+            return (".js", ".jsx")
+        if self.language in CSS_LANGUAGES:
+            return (".css",)
+        return ()
+
+
+class StreamingExtractor:
+    def __init__(self, tags=SECTION_TAGS):
+        self.tags = tags
+        self._buffer = ""
+        self._chunks = []
+        self._length = 0
+        self._stack = []  # (tag name, offset where its content starts)
+        self._fence = None  # (language, lines) while inside a code block
+
+    def feed(self, delta: str) -> list:
+        """Consume a completion delta; returns the sections and code blocks it completed."""
+        self._buffer += delta
+        *lines, self._buffer = self._buffer.split("\n")
+        events = []
+        for line in lines:
+            events.extend(self._line(line + "\n"))
+        return events
+
+    def close(self) -> list:
+        """Flush a trailing line without a newline."""
+        line, self._buffer = self._buffer, ""
+        return self._line(line) if line else []
+
+    def extract(self, text: str) -> list:
+        return self.feed(text) + self.close()
+
+    def _append(self, text: str):
+        if text:
+            self._chunks.append(text)
+            self._length += len(text)
+
+    def _text(self, start: int, end: int) -> str:
+        text = "".join(self._chunks)
+        self._chunks = [text]
+        return text[start:end]
+
+    def _line(self, line: str) -> list:
+        stripped = line.strip()
+        if self._fence is not None:
+            self._append(line)
+            if not stripped.startswith("```"):
+                self._fence[1].append(line)
+                return []
+            language, lines = self._fence
+            self._fence = None
+            path = tuple(name for name, _ in self._stack)
+            return [CodeBlock(path, language, textwrap.dedent("".join(lines)))]
+
+        if stripped.startswith("```"):
+            self._fence = (stripped[3:].strip().lower(), [])
+            self._append(line)
+            return []
+
+        events = []
+        position = 0
+        for match in TAG.finditer(line):
+            closing, name = match.group(1), match.group(2)
+            if name not in self.tags:
+                continue
+            self._append(line[position:match.start()])
+            if closing:
+                names = [open_name for open_name, _ in self._stack]
+                if name in names:
+                    depth = len(names) - 1 - names[::-1].index(name)
+                    start = self._stack[depth][1]
+                    events.append(Section(tuple(names[:depth]), name, self._text(start, self._length)))
+                    # tags opened inside and never closed end with their parent
+                    del self._stack[depth:]
+            self._append(match.group(0))
+            if not closing:
+                self._stack.append((name, self._length))
+            position = match.end()
+        self._append(line[position:])
+        return events
+
+
+def tee(chunks, extractor: StreamingExtractor, on_event):
+    """Pass ``chunks`` through unchanged while feeding them to ``extractor``."""
+    for text in chunks:
+        for event in extractor.feed(text):
+            on_event(event)
+        yield text
+    for event in extractor.close():
+        on_event(event)
+
+
+class ComponentWriter:
+    def __init__(self, target_dir=DEFAULT_TARGET, tag_files=None, dry_run=False, overwrite=False,
+                 staging_dir=DEFAULT_STAGING):
+        self.target_dir = Path(target_dir)
+        self.tag_files = DEFAULT_TAG_FILES if tag_files is None else tag_files
+        self.dry_run = dry_run
+        self.overwrite = overwrite
+        self.staging_dir = Path(staging_dir)
+        self.written = {}  # path -> content written during this extraction
+
+    def component_path(self, filename: str) -> Path:
+        existing = sorted(self.target_dir.rglob(filename)) if self.target_dir.exists() else []
+        if existing:
+            return existing[0]
+        stem = Path(filename).stem
+        if stem.endswith(("Manager", "Loader")):
+            return self.target_dir / "managers" / filename
+        if stem.startswith("Controls"):
+            return self.target_dir / "ui" / filename
+        return self.target_dir / filename
+
+    def target_for(self, block: CodeBlock) -> Path:
+        filename = block.filename
+        if filename and filename.endswith(block.suffixes):
+            return self.component_path(filename)
+        if block.language not in JS_LANGUAGES:
+            return None
+        for name in reversed(block.path):
+            if name in self.tag_files:
+                return self.target_dir / self.tag_files[name]
+        return None
+
+    def destination(self, path: Path) -> Path:
+        """Where the component at ``path`` in the target tree is written: the staging tree unless overwriting."""
+        if self.overwrite:
+            return path
+        return self.staging_dir / path.relative_to(self.target_dir)
+
+    def __call__(self, event):
+        """Write a completed code block to its component file; other events are ignored."""
+        if not isinstance(event, CodeBlock):
+            return
+        component = self.target_for(event)
+        if component is None:
+            return
+        path = self.destination(component)
+        # the first block for a file replaces it; later blocks in the same response extend it
+        content = event.code if path not in self.written else f"{self.written[path]}\n{event.code}"
+        self.written[path] = content
+        if not self.overwrite and component.exists():
+            existing = len(component.read_text(encoding="utf-8").splitlines())
+            if len(content.splitlines()) < existing:
+                log.warning("%s: extracted %d lines, the existing component has %d", component,
+                            len(content.splitlines()), existing)
+        if not self.dry_run:
+            write_atomic(path, content)
+
+
+def extract_file(path, target_dir=DEFAULT_TARGET, tag_files=None, dry_run=False, overwrite=False,
+                 staging_dir=DEFAULT_STAGING) -> dict:
+    """Extract the component files from a finished output file; returns {path: content}."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    writer = ComponentWriter(target_dir, tag_files, dry_run, overwrite, staging_dir)
+    for event in StreamingExtractor().extract(text):
+        writer(event)
+    return writer.written
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract component files from a stage output.")
+    parser.add_argument("output", help="stage output file to extract from")
+    parser.add_argument("--target", default=DEFAULT_TARGET, help="component tree to write into")
+    parser.add_argument("--staging", default=DEFAULT_STAGING, help="tree to write into unless --overwrite")
+    parser.add_argument("--overwrite", action="store_true", help="replace the components in the target tree")
+    parser.add_argument("--dry-run", action="store_true", help="list the files that would be written")
+    args = parser.parse_args(argv)
+
+    written = extract_file(args.output, args.target, dry_run=args.dry_run, overwrite=args.overwrite,
+                           staging_dir=args.staging)
+    for path, content in written.items():
+        print(f"{path}  {len(content.splitlines())} lines{' (dry run)' if args.dry_run else ''}")
+    if written and not (args.overwrite or args.dry_run):
+        print(f"staged under {args.staging}; review, then rerun with --overwrite to update {args.target}")
+
+
+if __name__ == "__main__":
+    main()
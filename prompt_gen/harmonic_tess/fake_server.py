@@ -0,0 +1,176 @@
+"""
+harmonic tessellations - local stand-in for the Messages API
+
+A small threaded HTTP server that answers ``POST /v1/messages`` (plain and
+streaming) and can be scripted to fail first with 429 / 529 / 5xx responses,
+so the retry and rate-limiting behaviour of the completion client can be
+exercised without network access:
+
+    python -m harmonic_tess.fake_server --port 8765 --statuses 429,529,200
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=fake python harmonic_tessellations_part1.py
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ERROR_TYPES = {
+    429: "rate_limit_error",
+    500: "api_error",
+    529: "overloaded_error",
+}
+
+
+class FakeAnthropicServer:
+    """
+    Serve canned completions, failing with the scripted ``statuses`` first.
+
+    Each incoming request consumes the next status; once the script is used
+    up every request succeeds.  ``requests`` records ``(time, status)`` for
+    every request served.
+    """
+
+    def __init__(self, statuses=(), text="fake completion", retry_after=1.0, host="127.0.0.1", port=0):
+        self.statuses = list(statuses)
+        self.text = text
+        self.retry_after = retry_after
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def next_status(self) -> int:
+        with self._lock:
+            status = self.statuses.pop(0) if self.statuses else 200
+            self.requests.append((time.monotonic(), status))
+            return status
+
+    def message(self, body: dict) -> dict:
+        prompt_chars = len(json.dumps(body.get("messages", [])))
+        return {
+            "id": "msg_fake",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", ""),
+            "content": [{"type": "text", "text": self.text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": prompt_chars // 4, "output_tokens": max(1, len(self.text) // 4)},
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict, headers=()):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_events(self, message: dict):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.end_headers()
+                text = message["content"][0]["text"]
+                start = dict(message, content=[], stop_reason=None,
+                             usage=dict(message["usage"], output_tokens=0))
+                events = [
+                    ("message_start", {"type": "message_start", "message": start}),
+                    ("content_block_start", {"type": "content_block_start", "index": 0,
+                                             "content_block": {"type": "text", "text": ""}}),
+                ]
+                for offset in range(0, len(text), 8):
+                    events.append(("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                           "delta": {"type": "text_delta",
+                                                                     "text": text[offset:offset + 8]}}))
+                events += [
+                    ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                    ("message_delta", {"type": "message_delta",
+                                       "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                                       "usage": {"output_tokens": message["usage"]["output_tokens"]}}),
+                    ("message_stop", {"type": "message_stop"}),
+                ]
+                for event, data in events:
+                    self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.split("?")[0] != "/v1/messages":
+                    self._send_json(404, {"type": "error", "error": {"type": "not_found_error",
+                                                                     "message": self.path}})
+                    return
+
+                status = server.next_status()
+                if status != 200:
+                    headers = [("retry-after", str(server.retry_after))] if status == 429 else []
+                    self._send_json(status, {"type": "error", "error": {
+                        "type": ERROR_TYPES.get(status, "api_error"), "message": f"scripted {status}"}},
+                        headers)
+                    return
+
+                message = server.message(body)
+                if body.get("stream"):
+                    self._send_events(message)
+                else:
+                    self._send_json(200, message)
+
+        return Handler
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local fake Messages API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--statuses", default="", help="comma-separated statuses to answer with first, e.g. 429,529")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds sent with 429s")
+    parser.add_argument("--text", default="fake completion", help="completion text to return")
+    args = parser.parse_args(argv)
+
+    statuses = [int(status) for status in args.statuses.split(",") if status]
+    server = FakeAnthropicServer(statuses, text=args.text, retry_after=args.retry_after, host=args.host,
+                                 port=args.port)
+    print(f"serving fake Messages API on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
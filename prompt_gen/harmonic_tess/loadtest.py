@@ -0,0 +1,138 @@
+"""
+harmonic tessellations - stream server load test
+
+Starts `harmonic_tess.stream_server` in a subprocess, opens an increasing
+number of concurrent streaming clients against it, and reports for each step
+the frame rate every client actually received and how much CPU the server
+used (from its ``/stats`` endpoint).  ``clients/core`` is the number of
+clients divided by the cores the server burned; the last step where every
+client still received at least `SUSTAINED_FRACTION` of the requested frame
+rate is the sustainable load:
+
+    python -m harmonic_tess.loadtest --clients 10,50,100,200 --complexity 5 --seconds 5
+
+The clients run in this process, so on a machine with few cores they compete
+with the server; pin them apart (e.g. ``taskset``) for cleaner numbers.
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from harmonic_tess.bench import print_rows
+from harmonic_tess.stream_server import BASE_FPS
+
+SUSTAINED_FRACTION = 0.95
+
+
+async def _open(host: str, port: int, target: str):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    return reader, writer, head.decode("latin-1")
+
+
+async def fetch_stats(host: str, port: int) -> dict:
+    reader, writer, _ = await _open(host, port, "/stats")
+    body = await reader.read()
+    writer.close()
+    return json.loads(body)
+
+
+async def stream_client(host: str, port: int, query: str, seconds: float) -> dict:
+    """Read a stream for ``seconds`` and count the frame messages received."""
+    reader, writer, _ = await _open(host, port, f"/stream?{query}")
+    frames = 0
+    received = 0
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    try:
+        while loop.time() < deadline:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                break
+            received += len(await reader.readexactly(size + 2)) - 2
+            frames += 1
+    finally:
+        writer.close()
+    # the first message is the pattern itself
+    return {"frames": max(frames - 1, 0), "bytes": received}
+
+
+async def run_step(host: str, port: int, clients: int, query: str, seconds: float) -> dict:
+    before = await fetch_stats(host, port)
+    started = time.monotonic()
+    results = await asyncio.gather(*(stream_client(host, port, query, seconds) for _ in range(clients)))
+    wall = time.monotonic() - started
+    after = await fetch_stats(host, port)
+
+    rates = sorted(result["frames"] / seconds for result in results)
+    cores = (after["cpu_seconds"] - before["cpu_seconds"]) / wall
+    return {
+        "clients": clients,
+        "min_fps": rates[0],
+        "median_fps": rates[len(rates) // 2],
+        "server_cores": cores,
+        "clients/core": clients / cores if cores else float("inf"),
+        "skipped": after["frames_skipped"] - before["frames_skipped"],
+        "MB/s": sum(result["bytes"] for result in results) / wall / 1e6,
+    }
+
+
+def start_server(port=0) -> tuple:
+    """Launch the stream server subprocess; returns (process, host, port)."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "harmonic_tess.stream_server", "--port", str(port), "--no-adaptive"],
+        cwd=Path(__file__).resolve().parents[1], stdout=subprocess.PIPE, text=True,
+    )
+    address = process.stdout.readline().rsplit("http://", 1)[-1].strip()
+    if not address:
+        process.kill()
+        raise RuntimeError("stream server did not start")
+    host, port = address.rsplit(":", 1)
+    return process, host, int(port)
+
+
+def run_load_test(client_counts, shape="triangle", complexity=5, transformation="rotation", fps=BASE_FPS,
+                  seconds=5.0) -> list:
+    query = f"shape={shape}&complexity={complexity}&transformation={transformation}&fps={fps}"
+    process, host, port = start_server()
+    try:
+        async def steps():
+            # warm the shared frame source so its one-off precomputation is not billed to a step
+            await stream_client(host, port, query, 0.5)
+            rows = []
+            for clients in client_counts:
+                row = await run_step(host, port, clients, query, seconds)
+                row["sustained"] = "yes" if row["min_fps"] >= SUSTAINED_FRACTION * fps else "no"
+                rows.append(row)
+            return rows
+
+        return asyncio.run(steps())
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure how many streaming clients the pattern server sustains.")
+    parser.add_argument("--clients", default="10,50,100", help="comma-separated client counts, one step each")
+    parser.add_argument("--shape", default="triangle")
+    parser.add_argument("--complexity", type=int, default=5)
+    parser.add_argument("--transformation", default="rotation")
+    parser.add_argument("--fps", type=int, default=BASE_FPS)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    counts = [int(count) for count in args.clients.split(",") if count]
+    print_rows(run_load_test(counts, args.shape, args.complexity, args.transformation, args.fps, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
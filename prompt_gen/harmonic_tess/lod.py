@@ -0,0 +1,123 @@
+"""
+harmonic tessellations - level of detail
+
+`subdivide_mesh` only ever appends midpoints after the existing vertices, so
+every level's vertex array is a prefix of the next one.  `PatternPyramid`
+builds all levels once and keeps a single vertex array (the finest level)
+plus one face array per level; `level(k)` is a view sharing the parent
+vertices, not a copy.
+
+`LODSelector` picks the highest level whose per-frame cost fits a frame-time
+budget (and optional vertex budget).  Costs start from a local measurement of
+transforming and expanding each level, can be overwritten by frame times the
+renderer reports through `observe`, and are extrapolated by vertex count for
+levels with no measurement.  This lets the renderer step down a level instead
+of dropping frames when it falls behind.
+"""
+
+import time
+
+import numpy as np
+
+from harmonic_tess.mesh import Mesh, subdivide_mesh
+from harmonic_tess.tessellation import DEFAULT_SIZE, MAX_COMPLEXITY, base_triangles
+from harmonic_tess.transform import apply, rotation
+
+DEFAULT_FPS = 60
+
+
+def frame_budget_ms(fps=DEFAULT_FPS) -> float:
+    return 1000.0 / fps
+
+
+class PatternPyramid:
+    def __init__(self, shape="triangle", max_complexity=MAX_COMPLEXITY, size=DEFAULT_SIZE):
+        self.shape = shape
+        self.max_complexity = max_complexity
+        self.size = size
+
+        mesh = Mesh.from_triangles(base_triangles(shape, size))
+        self.faces = [mesh.faces]
+        self.vertex_counts = [len(mesh.vertices)]
+        self.build_ms = [0.0]
+        for _ in range(max_complexity - 1):
+            start = time.perf_counter()
+            mesh = subdivide_mesh(mesh)
+            self.build_ms.append((time.perf_counter() - start) * 1000.0)
+            self.faces.append(mesh.faces)
+            self.vertex_counts.append(len(mesh.vertices))
+        self.vertices = mesh.vertices
+
+    def level(self, complexity: int) -> Mesh:
+        if not 1 <= complexity <= self.max_complexity:
+            raise ValueError(f"complexity must be between 1 and {self.max_complexity}")
+        return Mesh(self.vertices[:self.vertex_counts[complexity - 1]], self.faces[complexity - 1])
+
+    def vertex_count(self, complexity: int) -> int:
+        return self.vertex_counts[complexity - 1]
+
+    def face_count(self, complexity: int) -> int:
+        return len(self.faces[complexity - 1])
+
+    @property
+    def nbytes(self) -> int:
+        return self.vertices.nbytes + sum(faces.nbytes for faces in self.faces)
+
+
+class LODSelector:
+    def __init__(self, pyramid: PatternPyramid, smoothing=0.2):
+        self.pyramid = pyramid
+        self.smoothing = smoothing
+        self.costs = {}
+
+    def measure(self, repeat=5):
+        """Seed costs with the time to transform and expand each level here."""
+        matrix = rotation(0.5)
+        for complexity in range(1, self.pyramid.max_complexity + 1):
+            mesh = self.pyramid.level(complexity)
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                apply(mesh.vertices, matrix)[mesh.faces]
+                best = min(best, time.perf_counter() - start)
+            self.costs[complexity] = best * 1000.0
+        return self.costs
+
+    def observe(self, complexity: int, frame_ms: float):
+        """Fold a frame time reported by the renderer into the level's cost (exponential moving average)."""
+        previous = self.costs.get(complexity)
+        self.costs[complexity] = frame_ms if previous is None else (
+            previous + self.smoothing * (frame_ms - previous))
+
+    def estimated_cost(self, complexity: int) -> float:
+        if complexity in self.costs:
+            return self.costs[complexity]
+        if not self.costs:
+            return 0.0
+        # extrapolate with the most expensive per-face cost seen so far
+        per_face = max(cost / self.pyramid.face_count(level) for level, cost in self.costs.items())
+        return per_face * self.pyramid.face_count(complexity)
+
+    def select(self, frame_budget=None, vertex_budget=None, max_complexity=None) -> int:
+        """Highest level within the frame-time budget (ms) and vertex budget; never below level 1."""
+        if frame_budget is None:
+            frame_budget = frame_budget_ms()
+        top = min(max_complexity or self.pyramid.max_complexity, self.pyramid.max_complexity)
+        for complexity in range(top, 1, -1):
+            if vertex_budget is not None and self.pyramid.vertex_count(complexity) > vertex_budget:
+                continue
+            if self.estimated_cost(complexity) <= frame_budget:
+                return complexity
+        return 1
+
+    def cost_table(self) -> list:
+        return [
+            {
+                "complexity": complexity,
+                "vertices": self.pyramid.vertex_count(complexity),
+                "faces": self.pyramid.face_count(complexity),
+                "build_ms": self.pyramid.build_ms[complexity - 1],
+                "frame_ms": float(np.round(self.estimated_cost(complexity), 4)),
+            }
+            for complexity in range(1, self.pyramid.max_complexity + 1)
+        ]
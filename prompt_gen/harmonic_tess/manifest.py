@@ -0,0 +1,177 @@
+"""
+harmonic tessellations - stage manifest
+
+Build-system style bookkeeping for stage outputs.  Before a stage is sent,
+`StageManifest.fingerprint` hashes everything its request is built from: the
+text of every prompt element (file contents for FromFile elements), the
+prefill, the model parameters and the prompt-building options.  Completions
+are stored once per fingerprint under ``.stage_outputs/`` and the manifest
+records which fingerprint produced each output file, so a rerun whose
+fingerprint is unchanged reuses the recorded completion instead of sending
+the request again, and a small edit only reruns the stages it reaches.
+
+Output files are replaced atomically rather than appended to.  A stage whose
+prefill is its own output file (part1 continues harmonic_tessellation.txt)
+writes the prefill plus the completion, i.e. the continued document; when
+fingerprinting such a stage, its own output counts as unchanged as long as it
+is still exactly what the stage last wrote.
+
+Any other output file that no longer matches what its stage wrote has been
+edited by hand (see `StageManifest.edited`); the runner leaves it alone
+unless forced, and it is never silently restored over.  A deleted output is
+restored from the recorded completion.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from harmonic_tess.prompt import FromFile
+
+DEFAULT_OUTPUT_DIR = ".stage_outputs"
+MANIFEST_NAME = "manifest.json"
+
+_lock = threading.Lock()
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_digest(path) -> str:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def write_atomic(path, text: str):
+    """Replace ``path`` with ``text`` in one rename, so readers never see a half-written file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    tmp_path.replace(path)
+
+
+def continues_output(builder, output_file: Path) -> bool:
+    """Whether the stage's prefill is read from its own output file."""
+    source = builder.prefill_source
+    return isinstance(source, FromFile) and (builder.base_dir / source.path).resolve() == output_file.resolve()
+
+
+class StageManifest:
+    def __init__(self, base_dir, directory=DEFAULT_OUTPUT_DIR):
+        self.base_dir = Path(base_dir)
+        self.directory = self.base_dir / directory
+        self.path = self.directory / MANIFEST_NAME
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _key(self, output_file: Path) -> str:
+        try:
+            return Path(os.path.relpath(output_file, self.base_dir)).as_posix()
+        except ValueError:
+            return Path(output_file).resolve().as_posix()
+
+    def entry(self, output_file: Path) -> dict:
+        return self._load().get(self._key(output_file))
+
+    def fingerprint(self, builder, output_file: Path, params: dict) -> tuple:
+        """Return ``(fingerprint, inputs)`` for a stage about to write ``output_file``."""
+        entry = self.entry(output_file) or {}
+        own_output = output_file.resolve()
+        sources = dict(builder.elements, PREFILL=builder.prefill_source)
+        inputs = {}
+        for name, source in sorted(sources.items()):
+            if isinstance(source, FromFile):
+                path = builder.base_dir / source.path
+                digest = file_digest(path)
+                inputs[name] = f"file:{digest}"
+                if path.resolve() == own_output and digest is not None and digest == entry.get("output_sha"):
+                    # our own last output: count it as the input it was built from
+                    inputs[name] = entry["inputs"].get(name, inputs[name])
+            else:
+                inputs[name] = text_digest(source or "")
+        inputs["params"] = text_digest(json.dumps(
+            dict(params, dedupe=builder.dedupe, cache_prefix=builder.cache_prefix,
+                 max_input_tokens=builder.max_input_tokens),
+            sort_keys=True, default=str,
+        ))
+        return text_digest(json.dumps(inputs, sort_keys=True)), inputs
+
+    def completion_path(self, stage_name: str, fingerprint: str) -> Path:
+        return self.directory / f"{stage_name}-{fingerprint[:16]}.txt"
+
+    def partial_path(self, stage_name: str, fingerprint: str) -> Path:
+        """Where a streamed completion accumulates until it finishes (and is resumed from if interrupted)."""
+        return self.directory / f"{stage_name}-{fingerprint[:16]}.partial"
+
+    def edited(self, output_file: Path) -> bool:
+        """Whether ``output_file`` exists but differs from what its stage last wrote.
+
+        A stage that continues its own output is not counted: its edited
+        output is a changed prefill, and the rerun keeps the edit.
+        """
+        entry = self.entry(output_file)
+        if entry is None or entry.get("continues_output"):
+            return False
+        digest = file_digest(output_file)
+        return digest is not None and digest != entry["output_sha"]
+
+    def lookup(self, output_file: Path, fingerprint: str) -> str:
+        """The recorded completion if ``output_file`` was last produced from ``fingerprint``, else None.
+
+        A deleted output file (for a stage that does not continue its own
+        output) is restored from the recorded completion; an edited one is
+        never overwritten here.
+        """
+        entry = self.entry(output_file)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        try:
+            with open(self.directory / entry["completion"], "r", encoding="utf-8", newline="") as f:
+                completion = f.read()
+        except OSError:
+            return None
+        digest = file_digest(output_file)
+        if digest != entry["output_sha"]:
+            if digest is not None or entry.get("continues_output"):
+                return None
+            write_atomic(output_file, completion)
+        return completion
+
+    def record(self, stage_name: str, output_file: Path, fingerprint: str, inputs: dict, completion: str,
+               prefix=None):
+        """Store ``completion`` under its fingerprint and atomically replace ``output_file``.
+
+        ``prefix`` is the prefill of a stage that continues its own output;
+        the output file then holds prefix + completion.
+        """
+        completion_file = self.completion_path(stage_name, fingerprint)
+        write_atomic(completion_file, completion)
+        output_text = (prefix or "") + completion
+        write_atomic(output_file, output_text)
+        with _lock:
+            manifest = self._load()
+            manifest[self._key(output_file)] = {
+                "stage": stage_name,
+                "fingerprint": fingerprint,
+                "inputs": inputs,
+                "completion": completion_file.name,
+                "output_sha": text_digest(output_text),
+                "continues_output": prefix is not None,
+            }
+            write_atomic(self.path, json.dumps(manifest, indent=2, sort_keys=True))
+        partial_file = self.partial_path(stage_name, fingerprint)
+        if partial_file.exists():
+            os.remove(partial_file)
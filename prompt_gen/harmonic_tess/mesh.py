@@ -0,0 +1,80 @@
+"""
+harmonic tessellations - indexed pattern meshes
+
+A triangle buffer repeats every shared vertex once per triangle that uses it.
+`Mesh` stores each point once (float32 (V, 2) vertices) and the triangles as
+int32 (F, 3) indices into it.  Subdivision hashes every edge to a single
+integer key (low index * V + high index), so each edge midpoint is computed
+once per level no matter how many faces share the edge.  Face order and
+corner order match `tessellation.subdivide`, so ``mesh.triangles()`` equals
+the triangle-buffer pattern.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from harmonic_tess.tessellation import DEFAULT_SIZE, base_triangles
+
+
+@dataclass
+class Mesh:
+    vertices: np.ndarray
+    faces: np.ndarray
+
+    @classmethod
+    def from_triangles(cls, triangles: np.ndarray):
+        """Index a (N, 3, 2) triangle buffer, merging bit-identical vertices."""
+        points = np.ascontiguousarray(triangles.reshape(-1, 2), dtype=np.float32)
+        vertices, inverse = np.unique(points, axis=0, return_inverse=True)
+        return cls(vertices, inverse.reshape(-1, 3).astype(np.int32))
+
+    def triangles(self) -> np.ndarray:
+        """Expand back to a (F, 3, 2) triangle buffer."""
+        return self.vertices[self.faces]
+
+    @property
+    def nbytes(self) -> int:
+        return self.vertices.nbytes + self.faces.nbytes
+
+
+def edge_keys(a: np.ndarray, b: np.ndarray, vertex_count: int) -> np.ndarray:
+    """Direction-independent integer key for each edge (a[i], b[i])."""
+    low = np.minimum(a, b).astype(np.int64)
+    high = np.maximum(a, b).astype(np.int64)
+    return low * vertex_count + high
+
+
+def subdivide_mesh(mesh: Mesh) -> Mesh:
+    """One midpoint-subdivision level, computing each shared edge midpoint once."""
+    vertices, faces = mesh.vertices, mesh.faces
+    vertex_count = len(vertices)
+    p1, p2, p3 = faces[:, 0], faces[:, 1], faces[:, 2]
+
+    # edges per face in midpoint order: m1 = (p1, p2), m2 = (p2, p3), m3 = (p3, p1)
+    starts = np.stack([p1, p2, p3], axis=1).ravel()
+    ends = np.stack([p2, p3, p1], axis=1).ravel()
+    unique_keys, first, inverse = np.unique(edge_keys(starts, ends, vertex_count),
+                                            return_index=True, return_inverse=True)
+
+    midpoints = (vertices[starts[first]] + vertices[ends[first]]) * np.float32(0.5)
+    midpoint_index = (inverse.reshape(-1, 3) + vertex_count).astype(np.int32)
+    m1, m2, m3 = midpoint_index[:, 0], midpoint_index[:, 1], midpoint_index[:, 2]
+
+    children = np.stack([
+        np.stack([p1, m1, m3], axis=1),
+        np.stack([m1, p2, m2], axis=1),
+        np.stack([m3, m2, p3], axis=1),
+        np.stack([m1, m2, m3], axis=1),
+    ], axis=1).reshape(-1, 3)
+    return Mesh(np.concatenate([vertices, midpoints.astype(np.float32)]), children)
+
+
+def generate_mesh(shape="triangle", complexity=3, size=DEFAULT_SIZE) -> Mesh:
+    """The untransformed pattern at ``complexity`` as an indexed mesh."""
+    if complexity < 1:
+        raise ValueError("complexity must be at least 1")
+    mesh = Mesh.from_triangles(base_triangles(shape, size))
+    for _ in range(complexity - 1):
+        mesh = subdivide_mesh(mesh)
+    return mesh
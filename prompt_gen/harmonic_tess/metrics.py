@@ -0,0 +1,219 @@
+"""
+harmonic tessellations - call metrics
+
+Every Messages API call made through `harmonic_tess.client` is recorded with
+its total latency (including rate-limit waits and retries), time to first
+token for streams, input / output / cache-read / cache-write tokens, stop
+reason and an estimated cost, labelled with the stage and variant it was made
+for.  Each stage run also records the per-element token counts of its prompt.
+
+Rows go to HARMONIC_TESS_METRICS (default ``.metrics/calls.jsonl``): a
+``.jsonl`` path appends JSON lines, a ``.sqlite`` / ``.db`` path inserts into
+a SQLite table, and ``off`` disables recording.  The summary CLI reports
+p50/p95 latency and time to first token, token totals and cost per stage,
+and average tokens per prompt element:
+
+    python -m harmonic_tess.metrics
+    python -m harmonic_tess.metrics --elements
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_METRICS_PATH = ".metrics/calls.jsonl"
+
+# USD per million tokens (input, output); cache writes and reads are priced off the input rate
+PRICES = {
+    "claude-3-opus": (15.0, 75.0),
+    "claude-3-sonnet": (3.0, 15.0),
+    "claude-3-5-sonnet": (3.0, 15.0),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-5-haiku": (0.8, 4.0),
+}
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+BATCH_DISCOUNT = 0.5
+
+_labels = threading.local()
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def estimate_cost(model: str, input_tokens=0, output_tokens=0, cache_read_input_tokens=0,
+                  cache_creation_input_tokens=0, batch=False) -> float:
+    """Estimated USD cost of one call, or None for a model without a known price."""
+    matches = [name for name in PRICES if model and model.startswith(name)]
+    if not matches:
+        return None
+    input_rate, output_rate = PRICES[max(matches, key=len)]
+    cost = (input_tokens * input_rate
+            + cache_creation_input_tokens * input_rate * CACHE_WRITE_MULTIPLIER
+            + cache_read_input_tokens * input_rate * CACHE_READ_MULTIPLIER
+            + output_tokens * output_rate) / 1e6
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+@contextmanager
+def context(**labels):
+    """Label the calls made by this thread inside the block (e.g. stage=..., variant=...); blocks nest."""
+    previous = getattr(_labels, "current", {})
+    _labels.current = dict(previous, **labels)
+    try:
+        yield
+    finally:
+        _labels.current = previous
+
+
+def current_labels() -> dict:
+    return dict(getattr(_labels, "current", {}))
+
+
+class MetricsStore:
+    def __init__(self, path=DEFAULT_METRICS_PATH):
+        self.path = Path(path)
+        self.sqlite = self.path.suffix in (".sqlite", ".db")
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        import sqlite3
+
+        connection = sqlite3.connect(self.path)
+        connection.execute("CREATE TABLE IF NOT EXISTS metrics (kind TEXT, stage TEXT, time REAL, data TEXT)")
+        return connection
+
+    def record(self, row: dict):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.sqlite:
+                with self._connect() as connection:
+                    connection.execute("INSERT INTO metrics VALUES (?, ?, ?, ?)",
+                                       (row["kind"], row.get("stage"), row["time"], json.dumps(row)))
+                connection.close()
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row) + "\n")
+
+    def rows(self, kind=None) -> list:
+        if not self.path.exists():
+            return []
+        if self.sqlite:
+            connection = self._connect()
+            try:
+                rows = [json.loads(data) for (data,) in connection.execute("SELECT data FROM metrics ORDER BY time")]
+            finally:
+                connection.close()
+        else:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+        return [row for row in rows if kind is None or row["kind"] == kind]
+
+
+def get_metrics() -> MetricsStore:
+    """The store configured by HARMONIC_TESS_METRICS, or None when recording is off."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            path = os.environ.get("HARMONIC_TESS_METRICS", DEFAULT_METRICS_PATH)
+            _metrics = False if path.lower() in ("", "off", "0") else MetricsStore(path)
+    return _metrics or None
+
+
+def record_call(entry: dict, model: str, batch=False):
+    """Record one API call's usage ``entry`` (see `client.record_usage`) under the current labels."""
+    store = get_metrics()
+    if store is None:
+        return
+    tokens = {name: entry[name] for name in
+              ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")}
+    store.record(dict(
+        current_labels(),
+        kind="call",
+        time=time.time(),
+        model=model,
+        batch=batch,
+        cost=estimate_cost(model, batch=batch, **tokens),
+        **entry,
+    ))
+
+
+def record_prompt(token_report: dict):
+    """Record the per-element token counts of a prompt about to be sent."""
+    store = get_metrics()
+    if store is not None:
+        store.record(dict(current_labels(), kind="prompt", time=time.time(), elements=token_report))
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of ``values`` (q in 0-100), or None when empty."""
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100.0 * len(values)) - 1))]
+
+
+def summarize_calls(rows, by_variant=False) -> list:
+    """Per-stage (or per stage and variant) call counts, latency percentiles, token totals and cost."""
+    groups = {}
+    for row in rows:
+        key = (row.get("stage") or "-", (row.get("variant") or "-") if by_variant else None)
+        groups.setdefault(key, []).append(row)
+    summary = []
+    for (stage, variant), calls in sorted(groups.items()):
+        costs = [call["cost"] for call in calls if call.get("cost") is not None]
+        summary.append({
+            "stage": stage,
+            **({"variant": variant} if by_variant else {}),
+            "calls": len(calls),
+            "p50_latency": percentile([call.get("latency") for call in calls], 50),
+            "p95_latency": percentile([call.get("latency") for call in calls], 95),
+            "p50_ttft": percentile([call.get("ttft") for call in calls], 50),
+            "p95_ttft": percentile([call.get("ttft") for call in calls], 95),
+            "input": sum(call["input_tokens"] for call in calls),
+            "cached": sum(call["cache_read_input_tokens"] for call in calls),
+            "output": sum(call["output_tokens"] for call in calls),
+            "cost_usd": round(sum(costs), 4) if costs else None,
+        })
+    return summary
+
+
+def summarize_elements(rows) -> list:
+    """Average tokens per prompt element for each stage, largest first."""
+    totals = {}
+    for row in rows:
+        for element, tokens in row["elements"].items():
+            entry = totals.setdefault((row.get("stage") or "-", element), [0, 0])
+            entry[0] += tokens
+            entry[1] += 1
+    summary = [{"stage": stage, "element": element, "runs": count, "tokens": round(total / count)}
+               for (stage, element), (total, count) in totals.items()]
+    return sorted(summary, key=lambda row: (row["stage"], -row["tokens"]))
+
+
+def main(argv=None):
+    import argparse
+
+    from harmonic_tess.bench import print_rows
+
+    parser = argparse.ArgumentParser(description="Summarise recorded completion call metrics.")
+    parser.add_argument("--path", default=os.environ.get("HARMONIC_TESS_METRICS", DEFAULT_METRICS_PATH))
+    parser.add_argument("--elements", action="store_true", help="tokens per prompt element instead of per-call stats")
+    parser.add_argument("--by-variant", action="store_true", help="split per-call stats by variant")
+    args = parser.parse_args(argv)
+
+    store = MetricsStore(args.path)
+    if args.elements:
+        rows = summarize_elements(store.rows("prompt"))
+    else:
+        rows = summarize_calls(store.rows("call"), by_variant=args.by_variant)
+    if not rows:
+        print(f"no metrics recorded in {args.path}")
+    print_rows([{name: "-" if value is None else value for name, value in row.items()} for row in rows])
+
+
+if __name__ == "__main__":
+    main()
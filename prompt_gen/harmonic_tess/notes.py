@@ -0,0 +1,138 @@
+"""
+harmonic tessellations - note scheduling
+
+`mapToFrequency` ignores vertex position and cycles five ratios by index, so
+thousands of oscillators pile onto five identical pitches with no cap on
+concurrent voices.  Here pitch comes from geometry instead: the vertex's
+angle around the pattern centre picks the scale degree, its distance from the
+centre picks the octave, and the area of its triangle sets the amplitude.
+
+Notes within `merge_cents` of each other are merged into one voice with the
+summed amplitude, and `NoteScheduler` plays at most `max_voices` at once.
+When the pool is full a new note steals the voice whose current level
+(amplitude x envelope) is lowest, provided the new note is louder.  The
+output is a short list of `NoteEvent`s the client can play on a fixed pool of
+nodes: an event on a voice ends whatever that voice was playing.
+"""
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from harmonic_tess.audio import ATTACK, BASE_FREQUENCY, NOTE_DURATION, PEAK_GAIN, PENTATONIC_RATIOS, envelope_at
+
+DEFAULT_MAX_VOICES = 16
+MERGE_CENTS = 15.0
+OCTAVES = 2
+
+
+@dataclass(frozen=True)
+class NoteEvent:
+    time: float
+    frequency: float
+    amplitude: float
+    duration: float
+    voice: int = 0
+
+    def as_list(self) -> list:
+        return [round(self.time, 4), round(self.frequency, 2), round(self.amplitude, 5), round(self.duration, 4),
+                self.voice]
+
+
+def triangle_areas(triangles: np.ndarray) -> np.ndarray:
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    return 0.5 * np.abs((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1]))
+
+
+def geometry_notes(triangles: np.ndarray, base=BASE_FREQUENCY, ratios=PENTATONIC_RATIOS, octaves=OCTAVES) -> tuple:
+    """(frequencies, amplitudes) for every vertex of an (N, 3, 2) triangle array."""
+    triangles = np.asarray(triangles, dtype=np.float64)
+    vertices = triangles.reshape(-1, 2)
+    offsets = vertices - vertices.mean(axis=0)
+    radius = np.hypot(offsets[:, 0], offsets[:, 1])
+    angle = np.arctan2(offsets[:, 1], offsets[:, 0]) % (2.0 * np.pi)
+
+    degree = np.minimum((angle / (2.0 * np.pi) * len(ratios)).astype(np.intp), len(ratios) - 1)
+    max_radius = radius.max(initial=0.0)
+    octave = np.minimum((radius / max_radius * octaves).astype(np.intp), octaves - 1) if max_radius else 0
+    frequencies = base * np.asarray(ratios)[degree] * 2.0 ** octave
+
+    areas = np.repeat(triangle_areas(triangles), 3)
+    total = areas.sum()
+    # the whole pattern together peaks at one client note's gain, however finely it is subdivided
+    amplitudes = PEAK_GAIN * areas / total if total else np.full(len(vertices), PEAK_GAIN / max(len(vertices), 1))
+    return frequencies, amplitudes
+
+
+def merge_pitches(frequencies, amplitudes, merge_cents=MERGE_CENTS) -> tuple:
+    """Merge pitches closer than ``merge_cents`` to their lower neighbour into single voices.
+
+    Each voice gets the summed amplitude and the amplitude-weighted mean
+    pitch; voices come back loudest first.
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    amplitudes = np.asarray(amplitudes, dtype=np.float64)
+    if not len(frequencies):
+        return frequencies, amplitudes
+    order = np.argsort(frequencies, kind="stable")
+    cents = 1200.0 * np.log2(frequencies[order])
+    group = np.concatenate(([0], np.cumsum(np.diff(cents) > merge_cents)))
+    summed = np.bincount(group, weights=amplitudes[order])
+    mean = np.bincount(group, weights=cents) / np.bincount(group)
+    merged = np.divide(np.bincount(group, weights=cents * amplitudes[order]), summed, out=mean, where=summed > 0)
+    loudest = np.argsort(-summed, kind="stable")
+    return 2.0 ** (merged[loudest] / 1200.0), summed[loudest]
+
+
+class NoteScheduler:
+    def __init__(self, max_voices=DEFAULT_MAX_VOICES, merge_cents=MERGE_CENTS, duration=NOTE_DURATION):
+        self.max_voices = max_voices
+        self.merge_cents = merge_cents
+        self.duration = duration
+        self.voices = [None] * max_voices  # index into self.events of the note each voice is playing
+        self.events = []
+        self.stolen = 0
+        self.dropped = 0
+
+    def _level(self, slot: int, now: float) -> float:
+        index = self.voices[slot]
+        if index is None:
+            return 0.0
+        event = self.events[index]
+        if now >= event.time + event.duration:
+            return 0.0
+        # a note still in its attack counts as already at its peak
+        elapsed = max(now - event.time, ATTACK)
+        return event.amplitude * float(envelope_at(elapsed, duration=self.duration))
+
+    def schedule(self, time: float, triangles: np.ndarray) -> list:
+        """Schedule the notes for one pattern frame at ``time`` seconds; returns the new events."""
+        frequencies, amplitudes = merge_pitches(*geometry_notes(triangles), self.merge_cents)
+        return self.schedule_notes(time, frequencies, amplitudes)
+
+    def schedule_notes(self, time: float, frequencies, amplitudes) -> list:
+        """Assign notes (loudest first) to voices, stealing the quietest voice when the pool is full."""
+        new_events = []
+        levels = [self._level(slot, time) for slot in range(self.max_voices)]
+        for frequency, amplitude in zip(frequencies, amplitudes):
+            slot = min(range(self.max_voices), key=levels.__getitem__)
+            if levels[slot] > 0.0:
+                if levels[slot] >= amplitude:
+                    self.dropped += 1
+                    continue
+                # cut the stolen note short where the new one starts
+                index = self.voices[slot]
+                self.events[index] = replace(self.events[index], duration=time - self.events[index].time)
+                self.stolen += 1
+            event = NoteEvent(float(time), float(frequency), float(amplitude), self.duration, slot)
+            self.voices[slot] = len(self.events)
+            self.events.append(event)
+            new_events.append(event)
+            # a note just assigned counts at full amplitude so it is not stolen within the same frame
+            levels[slot] = float("inf")
+        return new_events
+
+    def event_array(self) -> np.ndarray:
+        """All events so far as a compact (E, 5) float32 array: time, frequency, amplitude, duration, voice."""
+        return np.array([[e.time, e.frequency, e.amplitude, e.duration, e.voice] for e in self.events],
+                        dtype=np.float32).reshape(-1, 5)
@@ -0,0 +1,138 @@
+"""
+harmonic tessellations - pattern cache
+
+`PatternManager.cache` keys finished patterns on complexity and transformation
+only, so a rotation computed from `Date.now()` is frozen on the first frame
+and the map grows without bound.  This cache stores only the untransformed
+base geometry, keyed on (base shape, complexity, base size), as indexed
+meshes:
+
+- in memory, bounded by ``memory_bytes`` with least-recently-used eviction;
+- on disk as binary pattern files (`harmonic_tess.patternfile`) shared by
+  every process, bounded by ``disk_bytes`` with least-recently-used eviction
+  (file mtime is bumped on every hit), and memory-mapped when loaded.
+
+Transformations are applied per request on top of the cached geometry by
+`transformed` (one matrix product, see `harmonic_tess.transform`), and
+`animation` produces a whole (T, N, 2) block of rotating frames at once.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from harmonic_tess.mesh import Mesh, generate_mesh
+from harmonic_tess.patternfile import FILE_SUFFIX, open_pattern, write_pattern
+from harmonic_tess.tessellation import DEFAULT_SIZE, GEOMETRY_VERSION
+from harmonic_tess.transform import apply, apply_batch, client_transformation
+
+DEFAULT_CACHE_DIR = ".pattern_cache"
+
+
+class PatternCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, memory_bytes=32 * 1024 * 1024, disk_bytes=256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.memory = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(shape: str, complexity: int, size=DEFAULT_SIZE) -> tuple:
+        return (shape, int(complexity), float(size))
+
+    def _path(self, key: tuple) -> Path:
+        shape, complexity, size = key
+        return self.directory / f"{shape}-{complexity}-{size:g}-g{GEOMETRY_VERSION}{FILE_SUFFIX}"
+
+    def get(self, shape="triangle", complexity=3, size=DEFAULT_SIZE) -> Mesh:
+        """The untransformed mesh for the key, from memory, disk or freshly generated."""
+        key = self.key(shape, complexity, size)
+        with self._lock:
+            mesh = self.memory.get(key)
+            if mesh is not None:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return mesh
+
+            path = self._path(key)
+            try:
+                pattern = open_pattern(path)
+                os.utime(path)
+                mesh = Mesh(pattern.vertices, pattern.faces)
+                self.disk_hits += 1
+            except (OSError, ValueError):
+                mesh = generate_mesh(shape, complexity, size)
+                self.misses += 1
+                self._store(key, mesh)
+
+            self._remember(key, mesh)
+            return mesh
+
+    def transformed(self, shape="triangle", complexity=3, transformation="none", angle=0.0,
+                    size=DEFAULT_SIZE) -> np.ndarray:
+        """Triangle buffer for the cached geometry with ``transformation`` applied."""
+        mesh = self.get(shape, complexity, size)
+        return apply(mesh.vertices, client_transformation(transformation, angle))[mesh.faces]
+
+    def animation(self, matrices: np.ndarray, shape="triangle", complexity=3, size=DEFAULT_SIZE) -> np.ndarray:
+        """Unique vertices of the cached mesh under each of the (T, 3, 3) ``matrices``: a (T, V, 2) block."""
+        return apply_batch(self.get(shape, complexity, size).vertices, matrices)
+
+    def _store(self, key: tuple, mesh: Mesh):
+        shape, complexity, size = key
+        self.directory.mkdir(parents=True, exist_ok=True)
+        write_pattern(self._path(key), mesh.vertices, mesh.faces, complexity=complexity, shape=shape, size=size)
+        self._evict_disk()
+
+    def _remember(self, key: tuple, mesh: Mesh):
+        self.memory[key] = mesh
+        self.memory.move_to_end(key)
+        total = sum(cached.nbytes for cached in self.memory.values())
+        while len(self.memory) > 1 and total > self.memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            total -= evicted.nbytes
+            self.memory_evictions += 1
+
+    def _evict_disk(self):
+        entries = []
+        for path in self.directory.glob(f"*{FILE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while len(entries) > 1 and total > self.disk_bytes:
+            _, size, path = entries.pop(0)
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.disk_evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            for path in self.directory.glob(f"*{FILE_SUFFIX}"):
+                path.unlink()
+
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+        }
@@ -0,0 +1,172 @@
+"""
+harmonic tessellations - binary pattern files
+
+Layout (all little-endian), version 1:
+
+    offset  size  field
+         0     4  magic b"HTPT"
+         4     2  version (u16)
+         6     2  flags (u16; bit 0 = index block present)
+         8     1  complexity (u8)
+         9     1  base shape code (u8; see SHAPE_CODES)
+        10     1  transformation code (u8; see TRANSFORMATION_CODES)
+        11     1  reserved
+        12     4  vertex count V (u32)
+        16     4  face count F (u32; 0 without an index block)
+        20     4  base size (f32)
+        24     4  vertex block offset (u32)
+        28     4  index block offset (u32; 0 without an index block)
+        32        float32 vertex block, V x 2
+                  int32 index block, F x 3 (optional)
+
+Both blocks start on 4-byte boundaries, so the bytes can be viewed in place:
+`open_pattern` memory-maps a file with numpy, `parse_pattern` wraps an
+in-memory buffer, and in the browser `PatternLoader.js` reads a fetched
+ArrayBuffer straight into a Float32Array / Int32Array.  A vertex block
+without an index block is a flat triangle list (three vertices per triangle).
+
+With ``--spatial``, each library pattern also gets a `harmonic_tess.spatial`
+grid file next to it (``triangle-8.htg``) for hit-testing on the client.
+"""
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from harmonic_tess.tessellation import BASE_SHAPES, DEFAULT_SIZE, MAX_COMPLEXITY
+
+MAGIC = b"HTPT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHBBBBIIfII")
+FLAG_INDEXED = 1
+
+SHAPE_CODES = {shape: code for code, shape in enumerate(BASE_SHAPES)}
+TRANSFORMATION_CODES = {"none": 0, "rotation": 1, "reflection": 2}
+
+FILE_SUFFIX = ".htp"
+
+
+@dataclass
+class PatternFile:
+    complexity: int
+    shape: str
+    transformation: str
+    size: float
+    vertices: np.ndarray
+    faces: np.ndarray = None
+
+
+def pattern_bytes(vertices, faces=None, *, complexity: int, shape: str, transformation="none",
+                  size=DEFAULT_SIZE) -> bytes:
+    """Serialize a pattern (indexed when ``faces`` is given) to the binary format."""
+    vertices = np.ascontiguousarray(vertices, dtype="<f4").reshape(-1, 2)
+    vertex_offset = HEADER.size
+    index_offset = 0
+    blocks = [vertices.tobytes()]
+    if faces is not None:
+        faces = np.ascontiguousarray(faces, dtype="<i4").reshape(-1, 3)
+        index_offset = vertex_offset + vertices.nbytes
+        blocks.append(faces.tobytes())
+
+    header = HEADER.pack(
+        MAGIC, VERSION, FLAG_INDEXED if faces is not None else 0,
+        complexity, SHAPE_CODES[shape], TRANSFORMATION_CODES[transformation], 0,
+        len(vertices), 0 if faces is None else len(faces), size,
+        vertex_offset, index_offset,
+    )
+    return header + b"".join(blocks)
+
+
+def write_pattern(path, vertices, faces=None, **header):
+    """Write a pattern file atomically; ``header`` as for `pattern_bytes`."""
+    path = Path(path)
+    tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(pattern_bytes(vertices, faces, **header))
+    tmp_path.replace(path)
+
+
+def _parse_header(data) -> tuple:
+    (magic, version, flags, complexity, shape_code, transformation_code, _, vertex_count, face_count, size,
+     vertex_offset, index_offset) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a harmonic tessellation pattern file")
+    if version != VERSION:
+        raise ValueError(f"unsupported pattern file version {version}")
+    shapes = {code: shape for shape, code in SHAPE_CODES.items()}
+    transformations = {code: name for name, code in TRANSFORMATION_CODES.items()}
+    header = dict(complexity=complexity, shape=shapes[shape_code],
+                  transformation=transformations[transformation_code], size=size)
+    return header, vertex_count, face_count if flags & FLAG_INDEXED else None, vertex_offset, index_offset
+
+
+def parse_pattern(data) -> PatternFile:
+    """Zero-copy view of a pattern held in a bytes-like object."""
+    header, vertex_count, face_count, vertex_offset, index_offset = _parse_header(data)
+    vertices = np.frombuffer(data, dtype="<f4", count=vertex_count * 2, offset=vertex_offset).reshape(-1, 2)
+    faces = None
+    if face_count is not None:
+        faces = np.frombuffer(data, dtype="<i4", count=face_count * 3, offset=index_offset).reshape(-1, 3)
+    return PatternFile(vertices=vertices, faces=faces, **header)
+
+
+def open_pattern(path) -> PatternFile:
+    """Memory-map a pattern file; the arrays are read-only views of the file."""
+    with open(path, "rb") as f:
+        header, vertex_count, face_count, vertex_offset, index_offset = _parse_header(f.read(HEADER.size))
+    vertices = np.memmap(path, dtype="<f4", mode="r", offset=vertex_offset, shape=(vertex_count, 2))
+    faces = None
+    if face_count:
+        faces = np.memmap(path, dtype="<i4", mode="r", offset=index_offset, shape=(face_count, 3))
+    elif face_count == 0:
+        faces = np.empty((0, 3), dtype="<i4")
+    return PatternFile(vertices=vertices, faces=faces, **header)
+
+
+def library_path(directory, shape: str, complexity: int) -> Path:
+    return Path(directory) / f"{shape}-{complexity}{FILE_SUFFIX}"
+
+
+def write_library(directory, shapes=BASE_SHAPES, max_complexity=MAX_COMPLEXITY, size=DEFAULT_SIZE,
+                  spatial=False) -> list:
+    """Precompute indexed patterns (and, with ``spatial``, their grid files) for every shape and level."""
+    from harmonic_tess.mesh import Mesh, subdivide_mesh
+    from harmonic_tess.spatial import SpatialGrid, grid_path, write_grid
+    from harmonic_tess.tessellation import base_triangles
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for shape in shapes:
+        mesh = Mesh.from_triangles(base_triangles(shape, size))
+        for complexity in range(1, max_complexity + 1):
+            if complexity > 1:
+                mesh = subdivide_mesh(mesh)
+            path = library_path(directory, shape, complexity)
+            write_pattern(path, mesh.vertices, mesh.faces, complexity=complexity, shape=shape, size=size)
+            written.append(path)
+            if spatial:
+                write_grid(grid_path(path), SpatialGrid.build(mesh.vertices, mesh.faces))
+                written.append(grid_path(path))
+    return written
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute a library of binary pattern files.")
+    parser.add_argument("directory", help="output directory, e.g. ../client/public/patterns")
+    parser.add_argument("--max-complexity", type=int, default=MAX_COMPLEXITY)
+    parser.add_argument("--shapes", nargs="*", default=list(BASE_SHAPES), choices=BASE_SHAPES)
+    parser.add_argument("--spatial", action="store_true", help="also write a spatial index for each pattern")
+    args = parser.parse_args(argv)
+
+    for path in write_library(args.directory, args.shapes, args.max_complexity, spatial=args.spatial):
+        print(f"{path}  {path.stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+harmonic tessellations - stage runner
+
+Stage outputs go through `harmonic_tess.manifest`: a stage whose input
+fingerprint matches the one that produced its current output is skipped and
+the recorded completion reused, and new outputs replace the output file
+atomically instead of being appended to it.  An output that was edited by
+hand since the stage wrote it is kept: the stage is skipped with a warning
+until it is run with ``force``.
+
+In streaming mode the response accumulates in a ``.partial`` file named after
+the fingerprint as it arrives; if the run dies, the next run with the same
+inputs picks the partial text back up and continues the generation from
+there instead of starting over.
+
+With ``extract_to``, completed code blocks are extracted for a component tree
+by `harmonic_tess.extract` while the response is still arriving; they are
+staged for review rather than written over the tree's components.
+"""
+
+import logging
+import sys
+from dataclasses import replace
+
+from harmonic_tess import metrics
+from harmonic_tess.client import MODEL_NAME, format_usage, get_completion, stream_completion
+from harmonic_tess.extract import ComponentWriter, StreamingExtractor, tee
+from harmonic_tess.manifest import StageManifest, continues_output, write_atomic
+from harmonic_tess.prompt import PromptBuilder
+from harmonic_tess.ratelimit import INTERACTIVE
+from harmonic_tess.stages import get_stage
+
+log = logging.getLogger(__name__)
+
+
+def print_prompt(prompt: str, prefill: str, prompt_prefix=""):
+    print("--------------------------- Full prompt with variable substitutions ---------------------------")
+    print("USER TURN")
+    if prompt_prefix:
+        print(prompt_prefix)
+        print("\n[cache breakpoint]\n")
+    print(prompt)
+    print("\nASSISTANT TURN")
+    print(prefill)
+    print("\n------------------------------------- Claude's response -------------------------------------")
+
+
+def stream_to_output(chunks, partial_file, resume_text="", echo=True) -> str:
+    """Tee streamed ``chunks`` to stdout and ``partial_file`` (which already holds ``resume_text``)."""
+    received = [resume_text]
+    partial_file.parent.mkdir(parents=True, exist_ok=True)
+    if echo:
+        sys.stdout.write(resume_text)
+    with open(partial_file, "a", encoding="utf-8", newline="") as f:
+        for text in chunks:
+            received.append(text)
+            f.write(text)
+            f.flush()
+            if echo:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+    if echo:
+        print()
+    return "".join(received)
+
+
+def _extractor(prefill: str, extract_to) -> tuple:
+    """An extractor primed with the prefill (tags it opens close in the response) and its writer."""
+    extractor = StreamingExtractor()
+    extractor.feed(prefill)
+    return extractor, ComponentWriter(extract_to)
+
+
+def run_stage(stage, base_dir=None, overrides=None, model=MODEL_NAME, echo=True, write_output=True,
+              output_path=None, stream=False, dedupe=True, priority=INTERACTIVE, force=False, extract_to=None):
+    """
+    Build the prompt for ``stage`` (a Stage or stage name), request a completion and write the stage output.
+
+    Unless ``force`` is set, a stage whose inputs are unchanged since it last
+    wrote its output is not sent again; the recorded completion is returned.
+    Nor is a stage whose output was edited by hand: the edited text is
+    returned as it is.  ``force`` also bypasses the completion cache.
+    ``extract_to`` is a component tree to extract the response's code blocks for (into the staging tree).
+    """
+    if isinstance(stage, str):
+        stage = get_stage(stage)
+
+    builder = PromptBuilder.for_stage(stage, base_dir=base_dir, overrides=overrides, dedupe=dedupe)
+    output_path = output_path or stage.output_path
+    output_file = builder.base_dir / output_path if write_output and output_path else None
+    stream = stream and output_file is not None
+
+    params = dict(
+        system_prompt=stage.system_prompt,
+        model=model,
+        max_tokens=stage.max_tokens,
+        token_budget=stage.token_budget,
+        temperature=stage.temperature,
+    )
+    if output_file is not None:
+        manifest = StageManifest(builder.base_dir)
+        fingerprint, inputs = manifest.fingerprint(builder, output_file, params)
+        if not force and manifest.edited(output_file):
+            log.warning("%s: %s was edited since the stage wrote it; keeping it (use --force to rerun and "
+                        "overwrite it)", stage.name, output_path)
+            with open(output_file, "r", encoding="utf-8", newline="") as f:
+                return f.read()
+        recorded = None if force else manifest.lookup(output_file, fingerprint)
+        if recorded is not None:
+            if echo:
+                print(f"{stage.name}: inputs unchanged, reusing {output_path}")
+            if extract_to is not None:
+                extractor, writer = _extractor(builder.prefill, extract_to)
+                for event in extractor.extract(recorded):
+                    writer(event)
+            return recorded
+
+    prompt = builder.build()
+    prefill = builder.prefill
+
+    if echo:
+        print_prompt(prompt, prefill, builder.prompt_prefix)
+
+    usage = []
+    request = dict(prompt_prefix=builder.prompt_prefix, prefill=prefill, use_cache=not force, **params)
+    with metrics.context(stage=stage.name):
+        metrics.record_prompt(builder.token_report())
+        if stream:
+            partial_file = manifest.partial_path(stage.name, fingerprint)
+            resume_text = ""
+            if partial_file.exists():
+                with open(partial_file, "r", encoding="utf-8", newline="") as f:
+                    resume_text = f.read()
+                if resume_text != resume_text.rstrip():
+                    # the continuation regenerates trailing whitespace; keep the partial file in step
+                    resume_text = resume_text.rstrip()
+                    write_atomic(partial_file, resume_text)
+            chunks = stream_completion(prompt, resume_text=resume_text, usage=usage, priority=priority, **request)
+            if extract_to is not None:
+                extractor, writer = _extractor(prefill, extract_to)
+                for event in extractor.feed(resume_text):
+                    writer(event)
+                chunks = tee(chunks, extractor, writer)
+            completion = stream_to_output(chunks, partial_file, resume_text=resume_text, echo=echo)
+            if echo and usage:
+                print(format_usage(usage))
+        else:
+            completion = get_completion(prompt, usage=usage, priority=priority, **request)
+            if extract_to is not None:
+                extractor, writer = _extractor(prefill, extract_to)
+                for event in extractor.extract(completion):
+                    writer(event)
+            if echo:
+                print(completion)
+                if usage:
+                    print(format_usage(usage))
+
+    if output_file is not None:
+        prefix = prefill if continues_output(builder, output_file) else None
+        manifest.record(stage.name, output_file, fingerprint, inputs, completion, prefix=prefix)
+
+    return completion
+
+
+def print_token_report(builder: PromptBuilder):
+    for name, tokens in builder.token_report().items():
+        note = f"  (truncated {builder.truncated[name]})" if name in builder.truncated else ""
+        print(f"{name:<20}{tokens:>8}{note}")
+
+
+def main(argv=None):
+    import argparse
+
+    from harmonic_tess.stages import STAGE_NAMES
+
+    parser = argparse.ArgumentParser(description="Run a single prompt stage.")
+    parser.add_argument("stage", choices=STAGE_NAMES)
+    parser.add_argument("--stream", action="store_true", help="stream the response, resuming an interrupted one")
+    parser.add_argument("--force", action="store_true", help="run even if the stage's inputs are unchanged")
+    parser.add_argument("--extract-to", default=None, help="component tree to stage the response's code blocks for")
+    parser.add_argument("--max-input-tokens", type=int, default=None, help="input budget to enforce")
+    parser.add_argument("--no-dedupe", action="store_true", help="send repeated large blocks every time")
+    parser.add_argument("--token-report", action="store_true",
+                        help="print per-element token counts instead of running the stage")
+    args = parser.parse_args(argv)
+
+    stage = get_stage(args.stage)
+    if args.max_input_tokens is not None:
+        stage = replace(stage, max_input_tokens=args.max_input_tokens)
+
+    if args.token_report:
+        print_token_report(PromptBuilder.for_stage(stage, dedupe=not args.no_dedupe))
+    else:
+        run_stage(stage, stream=args.stream, dedupe=not args.no_dedupe, force=args.force, extract_to=args.extract_to)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+harmonic tessellations - prompt assembly
+
+A stage is described by its ten prompt elements: the `user` role (implicit in
+the Messages call), eight text elements and the prefill.  Elements are plain
+strings, or `FromFile` references that are only read when the prompt is
+built, so importing a stage never touches the filesystem.  Text elements may
+refer to other elements with `{ELEMENT_NAME}` placeholders.
+
+The builder keeps per-element token accounting.  A large element that is
+both included in the prompt and spliced into another element through a
+placeholder (part2/part3 embed INPUT_DATA in TASK_DESCRIPTION) is only sent
+once, inline, where the surrounding text says what it is.  When a stage
+sets ``max_input_tokens`` the lowest-priority elements are truncated first
+until the prompt and prefill fit; a budget that cannot be met without
+emptying the task elements (`REQUIRED_ELEMENTS`) raises ValueError.
+
+The elements that never change between stages or variants are laid out first
+as a separate prefix (see `STATIC_ELEMENTS`) so that the completion client
+can mark it for prompt caching.
+"""
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+
+ELEMENT_ORDER = (
+    "TASK_CONTEXT",
+    "TONE_CONTEXT",
+    "INPUT_DATA",
+    "EXAMPLES",
+    "TASK_DESCRIPTION",
+    "IMMEDIATE_TASK",
+    "PRECOGNITION",
+    "OUTPUT_FORMATTING",
+)
+
+# shared verbatim by every stage and variant; sent first as the cacheable prefix
+STATIC_ELEMENTS = (
+    "TASK_CONTEXT",
+    "TONE_CONTEXT",
+    "EXAMPLES",
+)
+
+# elements are truncated in this order when the input budget is exceeded
+TRUNCATION_ORDER = (
+    "EXAMPLES",
+    "TONE_CONTEXT",
+    "PRECOGNITION",
+    "INPUT_DATA",
+    "TASK_CONTEXT",
+    "OUTPUT_FORMATTING",
+    "IMMEDIATE_TASK",
+    "TASK_DESCRIPTION",
+)
+
+# never truncated to nothing; a budget that would empty them is an error
+REQUIRED_ELEMENTS = (
+    "IMMEDIATE_TASK",
+    "TASK_DESCRIPTION",
+)
+
+CHARS_PER_TOKEN = 4
+DEDUPE_MIN_TOKENS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English prose and code)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, tokens: int, count_tokens=estimate_tokens) -> str:
+    """Keep the head of ``text`` within roughly ``tokens`` tokens, marking the cut."""
+    if tokens <= 0:
+        return ""
+    dropped = count_tokens(text) - tokens
+    if dropped <= 0:
+        return text
+    return text[:tokens * CHARS_PER_TOKEN].rstrip() + f"\n[... truncated {dropped} tokens ...]"
+
+
+@dataclass(frozen=True)
+class FromFile:
+    """An element whose text is read from ``path`` (relative to the stage's base dir)."""
+
+    path: str
+
+    def read(self, base_dir: Path) -> str:
+        with open(base_dir / self.path, "r", encoding="utf-8") as f:
+            return f.read()
+
+
+@dataclass
+class Stage:
+    name: str
+    elements: dict
+    prefill: object = ""
+    output_path: str = ""
+    system_prompt: str = ""
+    max_tokens: int = 2000
+    token_budget: int = 8000
+    temperature: float = 0.0
+    max_input_tokens: int = None
+
+
+class PromptBuilder:
+    """Resolves a stage's elements once and assembles the user turn and prefill."""
+
+    def __init__(self, elements: dict, prefill="", base_dir=None, max_input_tokens=None, dedupe=True,
+                 cache_prefix=True, count_tokens=estimate_tokens):
+        self.elements = dict(elements)
+        self.prefill_source = prefill
+        self.base_dir = Path(base_dir) if base_dir is not None else Path.cwd()
+        self.max_input_tokens = max_input_tokens
+        self.dedupe = dedupe
+        self.cache_prefix = cache_prefix
+        self.count_tokens = count_tokens
+        self.truncated = {}
+        self._raw_texts = None
+        self._resolved = None
+        self._fitted = None
+        self._prefix = None
+        self._prompt = None
+        self._prefill = None
+
+    @classmethod
+    def for_stage(cls, stage: Stage, base_dir=None, overrides=None, **kwargs):
+        elements = dict(stage.elements)
+        prefill = stage.prefill
+        if overrides:
+            overrides = dict(overrides)
+            prefill = overrides.pop("PREFILL", prefill)
+            elements.update(overrides)
+        kwargs.setdefault("max_input_tokens", stage.max_input_tokens)
+        return cls(elements, prefill=prefill, base_dir=base_dir, **kwargs)
+
+    def _read(self, value) -> str:
+        if isinstance(value, FromFile):
+            return value.read(self.base_dir)
+        return value or ""
+
+    def _raw(self) -> dict:
+        if self._raw_texts is None:
+            self._raw_texts = {name: self._read(value) for name, value in self.elements.items()}
+        return self._raw_texts
+
+    def _inline_only(self, raw: dict) -> set:
+        """Large elements spliced into another element, sent only where they are spliced in."""
+        if not self.dedupe:
+            return set()
+        return {other for other, other_text in raw.items() if self.count_tokens(other_text) >= DEDUPE_MIN_TOKENS
+                and any("{" + other + "}" in text for name, text in raw.items() if name != other)}
+
+    def _splice(self, texts: dict, inline_only: set) -> dict:
+        resolved = {}
+        for name, text in texts.items():
+            for other, other_text in texts.items():
+                placeholder = "{" + other + "}"
+                if other != name and placeholder in text:
+                    text = text.replace(placeholder, other_text)
+            resolved[name] = text
+        for name in inline_only:
+            # the inline copy has the host's lead-in ("Here is the previous response:"); the bare one does not
+            resolved[name] = ""
+
+        if self.dedupe:
+            seen = set()
+            for name in ELEMENT_ORDER:
+                text = resolved.get(name)
+                if text and self.count_tokens(text) >= DEDUPE_MIN_TOKENS:
+                    if text in seen:
+                        resolved[name] = ""
+                    seen.add(text)
+        return resolved
+
+    def resolve(self) -> dict:
+        """Return the element texts with file references read, placeholders filled in and duplicates dropped."""
+        if self._resolved is None:
+            raw = self._raw()
+            self._resolved = self._splice(raw, self._inline_only(raw))
+        return self._resolved
+
+    def _input_tokens(self, resolved: dict) -> int:
+        return self.count_tokens(self.prefill) + sum(
+            self.count_tokens(resolved.get(name) or "") for name in ELEMENT_ORDER)
+
+    def _fit_budget(self, raw: dict) -> dict:
+        """Truncate element texts (before splicing, so a spliced element shrinks everywhere it is sent)."""
+        inline_only = self._inline_only(raw)
+        fitted = dict(raw)
+        if self.max_input_tokens is None:
+            return self._splice(fitted, inline_only)
+        for name in TRUNCATION_ORDER:
+            resolved = self._splice(fitted, inline_only)
+            excess = self._input_tokens(resolved) - self.max_input_tokens
+            if excess <= 0:
+                break
+            text = fitted.get(name)
+            if not text:
+                continue
+            copies = (1 if resolved.get(name) else 0) + sum(
+                host_text.count("{" + name + "}") for host, host_text in fitted.items() if host != name)
+            if not copies:
+                continue
+            tokens = self.count_tokens(text)
+            keep = tokens - math.ceil(excess / copies)
+            fitted[name] = truncate_to_tokens(text, keep, self.count_tokens)
+            # leave room for the truncation marker itself
+            overshoot = self.count_tokens(fitted[name]) - keep
+            if overshoot > 0:
+                fitted[name] = truncate_to_tokens(text, keep - overshoot, self.count_tokens)
+            if name in REQUIRED_ELEMENTS and not fitted[name]:
+                raise ValueError(f"max_input_tokens={self.max_input_tokens} leaves no room for {name} "
+                                 f"(the prefill alone is {self.count_tokens(self.prefill)} tokens)")
+            self.truncated[name] = tokens - self.count_tokens(fitted[name])
+
+        resolved = self._splice(fitted, inline_only)
+        total = self._input_tokens(resolved)
+        if total > self.max_input_tokens:
+            raise ValueError(f"prompt and prefill need {total} tokens after truncation, "
+                             f"over max_input_tokens={self.max_input_tokens}")
+        return resolved
+
+    def build(self) -> str:
+        """
+        Concatenate the non-empty elements in canonical order, within the input budget.
+
+        With ``cache_prefix`` the static elements are left out here and
+        returned by `prompt_prefix` instead.
+        """
+        if self._prompt is None:
+            self._fitted = fitted = self._fit_budget(self._raw())
+            prefix_names = STATIC_ELEMENTS if self.cache_prefix else ()
+            self._prefix = "\n\n".join(fitted[name] for name in prefix_names if fitted.get(name))
+            parts = [fitted[name] for name in ELEMENT_ORDER if fitted.get(name) and name not in prefix_names]
+            self._prompt = "\n\n".join(parts)
+        return self._prompt
+
+    @property
+    def prompt_prefix(self) -> str:
+        self.build()
+        return self._prefix
+
+    @property
+    def prefill(self) -> str:
+        if self._prefill is None:
+            self._prefill = self._read(self.prefill_source)
+        return self._prefill
+
+    def token_report(self) -> dict:
+        """Token counts per element as sent (after dedupe and truncation), plus the prefill and the total."""
+        self.build()
+        resolved, fitted = self.resolve(), self._fitted
+        report = {name: self.count_tokens(fitted[name]) for name in ELEMENT_ORDER if resolved.get(name)}
+        report["PREFILL"] = self.count_tokens(self.prefill)
+        report["TOTAL"] = sum(report.values())
+        return report
+
@@ -0,0 +1,167 @@
+"""
+harmonic tessellations - rate limiting and retries for the completion client
+
+Every API call passes through a `RequestScheduler` before it is sent:
+
+- token buckets cap requests per minute and input tokens per minute, so a
+  concurrent sweep stays under the account limits instead of bouncing off
+  them;
+- waiting calls are admitted in priority order, so an interactive stage run
+  goes ahead of queued bulk sweep requests;
+- 429 / 5xx / overloaded (529) responses and connection errors are retried
+  with jittered exponential backoff.  A ``retry-after`` header is honored
+  and also pauses the scheduler, so other threads back off with it.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+
+INTERACTIVE = 0
+BULK = 10
+
+RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504, 529)
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to ``capacity`` units, refilled at ``rate_per_minute``."""
+
+    def __init__(self, rate_per_minute: float, capacity=None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.clock = clock
+        self.level = self.capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+
+class RequestScheduler:
+    """Admit API calls in priority order within request-per-minute and token-per-minute limits.
+
+    ``clock`` and ``sleep`` may be replaced together (e.g. by a fake clock in
+    tests); by default the head call waits on the scheduler's condition so a
+    `pause` or a higher-priority arrival wakes it early.
+    """
+
+    def __init__(self, requests_per_minute=50, tokens_per_minute=40000, clock=time.monotonic, sleep=None):
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self.clock = clock
+        self.sleep = sleep
+        self.paused_until = clock()
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+
+    def acquire(self, tokens: int, priority=BULK):
+        """Block until this call is at the head of the queue and both buckets can cover it."""
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        delay = max(self.paused_until - self.clock(), self.requests.delay(1),
+                                    self.tokens.delay(tokens))
+                        if delay <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            return
+                        self._wait(delay)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def _wait(self, delay: float):
+        if self.sleep is None:
+            self._cond.wait(timeout=delay)
+            return
+        self._cond.release()
+        try:
+            self.sleep(delay)
+        finally:
+            self._cond.acquire()
+
+    def pause(self, seconds: float):
+        """Hold back every queued call for ``seconds`` (after the server asked us to slow down).
+
+        The buckets are left as they are, so calls resume at the configured
+        rate once the pause is over.
+        """
+        with self._cond:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+            self._cond.notify_all()
+
+
+def retry_after(err):
+    """The server's requested delay in seconds, if the error response carried one."""
+    response = getattr(err, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is not None:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def is_retryable(err) -> bool:
+    try:
+        import anthropic
+    except ImportError:  # replay/mock backends run without the SDK
+        return False
+
+    if isinstance(err, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+        return True
+    return isinstance(err, anthropic.APIStatusError) and err.status_code in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt: int, base_delay=1.0, max_delay=60.0) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (starting at 0)."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def call_with_retries(send, scheduler: RequestScheduler, tokens: int, priority=BULK, max_retries=6,
+                      base_delay=1.0, max_delay=60.0, sleep=time.sleep):
+    """Call ``send()`` once admitted by ``scheduler``, retrying retryable API errors with backoff."""
+    for attempt in itertools.count():
+        scheduler.acquire(tokens, priority)
+        try:
+            return send()
+        except Exception as err:
+            if attempt >= max_retries or not is_retryable(err):
+                raise
+            requested = retry_after(err)
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            if requested is not None:
+                delay = max(delay, requested)
+                scheduler.pause(requested)
+            sleep(delay)
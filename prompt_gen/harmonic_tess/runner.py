@@ -0,0 +1,193 @@
+"""
+harmonic tessellations - concurrent pipeline runner
+
+Stages are ordered by the files they read and write: a stage depends on every
+other stage whose output_path it reads through a FromFile element or prefill
+(part1 -> part2 through harmonic_tessellation.txt; part3 only reads the
+modularized-components markdown and so runs alongside them).  Each stage may
+be run as several variants; jobs whose dependencies have finished are
+submitted to a thread pool with at most ``max_workers`` requests in flight.
+Stages whose inputs are unchanged are skipped (see `harmonic_tess.manifest`),
+so after a small edit only the affected stages and those downstream rerun.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from harmonic_tess import metrics
+from harmonic_tess.pipeline import run_stage
+from harmonic_tess.prompt import FromFile
+from harmonic_tess.ratelimit import BULK
+from harmonic_tess.stages import STAGE_NAMES, get_stage
+
+
+def stage_inputs(stage) -> set:
+    """Paths of every file a stage reads when its prompt is built."""
+    sources = list(stage.elements.values()) + [stage.prefill]
+    return {Path(source.path) for source in sources if isinstance(source, FromFile)}
+
+
+def stage_dependencies(stages) -> dict:
+    """Map each stage name to the names of the stages whose output it reads."""
+    producers = {Path(stage.output_path): stage.name for stage in stages if stage.output_path}
+    dependencies = {}
+    for stage in stages:
+        dependencies[stage.name] = {
+            producers[path] for path in stage_inputs(stage)
+            if path in producers and producers[path] != stage.name
+        }
+    return dependencies
+
+
+def variant_output_path(output_path: str, variant_id) -> str:
+    if variant_id is None:
+        return output_path
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}.{variant_id}{path.suffix}"))
+
+
+class PipelineRunner:
+    """
+    Run stages (and per-stage variants) in dependency order with bounded concurrency.
+
+    ``variants`` maps a stage name to a list of ``(variant_id, overrides)``
+    pairs; stages without an entry run once with their default elements.
+    Variant outputs are written next to the stage output as
+    ``<stem>.<variant_id><suffix>`` so that they never interleave.
+
+    A variant carries downstream: every stage that reads a varied stage's
+    output also runs under that variant id, with its input pointed at the
+    variant's output file (on top of any overrides it has for the same id).
+    """
+
+    def __init__(self, stages=STAGE_NAMES, variants=None, max_workers=4, base_dir=None, echo=False,
+                 stream=False, force=False):
+        self.stages = [get_stage(name) if isinstance(name, str) else name for name in stages]
+        self.variants = variants or {}
+        self.max_workers = max_workers
+        self.base_dir = base_dir
+        self.echo = echo
+        self.stream = stream
+        self.force = force
+        self.dependencies = stage_dependencies(self.stages)
+        self.producers = {Path(stage.output_path): stage.name for stage in self.stages if stage.output_path}
+        self.order = self._check_acyclic()
+
+    def _check_acyclic(self) -> list:
+        """Stage names in dependency order; raises on a cycle."""
+        visiting, done, order = set(), set(), []
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"stage dependency cycle through {name!r}")
+            visiting.add(name)
+            for dependency in self.dependencies.get(name, ()):
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for stage in self.stages:
+            visit(stage.name)
+        return order
+
+    def _variant_overrides(self, stage, variant_id, variant_ids: dict, overrides) -> dict:
+        """``overrides`` plus FromFile inputs redirected to the outputs of upstream runs of ``variant_id``."""
+        overrides = dict(overrides or {})
+        if variant_id is None:
+            return overrides or None
+        for name, source in list(stage.elements.items()) + [("PREFILL", stage.prefill)]:
+            if name in overrides or not isinstance(source, FromFile):
+                continue
+            producer = self.producers.get(Path(source.path))
+            if producer != stage.name and variant_id in variant_ids.get(producer, ()):
+                overrides[name] = FromFile(variant_output_path(source.path, variant_id))
+        return overrides
+
+    def jobs(self) -> list:
+        stages = {stage.name: stage for stage in self.stages}
+        variant_ids = {}
+        jobs = []
+        for name in self.order:
+            stage = stages[name]
+            runs = dict(self.variants.get(name, [(None, None)]))
+            for dependency in sorted(self.dependencies[name]):
+                for variant_id in variant_ids[dependency]:
+                    if variant_id is not None:
+                        runs.setdefault(variant_id, None)
+            variant_ids[name] = list(runs)
+            for variant_id, overrides in runs.items():
+                jobs.append((stage, variant_id, self._variant_overrides(stage, variant_id, variant_ids, overrides)))
+        return jobs
+
+    def _run_job(self, stage, variant_id, overrides):
+        with metrics.context(variant=variant_id):
+            return run_stage(
+                stage,
+                base_dir=self.base_dir,
+                overrides=overrides,
+                output_path=variant_output_path(stage.output_path, variant_id),
+                echo=self.echo,
+                stream=self.stream,
+                priority=BULK,
+                force=self.force,
+            )
+
+    def run(self) -> dict:
+        """Run every job and return completions keyed by ``(stage name, variant id)``."""
+        pending = self.jobs()
+        remaining = {stage.name: 0 for stage in self.stages}
+        for stage, _, _ in pending:
+            remaining[stage.name] += 1
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                ready = [job for job in pending
+                         if all(remaining[dep] == 0 for dep in self.dependencies[job[0].name])]
+                for job in ready:
+                    pending.remove(job)
+                    running[executor.submit(self._run_job, *job)] = job
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, variant_id, _ = running.pop(future)
+                    results[(stage.name, variant_id)] = future.result()
+                    remaining[stage.name] -= 1
+        return results
+
+
+def run_pipeline(stages=STAGE_NAMES, variants=None, max_workers=4, base_dir=None, echo=False, stream=False,
+                 force=False) -> dict:
+    return PipelineRunner(stages, variants=variants, max_workers=max_workers, base_dir=base_dir, echo=echo,
+                          stream=stream, force=force).run()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the prompt stages in dependency order.")
+    parser.add_argument("stages", nargs="*", default=list(STAGE_NAMES), help="stages to run (default: all)")
+    parser.add_argument("--max-workers", type=int, default=4, help="maximum concurrent completion requests")
+    parser.add_argument("--stream", action="store_true", help="stream responses, resuming interrupted ones")
+    parser.add_argument("--force", action="store_true", help="rerun stages even if their inputs are unchanged")
+    parser.add_argument("--variants", default=None,
+                        help="JSONL file of prompt variants (as for harmonic_tess.batch) to run the stages as")
+    args = parser.parse_args(argv)
+
+    variants = None
+    if args.variants:
+        from harmonic_tess.batch import load_variants, stage_variants
+
+        variants = stage_variants(load_variants(args.variants))
+    results = run_pipeline(args.stages, variants=variants, max_workers=args.max_workers, stream=args.stream,
+                           force=args.force)
+    for (stage_name, variant_id), completion in results.items():
+        print(f"{stage_name}{'' if variant_id is None else f' [{variant_id}]'}: {len(completion)} characters")
+
+
+if __name__ == "__main__":
+    main()
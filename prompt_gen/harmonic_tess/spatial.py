@@ -0,0 +1,232 @@
+"""
+harmonic tessellations - spatial index
+
+Subdivided patterns are dense and evenly spread, so a uniform grid indexes
+them well.  `SpatialGrid` buckets every vertex into the cell containing it
+and every face into each cell its bounding box overlaps.  Buckets are stored
+CSR style: entries sorted by cell (uint32) plus a (cells + 1) array of start
+offsets, so a row of neighbouring cells is one contiguous slice.  The cell
+size defaults to about ``per_cell`` vertices per cell.
+
+Queries are in pattern (rest) coordinates; a touch on an animated frame is
+mapped back through the inverse of the frame's matrix first.
+
+- `face_at`: the face containing a point (point-in-triangle over one cell);
+- `nearest`: the k nearest vertices, growing a square of cells around the
+  point until the k-th distance is within the searched square;
+- `within`: vertices within a radius, over the cells the circle overlaps.
+
+Grid file layout (all little-endian), written next to the pattern file
+(``triangle-8.htp`` / ``triangle-8.htg``):
+
+    offset  size  field
+         0     4  magic b"HTGR"
+         4     2  version (u16)
+         6     2  reserved
+         8     4  columns (u32)
+        12     4  rows (u32)
+        16     4  origin x (f32)
+        20     4  origin y (f32)
+        24     4  cell size (f32)
+        28     4  vertex count V (u32)
+        32     4  face entry count E (u32)
+        36     4  reserved
+        40        uint32 vertex cell starts, columns x rows + 1
+                  uint32 vertex entries, V
+                  uint32 face cell starts, columns x rows + 1
+                  uint32 face entries, E
+
+The grid holds only indices; the vertices and faces come from the pattern.
+"""
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"HTGR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIfffIII")
+FILE_SUFFIX = ".htg"
+DEFAULT_PER_CELL = 4
+EPSILON = 1e-6
+
+
+def _buckets(cells: np.ndarray, items: np.ndarray, cell_count: int) -> tuple:
+    """CSR buckets: ``items`` sorted by cell, and the start offset of each cell."""
+    order = np.argsort(cells, kind="stable")
+    starts = np.zeros(cell_count + 1, dtype=np.uint32)
+    np.cumsum(np.bincount(cells, minlength=cell_count), out=starts[1:])
+    return starts, items[order].astype(np.uint32)
+
+
+@dataclass
+class SpatialGrid:
+    vertices: np.ndarray
+    faces: np.ndarray
+    origin: np.ndarray
+    cell_size: float
+    columns: int
+    rows: int
+    vertex_starts: np.ndarray
+    vertex_entries: np.ndarray
+    face_starts: np.ndarray
+    face_entries: np.ndarray
+
+    @classmethod
+    def build(cls, vertices, faces, cell_size=None, per_cell=DEFAULT_PER_CELL):
+        """Index a mesh's (V, 2) vertices and (F, 3) faces."""
+        vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 2)
+        faces = np.asarray(faces, dtype=np.int32).reshape(-1, 3)
+        if not len(vertices):
+            raise ValueError("cannot index an empty pattern")
+        origin = vertices.min(axis=0)
+        extent = vertices.max(axis=0) - origin
+        if cell_size is None:
+            area = max(float(extent[0]) * float(extent[1]), float(extent.max()) ** 2 / len(vertices), EPSILON)
+            cell_size = float(np.sqrt(area * per_cell / len(vertices)))
+        columns, rows = (np.floor(extent / cell_size).astype(np.int64) + 1).tolist()
+        grid = cls(vertices, faces, origin, float(cell_size), columns, rows, None, None, None, None)
+        cell_count = columns * rows
+
+        vx, vy = grid._cell_coordinates(vertices)
+        grid.vertex_starts, grid.vertex_entries = _buckets(vy * columns + vx, np.arange(len(vertices)), cell_count)
+
+        # every face goes into each cell of its bounding box
+        corners = vertices[faces]
+        x0, y0 = grid._cell_coordinates(corners.min(axis=1))
+        x1, y1 = grid._cell_coordinates(corners.max(axis=1))
+        spans = x1 - x0 + 1
+        counts = spans * (y1 - y0 + 1)
+        face_ids = np.repeat(np.arange(len(faces)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        span = np.repeat(spans, counts)
+        cells = (np.repeat(y0, counts) + offsets // span) * columns + np.repeat(x0, counts) + offsets % span
+        grid.face_starts, grid.face_entries = _buckets(cells, face_ids, cell_count)
+        return grid
+
+    def _cell_coordinates(self, points: np.ndarray, clip=True) -> tuple:
+        cells = np.floor((np.asarray(points, dtype=np.float64) - self.origin) / self.cell_size).astype(np.int64)
+        if clip:
+            cells = np.clip(cells, 0, [self.columns - 1, self.rows - 1])
+        return cells[..., 0], cells[..., 1]
+
+    def _gather(self, starts: np.ndarray, entries: np.ndarray, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Entries of the cells in columns x0..x1 and rows y0..y1 (clipped to the grid)."""
+        x0, x1 = max(x0, 0), min(x1, self.columns - 1)
+        y0, y1 = max(y0, 0), min(y1, self.rows - 1)
+        if x0 > x1 or y0 > y1:
+            return np.zeros(0, dtype=np.uint32)
+        rows = [entries[starts[y * self.columns + x0]:starts[y * self.columns + x1 + 1]] for y in range(y0, y1 + 1)]
+        return np.concatenate(rows) if len(rows) > 1 else rows[0]
+
+    def face_at(self, point) -> int:
+        """Index of a face containing ``point``, or -1 if it is outside the pattern."""
+        (cx, cy) = self._cell_coordinates(point, clip=False)
+        if not (0 <= cx < self.columns and 0 <= cy < self.rows):
+            return -1
+        cell = cy * self.columns + cx
+        candidates = self.face_entries[self.face_starts[cell]:self.face_starts[cell + 1]]
+        if not len(candidates):
+            return -1
+        a, b, c = np.moveaxis(self.vertices[self.faces[candidates]].astype(np.float64), 1, 0)
+        p = np.asarray(point, dtype=np.float64)
+
+        def cross(o, u, v):
+            return (u[:, 0] - o[:, 0]) * (v[..., 1] - o[:, 1]) - (u[:, 1] - o[:, 1]) * (v[..., 0] - o[:, 0])
+
+        d1, d2, d3 = cross(a, b, p), cross(b, c, p), cross(c, a, p)
+        tolerance = EPSILON * self.cell_size ** 2
+        negative = (d1 < -tolerance) | (d2 < -tolerance) | (d3 < -tolerance)
+        positive = (d1 > tolerance) | (d2 > tolerance) | (d3 > tolerance)
+        hits = np.flatnonzero(~(negative & positive))
+        return int(candidates[hits[0]]) if len(hits) else -1
+
+    def _by_distance(self, candidates: np.ndarray, point) -> tuple:
+        distances = np.hypot(*(self.vertices[candidates] - np.asarray(point, dtype=np.float32)).T)
+        order = np.argsort(distances, kind="stable")
+        return candidates[order].astype(np.int64), distances[order]
+
+    def nearest(self, point, k=1) -> tuple:
+        """The ``k`` vertices nearest ``point``: ``(indices, distances)``, nearest first."""
+        k = min(k, len(self.vertices))
+        cx, cy = self._cell_coordinates(point, clip=False)
+        px, py = (np.asarray(point, dtype=np.float64) - self.origin) / self.cell_size
+        ring = 0
+        while True:
+            candidates = self._gather(self.vertex_starts, self.vertex_entries,
+                                      cx - ring, cy - ring, cx + ring, cy + ring)
+            covers_grid = cx - ring <= 0 and cy - ring <= 0 and cx + ring >= self.columns - 1 \
+                and cy + ring >= self.rows - 1
+            if len(candidates) >= k or covers_grid:
+                indices, distances = self._by_distance(candidates, point)
+                # anything outside the searched square is at least this far away
+                margin = min(px - (cx - ring), cx + ring + 1 - px, py - (cy - ring), cy + ring + 1 - py) * self.cell_size
+                if covers_grid or distances[k - 1] <= margin:
+                    return indices[:k], distances[:k]
+            # empty space around the point (a triangle pattern fills half its box) is crossed in doubling steps
+            ring = ring * 2 if len(candidates) < k and ring else ring + 1
+
+    def within(self, point, radius: float) -> tuple:
+        """Vertices within ``radius`` of ``point``: ``(indices, distances)``, nearest first."""
+        point = np.asarray(point, dtype=np.float64)
+        x0, y0 = self._cell_coordinates(point - radius, clip=False)
+        x1, y1 = self._cell_coordinates(point + radius, clip=False)
+        indices, distances = self._by_distance(self._gather(self.vertex_starts, self.vertex_entries, x0, y0, x1, y1),
+                                               point)
+        inside = distances <= radius
+        return indices[inside], distances[inside]
+
+    @property
+    def nbytes(self) -> int:
+        return (self.vertex_starts.nbytes + self.vertex_entries.nbytes
+                + self.face_starts.nbytes + self.face_entries.nbytes)
+
+
+def grid_bytes(grid: SpatialGrid) -> bytes:
+    """Serialize a grid's index blocks (not the vertices and faces) to the binary format."""
+    header = HEADER.pack(MAGIC, VERSION, 0, grid.columns, grid.rows, float(grid.origin[0]), float(grid.origin[1]),
+                         grid.cell_size, len(grid.vertex_entries), len(grid.face_entries), 0)
+    blocks = [grid.vertex_starts, grid.vertex_entries, grid.face_starts, grid.face_entries]
+    return header + b"".join(np.ascontiguousarray(block, dtype="<u4").tobytes() for block in blocks)
+
+
+def write_grid(path, grid: SpatialGrid):
+    """Write a grid file atomically."""
+    path = Path(path)
+    tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(grid_bytes(grid))
+    tmp_path.replace(path)
+
+
+def parse_grid(data, vertices, faces) -> SpatialGrid:
+    """Zero-copy view of a grid held in a bytes-like object, over the pattern's ``vertices`` and ``faces``."""
+    (magic, version, _, columns, rows, origin_x, origin_y, cell_size, vertex_count, face_entry_count,
+     _) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a harmonic tessellation grid file")
+    if version != VERSION:
+        raise ValueError(f"unsupported grid file version {version}")
+    if vertex_count != len(vertices):
+        raise ValueError(f"grid indexes {vertex_count} vertices, the pattern has {len(vertices)}")
+
+    blocks = []
+    offset = HEADER.size
+    for count in (columns * rows + 1, vertex_count, columns * rows + 1, face_entry_count):
+        blocks.append(np.frombuffer(data, dtype="<u4", count=count, offset=offset))
+        offset += count * 4
+    return SpatialGrid(np.asarray(vertices), np.asarray(faces), np.array([origin_x, origin_y], dtype=np.float32),
+                       cell_size, columns, rows, *blocks)
+
+
+def open_grid(path, pattern) -> SpatialGrid:
+    """Read a grid file for an opened `patternfile.PatternFile`."""
+    with open(path, "rb") as f:
+        return parse_grid(f.read(), pattern.vertices, pattern.faces)
+
+
+def grid_path(pattern_path) -> Path:
+    return Path(pattern_path).with_suffix(FILE_SUFFIX)
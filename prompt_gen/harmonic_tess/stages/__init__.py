@@ -0,0 +1,16 @@
+"""
+harmonic tessellations - stage registry
+
+Stage modules are imported on demand so that looking up one stage does not
+pay for building the others.
+"""
+
+import importlib
+
+STAGE_NAMES = ("part1", "part2", "part3")
+
+
+def get_stage(name: str):
+    if name not in STAGE_NAMES:
+        raise KeyError(f"unknown stage {name!r}; expected one of {', '.join(STAGE_NAMES)}")
+    return importlib.import_module(f"harmonic_tess.stages.{name}").STAGE
@@ -0,0 +1,183 @@
+"""
+harmonic tesselations - first pass
+
+"""
+
+from harmonic_tess.elements import EXAMPLES, PRECOGNITION, TASK_CONTEXT, TONE_CONTEXT
+from harmonic_tess.prompt import FromFile, Stage
+
+##### Prompt element 4: Input data
+# Defines specific requirements for the harmonic tessellation system
+INPUT_DATA = """<alpha_protocol_constraints>
+- Maximum width: 320px
+- Maximum height: 480px
+- Single file React component
+- Inline styles only using style attribute
+- No external dependencies
+- Built-in state management
+- SVG-based visualization
+- Touch-optimized controls
+- 60 FPS performance target
+- 2-second maximum initialization
+- 100ms touch response
+- 100MB memory limit
+</alpha_protocol_constraints>
+
+<interface_requirements>
+Core Controls:
+- Play/Pause toggle for audio and animation
+- Reset button for pattern regeneration
+- Settings panel for parameters
+- Help system with visual examples
+- Parameter adjustment sliders
+
+Parameter Controls:
+- Tessellation complexity
+- Harmonic scale selection
+- Pattern rotation/transformation
+- Audio feedback intensity
+- Visual feedback sensitivity
+</interface_requirements>
+
+<webtastic_scale_targets>
+Visual Impact (2W):
+- Smooth geometric transitions
+- Color harmony with sound mapping
+- Responsive layout aesthetics
+
+Interaction Design (2W):
+- Intuitive pattern manipulation
+- Real-time audio feedback
+- Clear parameter relationships
+
+Technical Implementation (1.5W):
+- Efficient tessellation generation
+- Optimized audio-visual sync
+- Smooth mobile performance
+
+Educational Value (1.5W):
+- Clear geometric principles
+- Obvious musical relationships
+- Intuitive parameter effects
+
+Innovation Factor (1W):
+- Novel pattern generation
+- Creative sound mapping
+- Unique interaction methods
+
+Total Target: 8W
+</webtastic_scale_targets>
+"""
+
+##### Prompt element 6: Task description
+TASK_DESCRIPTION = """Create a comprehensive audio-visual system for harmonic tessellations that:
+
+1. Geometric Framework:
+   - Generates regular and semi-regular tessellations
+   - Maps geometric properties to musical parameters
+   - Supports real-time pattern transformation
+
+2. Musical Implementation:
+   - Converts geometric properties to frequencies
+   - Generates harmonic progressions from patterns
+   - Provides real-time audio feedback
+
+3. Visual System:
+   - Renders tessellations using SVG
+   - Implements smooth transitions
+   - Provides interactive manipulation
+
+4. Interface Requirements:
+   - Implements all core controls
+   - Provides parameter adjustment
+   - Includes help system
+   - Shows current state clearly
+
+5. Documentation:
+   - Explains geometric principles
+   - Details musical mappings
+   - Provides usage guidelines
+   - Includes Webtastic scale assessment
+
+Your implementation must:
+- Follow Alpha Protocol constraints strictly
+- Meet performance standards
+- Achieve minimum 7W rating
+- Provide clear educational value
+"""
+
+##### Prompt element 7: Immediate task
+IMMEDIATE_TASK = """Using the above framework, create a complete implementation of 
+a harmonic tessellation system that maps geometric patterns to musical spaces while
+strictly adhering to Alpha Protocol specifications and targeting an 8W rating."""
+
+##### Prompt element 9: Output formatting
+OUTPUT_FORMATTING = """Format your response as follows:
+
+<geometric_framework>
+  <tessellation_principles>
+    Mathematical foundations and pattern generation rules
+  </tessellation_principles>
+  
+  <musical_mapping>
+    Frequency relationships and harmonic structures
+  </musical_mapping>
+  
+  <transformation_rules>
+    Pattern manipulation and audio effects
+  </transformation_rules>
+</geometric_framework>
+
+<implementation>
+  <component_architecture>
+    React component structure and relationships
+  </component_architecture>
+  
+  <visualization_code>
+    Complete implementation following Alpha Protocol
+  </visualization_code>
+  
+  <interface_controls>
+    Control system implementation
+  </interface_controls>
+</implementation>
+
+<webtastic_assessment>
+  <rating_justification>
+    Detailed analysis of implementation against Webtastic criteria
+  </rating_justification>
+  
+  <improvement_recommendations>
+    Steps to enhance rating
+  </improvement_recommendations>
+</webtastic_assessment>
+
+<performance_analysis>
+  <optimization_strategies>
+    Performance enhancement techniques
+  </optimization_strategies>
+  
+  <limitation_handling>
+    Managing technical constraints
+  </limitation_handling>
+</performance_analysis>
+"""
+
+##### Prompt element 10: Prefill
+PREFILL = FromFile("harmonic_tessellation.txt")
+
+STAGE = Stage(
+    name="part1",
+    elements={
+        "TASK_CONTEXT": TASK_CONTEXT,
+        "TONE_CONTEXT": TONE_CONTEXT,
+        "INPUT_DATA": INPUT_DATA,
+        "EXAMPLES": EXAMPLES,
+        "TASK_DESCRIPTION": TASK_DESCRIPTION,
+        "IMMEDIATE_TASK": IMMEDIATE_TASK,
+        "PRECOGNITION": PRECOGNITION,
+        "OUTPUT_FORMATTING": OUTPUT_FORMATTING,
+    },
+    prefill=PREFILL,
+    output_path="harmonic_tessellation.txt",
+)
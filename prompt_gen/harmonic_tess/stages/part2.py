@@ -0,0 +1,148 @@
+"""
+harmonic tesselations - refine the first pass against the outstanding issues
+
+"""
+
+from harmonic_tess.elements import EXAMPLES, PRECOGNITION, TASK_CONTEXT, TONE_CONTEXT
+from harmonic_tess.prompt import FromFile, Stage
+
+##### Prompt element 4: Input data
+# Defines specific requirements for the harmonic tessellation system
+INPUT_DATA = FromFile("harmonic_tessellation.txt")
+
+##### Prompt element 6: Task description
+TASK_DESCRIPTION = """
+
+Here is the previous response:
+{INPUT_DATA}
+
+Here are the issues that need to be addressed:
+
+<implementation_gaps>
+  <audio_system>
+    - WebAudio API integration is missing
+    - No frequency calculation logic
+    - Lacking buffer management
+    - Missing audio-visual sync
+    - No audio error handling
+  </audio_system>
+
+  <geometric_engine>
+    - Vertex calculation algorithms undefined
+    - Missing transformation matrices
+    - Pattern generation logic incomplete
+    - No coordinate system management
+    - Intersection handling absent
+  </geometric_engine>
+
+  <performance_optimization>
+    - requestAnimationFrame implementation missing
+    - No memory management strategy
+    - SVG optimization undefined
+    - Frame rate control absent
+    - Performance monitoring lacking
+  </performance_optimization>
+
+  <state_management>
+    - Audio state incomplete (AudioContext, oscillators, gains)
+    - Geometric state missing (vertices, matrices, patterns)
+    - Performance metrics absent
+    - Error states undefined
+    - Loading states not handled
+  </state_management>
+
+  <error_handling>
+    - No error boundaries defined
+    - Missing audio error recovery
+    - Geometric calculation validation absent
+    - Performance degradation handling missing
+    - User feedback system incomplete
+  </error_handling>
+
+  <component_implementation>
+    - TessellationRenderer component undefined
+    - PlaybackControls missing
+    - Gesture handling incomplete
+    - Accessibility features absent
+    - Keyboard shortcuts missing
+  </component_implementation>
+</implementation_gaps>
+
+<specific_questions>
+  <audio>
+    - How is WebAudio initialized and managed?
+    - What is the frequency calculation methodology?
+    - How are audio buffers handled and scheduled?
+    - What ensures audio-visual synchronization?
+    - How are audio resources cleaned up?
+  </audio>
+
+  <geometry>
+    - How are vertices calculated for each pattern type?
+    - What is the matrix transformation process?
+    - How are pattern intersections managed?
+    - What coordinate system is used for SVG?
+    - How is pattern complexity scaled?
+  </geometry>
+
+  <performance>
+    - How is frame rate maintained at 60 FPS?
+    - What memory management strategy is used?
+    - How are SVG updates optimized?
+    - What triggers garbage collection?
+    - How is touch response kept under 100ms?
+  </performance>
+</specific_questions>
+
+"""
+
+##### Prompt element 9: Output formatting
+OUTPUT_FORMATTING = """
+
+Please provide a complete implementation addressing these issues in the following XML format:
+
+<complete_implementation>
+  <audio_system>
+    [Complete WebAudio implementation]
+  </audio_system>
+
+  <geometric_engine>
+    [Complete geometric calculation system]
+  </geometric_engine>
+
+  <performance_optimization>
+    [Complete optimization implementation]
+  </performance_optimization>
+
+  <state_management>
+    [Complete state management system]
+  </state_management>
+
+  <error_handling>
+    [Complete error handling system]
+  </error_handling>
+
+  <component_implementation>
+    [Complete React component hierarchy]
+  </component_implementation>
+</complete_implementation>
+
+"""
+
+##### Prompt element 10: Prefill
+PREFILL = FromFile("harmonic_tessellations_output_take_2.txt")
+
+STAGE = Stage(
+    name="part2",
+    elements={
+        "TASK_CONTEXT": TASK_CONTEXT,
+        "TONE_CONTEXT": TONE_CONTEXT,
+        "INPUT_DATA": INPUT_DATA,
+        "EXAMPLES": EXAMPLES,
+        "TASK_DESCRIPTION": TASK_DESCRIPTION,
+        "PRECOGNITION": PRECOGNITION,
+        "OUTPUT_FORMATTING": OUTPUT_FORMATTING,
+    },
+    prefill=PREFILL,
+    output_path="harmonic_tessellation_refined.txt",
+)
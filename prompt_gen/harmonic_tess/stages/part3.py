@@ -0,0 +1,61 @@
+"""
+harmonic tesselations - generate the remaining ui components and managers
+"""
+
+from harmonic_tess.elements import TASK_CONTEXT, TONE_CONTEXT
+from harmonic_tess.prompt import FromFile, Stage
+
+##### Prompt element 4: Input data
+# Defines specific requirements for the harmonic tessellation system
+INPUT_DATA = FromFile("data/harmonic_tessellations_need_modularized_components.md")
+
+##### Prompt element 5: Examples
+# Demonstrates proper component structure and interaction patterns
+EXAMPLES = ""
+
+##### Prompt element 6: Task description
+TASK_DESCRIPTION = """
+
+Here is the chat history for developing react projects and components based on some specification documents.
+{INPUT_DATA}
+from this chat history, we are looking to generate the remaining component files for the harmonic tessellation system.  This includes managers.js and controls.js
+
+"""
+
+##### Prompt element 7: Immediate task
+
+##### Prompt element 8: Precognition
+PRECOGNITION = """Before providing your response, please:
+
+1.  Relevant quotes:
+  - Review the chat history line by line and store in xml tags all of the data related to harmonic tessellelation 
+  - ensure that it exhaustively determines the requirements of the remaining components.
+
+Only then proceed with your response."""
+
+##### Prompt element 9: Output formatting
+OUTPUT_FORMATTING = """
+
+Please provide a complete implementation of the remaining two components in react js:
+
+
+
+"""
+
+##### Prompt element 10: Prefill
+PREFILL = ""
+
+STAGE = Stage(
+    name="part3",
+    elements={
+        "TASK_CONTEXT": TASK_CONTEXT,
+        "TONE_CONTEXT": TONE_CONTEXT,
+        "INPUT_DATA": INPUT_DATA,
+        "EXAMPLES": EXAMPLES,
+        "TASK_DESCRIPTION": TASK_DESCRIPTION,
+        "PRECOGNITION": PRECOGNITION,
+        "OUTPUT_FORMATTING": OUTPUT_FORMATTING,
+    },
+    prefill=PREFILL,
+    output_path="harmonic_tessellation_ui_components_and_managers.txt",
+)
@@ -0,0 +1,373 @@
+"""
+harmonic tessellations - pattern stream server
+
+An asyncio HTTP/1.1 server (standard library only) that streams precomputed
+animation frames to thin clients, so they render instead of regenerating
+geometry inside `requestAnimationFrame`:
+
+    python -m harmonic_tess.stream_server --port 8770
+    GET /stream?shape=hexagon&complexity=5&transformation=rotation&tempo=1&fps=30
+    GET /stats
+
+A stream is a chunked response; every chunk is one message:
+
+    offset  size  field
+         0     4  magic b"HTFS"
+         4     1  kind (KIND_PATTERN, KIND_KEYFRAME, KIND_TRANSFORM, KIND_DELTA)
+         5     1  reserved
+         6     2  frame rate currently served (u16)
+         8     4  frame number (u32)
+        12     4  frame time in seconds (f32)
+        16     4  payload bytes P (u32)
+        20     4  audio event count E (u32)
+        24        payload, P bytes
+                  float32 events, E x 5 (time offset, frequency, amplitude, duration, voice)
+
+The first message carries the untransformed indexed mesh as a binary pattern
+file (`harmonic_tess.patternfile`), so faces travel once.  Every later frame
+is encoded by `harmonic_tess.delta.FrameEncoder` as a keyframe (all
+vertices), a transform (the matrix from the rest pose) or a sparse delta,
+whichever is smallest, with a keyframe at least every ``keyframe_interval``
+frames (a query parameter, default `KEYFRAME_INTERVAL`).  Audio
+events come from `harmonic_tess.notes.NoteScheduler`, one batch per note
+length.
+
+Frames are computed once per (shape, complexity, transformation, tempo) at
+`BASE_FPS` over one loop of the animation and shared by every client.  Tempo
+is rounded to `TEMPO_DIGITS` significant digits, sources are built off the
+event loop, and at most `MAX_SOURCES` are kept.  The client asks for a frame
+rate (clamped to `BASE_FPS`) and is sent frames on the wall clock; when a
+slow reader fills the socket buffer, `drain` blocks, late frames are skipped
+rather than queued, and a client that keeps falling behind is stepped down
+to half its frame rate.
+"""
+
+import asyncio
+import json
+import logging
+import struct
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from harmonic_tess.audio import NOTE_DURATION
+from harmonic_tess.delta import DELTA, KEYFRAME, KEYFRAME_INTERVAL, TRANSFORM, FrameEncoder
+from harmonic_tess.notes import NoteScheduler
+from harmonic_tess.pattern_cache import PatternCache
+from harmonic_tess.patternfile import pattern_bytes
+from harmonic_tess.tessellation import BASE_SHAPES, DEFAULT_SIZE, MAX_COMPLEXITY
+from harmonic_tess.transform import apply, reflection, rotation_frames
+
+MESSAGE_MAGIC = b"HTFS"
+MESSAGE_HEADER = struct.Struct("<4sBBHIfII")
+KIND_PATTERN = 0
+KIND_KEYFRAME = 1
+KIND_TRANSFORM = 2
+KIND_DELTA = 3
+FRAME_KINDS = {KEYFRAME: KIND_KEYFRAME, TRANSFORM: KIND_TRANSFORM, DELTA: KIND_DELTA}
+
+BASE_FPS = 60
+MIN_FPS = 5
+MAX_LOOP_SECONDS = 30.0
+WRITE_BUFFER_BYTES = 256 * 1024
+# tempo is rounded to this many significant digits (and capped), so query strings map onto few sources
+TEMPO_DIGITS = 2
+MAX_TEMPO = 8.0
+MAX_SOURCES = 32
+TRANSFORMATIONS = ("none", "rotation", "reflection")
+
+log = logging.getLogger(__name__)
+
+
+def encode_message(kind: int, frame: int, frame_time: float, payload=b"", events=None, fps=0) -> bytes:
+    events = np.zeros((0, 5), dtype="<f4") if events is None else np.ascontiguousarray(events, dtype="<f4")
+    return b"".join([
+        MESSAGE_HEADER.pack(MESSAGE_MAGIC, kind, 0, fps, frame, frame_time, len(payload), len(events)),
+        payload,
+        events.tobytes(),
+    ])
+
+
+def decode_message(data) -> dict:
+    magic, kind, _, fps, frame, frame_time, payload_bytes, event_count = MESSAGE_HEADER.unpack_from(data)
+    if magic != MESSAGE_MAGIC:
+        raise ValueError("not a harmonic tessellation stream message")
+    payload_end = MESSAGE_HEADER.size + payload_bytes
+    return {
+        "kind": kind,
+        "fps": fps,
+        "frame": frame,
+        "time": frame_time,
+        "payload": memoryview(data)[MESSAGE_HEADER.size:payload_end],
+        "events": np.frombuffer(data, dtype="<f4", count=event_count * 5, offset=payload_end).reshape(-1, 5),
+    }
+
+
+class FrameSource:
+    """
+    One animation loop, shared by every client streaming the same parameters.
+
+    Only the per-frame matrices are kept; keyframe vertices are computed
+    from the rest mesh when a client needs one (a loop at complexity 8 would
+    hold hundreds of MB of them).  Audio events are scheduled once for the
+    whole loop.
+    """
+
+    def __init__(self, cache: PatternCache, shape="triangle", complexity=3, transformation="rotation", tempo=1.0,
+                 size=DEFAULT_SIZE):
+        self.mesh = cache.get(shape, complexity, size)
+        self.angular_velocity = tempo if transformation != "none" else 0.0
+        self.before = reflection() if transformation == "reflection" else None
+        if self.angular_velocity:
+            loop_seconds = min(2.0 * np.pi / abs(self.angular_velocity), MAX_LOOP_SECONDS)
+            self.frame_count = max(int(round(loop_seconds * BASE_FPS)), 1)
+        else:
+            self.frame_count = 1
+        self.matrices = rotation_frames(self.frame_count, BASE_FPS, self.angular_velocity, before=self.before)
+        self.pattern_message = encode_message(
+            KIND_PATTERN, 0, 0.0,
+            pattern_bytes(self.mesh.vertices, self.mesh.faces, complexity=complexity, shape=shape,
+                          transformation=transformation, size=size),
+        )
+        self.events = self._schedule_audio()
+
+    def _schedule_audio(self) -> dict:
+        scheduler = NoteScheduler()
+        step = max(int(round(NOTE_DURATION * BASE_FPS)), 1)
+        triangles = self.mesh.triangles()
+        for index in range(0, self.frame_count, step):
+            scheduler.schedule(index / BASE_FPS, apply(triangles, self.matrices[index]))
+        # grouped only after the whole loop is scheduled, so stolen notes carry their shortened durations
+        events = {}
+        for event in scheduler.events:
+            events.setdefault(int(round(event.time * BASE_FPS)), []).append(
+                [0.0, event.frequency, event.amplitude, event.duration, event.voice])
+        return {index: np.array(rows, dtype="<f4") for index, rows in events.items()}
+
+    def vertices(self, index: int) -> np.ndarray:
+        return apply(self.mesh.vertices, self.matrices[index % self.frame_count])
+
+    def events_between(self, previous: int, index: int):
+        """Audio events due on base frames in (previous, index]; frame numbers keep counting past the loop."""
+        found = [events for frame, events in self.events.items()
+                 if (index - frame) // self.frame_count > (previous - frame) // self.frame_count]
+        return np.concatenate(found) if found else None
+
+
+class StreamServer:
+    def __init__(self, host="127.0.0.1", port=8770, cache=None, adaptive=True):
+        self.host = host
+        self.port = port
+        self.cache = cache or PatternCache()
+        self.adaptive = adaptive
+        self.sources = OrderedDict()
+        self._building = {}
+        self._responding = set()
+        self.started = time.monotonic()
+        self.clients = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.keyframes_sent = 0
+        self.bytes_sent = 0
+        self._server = None
+
+    async def source(self, shape, complexity, transformation, tempo) -> FrameSource:
+        """
+        The shared source for these parameters.
+
+        A new source takes up to seconds to build (a 30 s loop of audio
+        scheduling at complexity 8), so it is built on the default executor
+        while other clients keep streaming; concurrent requests for the same
+        key wait on the same build.  At most `MAX_SOURCES` are kept, least
+        recently used first out; clients already streaming an evicted source
+        keep their reference to it.
+        """
+        key = (shape, complexity, transformation, tempo)
+        if key in self.sources:
+            self.sources.move_to_end(key)
+            return self.sources[key]
+        future = self._building.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(
+                None, FrameSource, self.cache, shape, complexity, transformation, tempo)
+            future.add_done_callback(lambda done: self._built(key, done))
+            self._building[key] = future
+        # a client that disconnects while waiting does not cancel the build for the others
+        return await asyncio.shield(future)
+
+    def _built(self, key, future):
+        del self._building[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.sources[key] = future.result()
+        while len(self.sources) > MAX_SOURCES:
+            self.sources.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "clients": self.clients,
+            "sources": len(self.sources),
+            "sources_building": len(self._building),
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+            "keyframes_sent": self.keyframes_sent,
+            "bytes_sent": self.bytes_sent,
+            "cpu_seconds": time.process_time(),
+            "uptime": time.monotonic() - self.started,
+        }
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            try:
+                method, target, _ = request.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+                url = urlsplit(target)
+            except ValueError:
+                await self._respond(writer, 400, {"error": "malformed request line"})
+                return
+            if method != "GET":
+                await self._respond(writer, 405, {"error": "only GET is supported"})
+            elif url.path == "/stats":
+                await self._respond(writer, 200, self.stats())
+            elif url.path == "/stream":
+                await self._stream(writer, {name: values[-1] for name, values in parse_qs(url.query).items()})
+            else:
+                await self._respond(writer, 404, {"error": f"no route {url.path}"})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # the client went away
+        except Exception as err:
+            log.exception("request failed")
+            # a response that has started cannot be replaced; otherwise the client is told why
+            if writer not in self._responding:
+                try:
+                    await self._respond(writer, 500, {"error": repr(err)})
+                except ConnectionError:
+                    pass
+        finally:
+            self._responding.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, writer, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self._responding.add(writer)
+        writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+        await writer.drain()
+
+    async def _stream(self, writer, query: dict):
+        try:
+            shape = query.get("shape", "triangle")
+            complexity = int(query.get("complexity", 3))
+            transformation = query.get("transformation", "rotation")
+            tempo = float(query.get("tempo", 1.0))
+            if not np.isfinite(tempo):
+                raise ValueError("tempo must be a finite number")
+            tempo = float(f"{min(max(tempo, -MAX_TEMPO), MAX_TEMPO):.{TEMPO_DIGITS}g}")
+            fps = min(max(int(query.get("fps", BASE_FPS)), MIN_FPS), BASE_FPS)
+            frame_limit = int(query["frames"]) if "frames" in query else None
+            keyframe_interval = max(int(query.get("keyframe_interval", KEYFRAME_INTERVAL)), 1)
+            if shape not in BASE_SHAPES or transformation not in TRANSFORMATIONS:
+                raise ValueError(f"unknown shape or transformation: {shape!r}, {transformation!r}")
+            if not 1 <= complexity <= MAX_COMPLEXITY:
+                raise ValueError(f"complexity must be between 1 and {MAX_COMPLEXITY}")
+        except (KeyError, ValueError) as err:
+            await self._respond(writer, 400, {"error": str(err)})
+            return
+
+        source = await self.source(shape, complexity, transformation, tempo)
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_BYTES)
+        self._responding.add(writer)
+        writer.write(f"HTTP/1.1 200 OK\r\nContent-Type: application/octet-stream\r\nTransfer-Encoding: chunked\r\n"
+                     f"X-Frame-Rate: {fps}\r\nCache-Control: no-store\r\n\r\n".encode())
+        self.clients += 1
+        try:
+            await self._send_chunk(writer, source.pattern_message)
+            await self._send_frames(writer, source, fps, frame_limit, FrameEncoder(keyframe_interval))
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            self.clients -= 1
+
+    async def _send_chunk(self, writer, data: bytes):
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+        self.bytes_sent += len(data)
+
+    async def _send_frames(self, writer, source: FrameSource, fps: int, frame_limit, encoder: FrameEncoder):
+        loop = asyncio.get_running_loop()
+        start = window_start = loop.time()
+        frame = sent = skipped_recently = 0
+        previous_base = -1
+        while frame_limit is None or sent < frame_limit:
+            delay = start + frame / fps - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            due = int((loop.time() - start) * fps)
+            if due > frame:
+                # the client is behind: drop the frames it missed rather than queueing them
+                self.frames_skipped += due - frame
+                skipped_recently += due - frame
+                frame = due
+
+            base = frame * BASE_FPS // fps
+            index = base % source.frame_count
+            kind, payload = encoder.encode(lambda: source.vertices(index), source.matrices[index])
+            message = encode_message(FRAME_KINDS[kind], index, index / BASE_FPS, payload,
+                                     source.events_between(previous_base, base), fps)
+            await self._send_chunk(writer, message)
+            previous_base = base
+            self.frames_sent += 1
+            self.keyframes_sent += kind == KEYFRAME
+            sent += 1
+            frame += 1
+
+            now = loop.time()
+            if now - window_start >= 1.0:
+                if self.adaptive and skipped_recently > fps // 4 and fps // 2 >= MIN_FPS:
+                    fps //= 2
+                    frame = int((now - start) * fps) + 1
+                skipped_recently = 0
+                window_start = now
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream precomputed pattern animations over chunked HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8770, help="0 picks a free port")
+    parser.add_argument("--no-adaptive", action="store_true", help="never step slow clients down to a lower frame rate")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = await StreamServer(args.host, args.port, adaptive=not args.no_adaptive).start()
+        print(f"serving pattern streams on http://{server.host}:{server.port}", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+harmonic tessellations - vectorized tessellation engine
+
+Python counterpart of the client's `PatternManager` geometry.  Patterns are
+held as float32 triangle buffers of shape (N, 3, 2), one row per triangle,
+and each subdivision level is computed for the whole buffer at once instead
+of one `midpoint` call per vertex.
+
+Subdivision follows `PatternManager.subdivideTriangle`: every triangle
+(p1, p2, p3) with edge midpoints m1 = mid(p1, p2), m2 = mid(p2, p3),
+m3 = mid(p3, p1) is replaced by (p1, m1, m3), (m1, p2, m2), (m3, m2, p3),
+(m1, m2, m3), in that order, so `vertex_list` of a pattern matches the
+client's flat vertex array.
+"""
+
+import numpy as np
+
+BASE_SHAPES = ("triangle", "square", "hexagon")
+DEFAULT_SIZE = 100.0
+MAX_COMPLEXITY = 8
+# bumped whenever the generated geometry changes, so on-disk caches of it are not reused
+GEOMETRY_VERSION = 2
+
+
+def base_triangles(shape="triangle", size=DEFAULT_SIZE) -> np.ndarray:
+    """
+    The level-1 pattern for ``shape``, centred on the origin, as an (N, 3, 2) buffer.
+
+    The triangle matches `PatternManager.generateTriangle`; the square (two
+    triangles) and hexagon (a six-triangle fan) span ``size`` across.
+    """
+    half = size / 2
+    if shape == "triangle":
+        height = size * np.sqrt(3) / 2
+        triangles = [[[0, -height / 2], [-half, height / 2], [half, height / 2]]]
+    elif shape == "square":
+        triangles = [
+            [[-half, -half], [-half, half], [half, half]],
+            [[half, half], [half, -half], [-half, -half]],
+        ]
+    elif shape == "hexagon":
+        angles = np.arange(6) * np.pi / 3
+        corners = np.stack([np.cos(angles), np.sin(angles)], axis=1) * half
+        # reuse corner 0 to close the fan; cos/sin of 2 pi are not exactly 1/0, which would split the seam
+        triangles = [[[0, 0], corners[i], corners[(i + 1) % 6]] for i in range(6)]
+    else:
+        raise ValueError(f"unknown base shape {shape!r}; expected one of {', '.join(BASE_SHAPES)}")
+    return np.asarray(triangles, dtype=np.float32)
+
+
+def subdivide(triangles: np.ndarray) -> np.ndarray:
+    """One midpoint-subdivision level: (N, 3, 2) -> (4N, 3, 2)."""
+    p1, p2, p3 = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    m1 = (p1 + p2) * 0.5
+    m2 = (p2 + p3) * 0.5
+    m3 = (p3 + p1) * 0.5
+    children = np.stack([
+        np.stack([p1, m1, m3], axis=1),
+        np.stack([m1, p2, m2], axis=1),
+        np.stack([m3, m2, p3], axis=1),
+        np.stack([m1, m2, m3], axis=1),
+    ], axis=1)
+    return children.reshape(-1, 3, 2)
+
+
+def generate_pattern(shape="triangle", complexity=3, size=DEFAULT_SIZE) -> np.ndarray:
+    """
+    The untransformed pattern at ``complexity`` as an (N, 3, 2) float32 buffer.
+
+    Like `PatternManager.subdividePattern`, complexity 1 is the base shape and
+    every further level subdivides once, giving 4^(complexity - 1) triangles
+    per base triangle.
+    """
+    if complexity < 1:
+        raise ValueError("complexity must be at least 1")
+    triangles = base_triangles(shape, size)
+    for _ in range(complexity - 1):
+        triangles = subdivide(triangles)
+    return triangles
+
+
+def vertex_list(triangles: np.ndarray) -> np.ndarray:
+    """Flatten a triangle buffer to the (3N, 2) vertex array the client renders."""
+    return triangles.reshape(-1, 2)
@@ -0,0 +1,106 @@
+"""
+harmonic tessellations - affine transformations
+
+Transformations are 3x3 homogeneous matrices (float32).  Every constructor
+accepts scalars or arrays and returns matrices stacked along the leading
+axes, so a whole animation of T time steps is a single (T, 3, 3) array.
+`compose` multiplies matrices into one, and `apply` / `apply_batch` transform
+an entire vertex buffer with one matrix product plus the translation column,
+instead of the client's per-vertex `Math.cos` / `Math.sin`.
+"""
+
+import numpy as np
+
+DEFAULT_FPS = 60
+# `PatternManager.applyTransformation` rotates by Date.now() * 0.001, i.e. one radian per second
+DEFAULT_ANGULAR_VELOCITY = 1.0
+
+
+def _stack(rows, shape) -> np.ndarray:
+    matrices = np.zeros(shape + (3, 3), dtype=np.float32)
+    for (row, column), value in rows.items():
+        matrices[..., row, column] = value
+    matrices[..., 2, 2] = 1
+    return matrices
+
+
+def identity() -> np.ndarray:
+    return np.eye(3, dtype=np.float32)
+
+
+def rotation(angle) -> np.ndarray:
+    """Counter-clockwise rotation by ``angle`` radians about the origin."""
+    angle = np.asarray(angle, dtype=np.float64)
+    cos, sin = np.cos(angle), np.sin(angle)
+    return _stack({(0, 0): cos, (0, 1): -sin, (1, 0): sin, (1, 1): cos}, angle.shape)
+
+
+def reflection(axis="y") -> np.ndarray:
+    """Reflection in the y axis (x -> -x, as the client's 'reflection') or in the x axis."""
+    if axis == "y":
+        return _stack({(0, 0): -1, (1, 1): 1}, ())
+    if axis == "x":
+        return _stack({(0, 0): 1, (1, 1): -1}, ())
+    raise ValueError(f"unknown reflection axis {axis!r}")
+
+
+def scale(sx, sy=None) -> np.ndarray:
+    sx = np.asarray(sx, dtype=np.float64)
+    sy = sx if sy is None else np.asarray(sy, dtype=np.float64)
+    sx, sy = np.broadcast_arrays(sx, sy)
+    return _stack({(0, 0): sx, (1, 1): sy}, sx.shape)
+
+
+def translation(tx, ty) -> np.ndarray:
+    tx, ty = np.broadcast_arrays(np.asarray(tx, dtype=np.float64), np.asarray(ty, dtype=np.float64))
+    return _stack({(0, 0): 1, (1, 1): 1, (0, 2): tx, (1, 2): ty}, tx.shape)
+
+
+def compose(*matrices) -> np.ndarray:
+    """A single matrix applying ``matrices`` in the order given (the first is applied first)."""
+    result = identity()
+    for matrix in matrices:
+        result = np.matmul(matrix, result)
+    return result
+
+
+def client_transformation(transformation="none", angle=0.0) -> np.ndarray:
+    """The Controls transformation types: 'rotation' by ``angle``, 'reflection', or 'none'."""
+    if transformation == "rotation":
+        return rotation(angle)
+    if transformation == "reflection":
+        return reflection()
+    if transformation == "none":
+        return identity()
+    raise ValueError(f"unknown transformation {transformation!r}")
+
+
+def apply(vertices: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Transform a (..., 2) vertex buffer by one 3x3 matrix."""
+    return (vertices @ matrix[:2, :2].T + matrix[:2, 2]).astype(np.float32, copy=False)
+
+
+def apply_batch(vertices: np.ndarray, matrices: np.ndarray) -> np.ndarray:
+    """Transform an (N, 2) vertex buffer by (T, 3, 3) matrices, giving a (T, N, 2) block."""
+    homogeneous = np.concatenate([vertices, np.ones((len(vertices), 1), dtype=vertices.dtype)], axis=1)
+    return np.matmul(homogeneous, np.swapaxes(matrices[:, :2, :], 1, 2)).astype(np.float32, copy=False)
+
+
+def frame_times(frame_count: int, fps=DEFAULT_FPS, start=0.0) -> np.ndarray:
+    return start + np.arange(frame_count, dtype=np.float64) / fps
+
+
+def rotation_frames(frame_count: int, fps=DEFAULT_FPS, angular_velocity=DEFAULT_ANGULAR_VELOCITY, start=0.0,
+                    before=None, after=None) -> np.ndarray:
+    """
+    (T, 3, 3) matrices rotating at ``angular_velocity`` rad/s over ``frame_count`` frames.
+
+    ``before`` / ``after`` are fixed matrices (scale, reflection, translation,
+    ...) composed on either side of the per-frame rotation.
+    """
+    matrices = rotation(frame_times(frame_count, fps, start) * angular_velocity)
+    if before is not None:
+        matrices = np.matmul(matrices, before)
+    if after is not None:
+        matrices = np.matmul(after, matrices)
+    return matrices
@@ -0,0 +1,46 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from harmonic_tess.audio import (
+    ATTACK, NOTE_DURATION, PEAK_GAIN, envelope_at, frequency_bins, note_frequencies, render_notes, render_pattern,
+    wav_bytes,
+)
+
+SAMPLE_RATE = 8000
+
+
+def render_per_vertex(count, sample_rate=SAMPLE_RATE):
+    """One oscillator per vertex, as `AudioManager.scheduleNotes` does it."""
+    t = np.arange(int(round(NOTE_DURATION * sample_rate))) / sample_rate
+    mix = sum(PEAK_GAIN * np.sin(2 * np.pi * frequency * t) for frequency in note_frequencies(count))
+    return mix * envelope_at(t)
+
+
+def test_binned_render_matches_one_oscillator_per_vertex():
+    samples = render_pattern(np.zeros((23, 2)), sample_rate=SAMPLE_RATE, master_gain=1.0)
+    np.testing.assert_allclose(samples, render_per_vertex(23), atol=1e-5)
+
+
+def test_vertices_on_one_pitch_share_a_bin():
+    frequencies, amplitudes = frequency_bins(note_frequencies(12))
+    assert len(frequencies) == 5
+    assert amplitudes.sum() == pytest.approx(12 * PEAK_GAIN)
+
+
+def test_envelope_shape():
+    assert envelope_at(0.0) == 0.0
+    assert envelope_at(ATTACK) == pytest.approx(1.0)
+    assert envelope_at(NOTE_DURATION - 1e-9) == pytest.approx(0.01, rel=1e-3)
+    assert envelope_at(NOTE_DURATION) == 0.0
+
+
+def test_wav_header_and_clipping():
+    samples = render_notes([440.0], [2.0], sample_rate=SAMPLE_RATE)
+    with wave.open(io.BytesIO(wav_bytes(samples, SAMPLE_RATE))) as f:
+        assert (f.getnchannels(), f.getsampwidth(), f.getframerate(), f.getnframes()) == (1, 2, SAMPLE_RATE,
+                                                                                          len(samples))
+        pcm = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+    assert pcm.max() == 32767
@@ -0,0 +1,34 @@
+import pytest
+
+from harmonic_tess.backends import Cassette, create_backend, synthetic_response
+
+REQUEST = dict(model="claude-3-haiku-20240307", max_tokens=32, system="",
+               messages=[{"role": "user", "content": "hello"}, {"role": "assistant", "content": "<a>"}])
+
+
+def test_mock_responses_are_deterministic_and_sized(tmp_path):
+    backend = create_backend("mock", cassette=tmp_path / "cassette.jsonl")
+    first = backend.messages.create(**REQUEST)
+    assert first.usage.output_tokens == 32
+    assert first.content[0].text == backend.messages.create(**REQUEST).content[0].text
+    assert first.content[0].text != backend.messages.create(**dict(REQUEST, max_tokens=31)).content[0].text
+
+
+def test_replay_serves_the_cassette_and_streams_it(tmp_path):
+    cassette = Cassette(tmp_path / "cassette.jsonl")
+    cassette.save(REQUEST, synthetic_response(REQUEST, output_tokens=5))
+    backend = create_backend("replay", cassette=tmp_path / "cassette.jsonl")
+
+    message = backend.messages.create(**REQUEST)
+    with backend.messages.stream(**REQUEST) as stream:
+        streamed = "".join(stream.text_stream)
+        assert stream.get_final_message().content[0].text == streamed
+    assert streamed == message.content[0].text
+
+    with pytest.raises(LookupError, match="no recorded response"):
+        backend.messages.create(**dict(REQUEST, max_tokens=8))
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="unknown backend"):
+        create_backend("offline")
@@ -0,0 +1,83 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from harmonic_tess import batch
+from harmonic_tess.cache import CompletionCache
+from harmonic_tess.ratelimit import RequestScheduler
+
+
+def write_variants(path, *variants):
+    path.write_text("".join(json.dumps(variant) + "\n" for variant in variants))
+    return path
+
+
+@pytest.mark.parametrize("variant_id", ["", "has space", 7, None])
+def test_load_variants_rejects_bad_ids(tmp_path, variant_id):
+    path = write_variants(tmp_path / "variants.jsonl", {"variant_id": variant_id, "stage": "part1"})
+    with pytest.raises(ValueError, match="variant_id must match"):
+        batch.load_variants(path)
+
+
+def test_load_variants_rejects_duplicate_ids(tmp_path):
+    path = write_variants(tmp_path / "variants.jsonl", {"variant_id": "a", "stage": "part1"},
+                          {"variant_id": "a", "stage": "part2"})
+    with pytest.raises(ValueError, match="first used on line 1"):
+        batch.load_variants(path)
+
+
+def message(text, stop_reason="end_turn"):
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)], stop_reason=stop_reason,
+                           usage=SimpleNamespace(output_tokens=10))
+
+
+class FakeBatches:
+    def __init__(self, entries):
+        self.entries = entries
+        self.requests = None
+
+    def create(self, requests):
+        self.requests = requests
+        return SimpleNamespace(id="batch-1", processing_status="ended")
+
+    def results(self, batch_id):
+        return [SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type="succeeded", message=result))
+                for custom_id, result in self.entries]
+
+
+def test_failed_continuation_only_loses_its_own_variant(tmp_path, monkeypatch):
+    params = {"model": "m", "system_prompt": "", "prompt": "p", "prefill": "", "max_tokens": 10, "token_budget": 100,
+              "temperature": 0.0}
+    expanded = [{"variant_id": name, "stage": "part1", "params": dict(params, prompt=name)} for name in "abc"]
+    batches = FakeBatches([("a", message("done")), ("b", message("cut", "max_tokens")),
+                           ("c", message("cut", "max_tokens"))])
+
+    def continue_completion(params, text, generated_tokens):
+        if params["prompt"] == "b":
+            raise RuntimeError("overloaded")
+        return text + " and continued"
+
+    monkeypatch.setattr(batch, "get_cache", lambda: CompletionCache(tmp_path))
+    monkeypatch.setattr(batch, "get_client", lambda: SimpleNamespace(messages=SimpleNamespace(batches=batches)))
+    monkeypatch.setattr(batch, "get_scheduler", RequestScheduler)
+    monkeypatch.setattr(batch, "record_usage", lambda *args, **kwargs: None)
+    monkeypatch.setattr(batch, "continue_completion", continue_completion)
+
+    results = batch.run_batch(expanded)
+    assert [request["custom_id"] for request in batches.requests] == ["a", "b", "c"]
+    assert results["a"] == {"status": "succeeded", "text": "done"}
+    assert results["b"]["status"] == "errored" and "overloaded" in results["b"]["error"]
+    assert results["c"] == {"status": "succeeded", "text": "cut and continued"}
+
+
+@pytest.mark.parametrize("backend, mode", [("mock", "pool"), ("replay", "pool"), ("record", "batch")])
+def test_mode_defaults_to_what_the_backend_supports(tmp_path, monkeypatch, backend, mode):
+    used = []
+    monkeypatch.setenv("HARMONIC_TESS_BACKEND", backend)
+    monkeypatch.setattr(batch, "run_pool", lambda expanded, **kwargs: used.append("pool") or {})
+    monkeypatch.setattr(batch, "run_batch", lambda expanded, **kwargs: used.append("batch") or {})
+    variants = write_variants(tmp_path / "variants.jsonl", {"variant_id": "a", "stage": "part1"})
+
+    batch.main([str(variants), "-o", str(tmp_path / "results.jsonl")])
+    assert used == [mode]
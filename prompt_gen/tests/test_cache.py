@@ -0,0 +1,47 @@
+import os
+
+from harmonic_tess.cache import CompletionCache
+
+
+def test_get_or_create_calls_once_and_persists(tmp_path):
+    calls = []
+
+    def create(**params):
+        calls.append(params)
+        return f"completion for {params['prompt']}"
+
+    cache = CompletionCache(tmp_path)
+    assert cache.get_or_create(create, prompt="a", temperature=0.0) == "completion for a"
+    assert cache.get_or_create(create, prompt="a", temperature=0.0) == "completion for a"
+    assert len(calls) == 1
+
+    # a fresh instance (another process) reads the entry from disk
+    assert CompletionCache(tmp_path).get_or_create(create, prompt="a", temperature=0.0) == "completion for a"
+    assert len(calls) == 1
+    # any parameter change is a different key
+    cache.get_or_create(create, prompt="a", temperature=0.5)
+    assert len(calls) == 2
+
+
+def test_memory_hit_refreshes_disk_mtime(tmp_path):
+    cache = CompletionCache(tmp_path)
+    key = cache.make_key(prompt="a")
+    cache.put(key, "text", prompt="a")
+    os.utime(cache._path(key), (1, 1))
+    assert cache.get(key) == "text"
+    assert cache._path(key).stat().st_mtime > 1
+
+
+def test_disk_eviction_keeps_recently_used_entries(tmp_path):
+    cache = CompletionCache(tmp_path, max_entries=2)
+    keys = [cache.make_key(prompt=str(n)) for n in range(3)]
+    cache.put(keys[0], "0", prompt="0")
+    cache.put(keys[1], "1", prompt="1")
+    os.utime(cache._path(keys[0]), (1, 1))
+    os.utime(cache._path(keys[1]), (2, 2))
+    cache.get(keys[0])  # memory hit: entry 0 becomes the most recently used
+    cache.put(keys[2], "2", prompt="2")
+
+    assert cache._path(keys[0]).exists()
+    assert not cache._path(keys[1]).exists()
+    assert cache.evictions == 1
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+
+from harmonic_tess import client, metrics
+
+DOCUMENT = "<answer>\nalpha beta\n\ngamma   delta\n</answer>\n"
+PIECE = 9
+
+
+class ScriptedStream:
+    def __init__(self, message):
+        self.message = message
+
+    @property
+    def text_stream(self):
+        text = self.message.content[0].text
+        return (text[start:start + 3] for start in range(0, len(text), 3))
+
+    def get_final_message(self):
+        return self.message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class ScriptedModel:
+    """Writes DOCUMENT after whatever the prefill holds, PIECE characters per response."""
+
+    def __init__(self):
+        self.prefills = []
+        self.messages = SimpleNamespace(create=self.create, stream=lambda **request: ScriptedStream(
+            self.create(**request)))
+
+    def create(self, **request):
+        prefill = request["messages"][-1]["content"]
+        assert prefill == prefill.rstrip() or not self.prefills, "continuation prefill ends in whitespace"
+        assert DOCUMENT.startswith(prefill)
+        self.prefills.append(prefill)
+        text = DOCUMENT[len(prefill):len(prefill) + PIECE]
+        done = len(prefill) + PIECE >= len(DOCUMENT)
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)],
+                               stop_reason="end_turn" if done else "max_tokens",
+                               usage=SimpleNamespace(input_tokens=10, output_tokens=2))
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setattr(metrics, "get_metrics", lambda: None)
+    model = ScriptedModel()
+    client.set_client(model)
+    yield model
+    client.set_client(None)
+
+
+def completion_args():
+    return dict(prompt="write it", prefill="<answer>", max_tokens=2, token_budget=1000, use_cache=False)
+
+
+def test_truncated_completion_is_continued_seamlessly(model):
+    assert "<answer>" + client.get_completion(**completion_args()) == DOCUMENT
+    assert len(model.prefills) > 3
+
+
+def test_stream_matches_blocking_completion(model):
+    chunks = list(client.stream_completion(**completion_args()))
+    assert "<answer>" + "".join(chunks) == DOCUMENT
+    # whitespace the continuation regenerates is never yielded twice
+    assert all(chunk for chunk in chunks)
+
+
+def test_stream_resumes_after_received_text(model):
+    received = DOCUMENT[len("<answer>"):len("<answer>") + 14]
+    chunks = list(client.stream_completion(resume_text=received.rstrip(), **completion_args()))
+    assert "<answer>" + received.rstrip() + "".join(chunks) == DOCUMENT
+    assert model.prefills[0] == "<answer>" + received.rstrip()
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from harmonic_tess.delta import DELTA, KEYFRAME, TRANSFORM, FrameDecoder, FrameEncoder
+from harmonic_tess.mesh import generate_mesh
+from harmonic_tess.transform import apply, rotation_frames
+
+
+@pytest.fixture
+def rest():
+    return generate_mesh("triangle", 4).vertices.astype(np.float32)
+
+
+def test_rotation_is_sent_as_transforms(rest):
+    encoder, decoder = FrameEncoder(keyframe_interval=10), FrameDecoder(rest)
+    kinds = []
+    for matrix in rotation_frames(25, 60, 1.0):
+        kind, payload = encoder.encode(lambda: apply(rest, matrix), matrix)
+        kinds.append(kind)
+        np.testing.assert_allclose(decoder.decode(kind, payload), apply(rest, matrix), atol=1e-5)
+    assert kinds == ([KEYFRAME] + [TRANSFORM] * 9) * 2 + [KEYFRAME] + [TRANSFORM] * 4
+
+
+def test_sparse_changes_are_sent_as_deltas(rest):
+    encoder, decoder = FrameEncoder(), FrameDecoder(rest)
+    frame = rest.copy()
+    decoder.decode(*encoder.encode(frame))
+    for step in range(5):
+        frame = frame.copy()
+        frame[step * 3] += 0.5
+        kind, payload = encoder.encode(frame)
+        assert kind == DELTA and len(payload) == 4 + 12
+        np.testing.assert_array_equal(decoder.decode(kind, payload), frame)
+
+
+def test_dense_changes_fall_back_to_a_keyframe(rest):
+    encoder = FrameEncoder()
+    encoder.encode(rest)
+    kind, _ = encoder.encode(rest + 1.0)
+    assert kind == KEYFRAME
+
+
+def test_delta_after_a_transform_is_relative_to_the_transformed_pose(rest):
+    matrices = rotation_frames(3, 60, 1.0)
+    encoder, decoder = FrameEncoder(), FrameDecoder(rest)
+    decoder.decode(*encoder.encode(lambda: apply(rest, matrices[0]), matrices[0]))
+    decoder.decode(*encoder.encode(lambda: apply(rest, matrices[1]), matrices[1]))
+    # a frame without a matrix cannot be a delta against vertices the encoder never saw
+    frame = apply(rest, matrices[1])
+    frame[0] += 1.0
+    kind, payload = encoder.encode(frame)
+    assert kind == KEYFRAME
+    np.testing.assert_array_equal(decoder.decode(kind, payload), frame)
+
+
+def test_delta_before_keyframe_is_rejected(rest):
+    with pytest.raises(ValueError, match="before a keyframe"):
+        FrameDecoder(rest).decode(DELTA, b"\0\0\0\0")
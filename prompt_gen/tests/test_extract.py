@@ -0,0 +1,75 @@
+import logging
+
+from harmonic_tess.extract import CodeBlock, ComponentWriter, Section, StreamingExtractor
+
+RESPONSE = """<audio_system>
+Notes on the audio graph, as a list:
+<ul><li>one oscillator per voice</li></ul>
+```javascript
+/**
+ * AudioManager.js
+ */
+import './Controls.css';
+export default class AudioManager {}
+```
+</audio_system>
+<interface_controls>
+```js
+const Controls = () => <div>controls</div>;
+```
+</interface_controls>
+"""
+
+
+def feed_in_pieces(text, size=7) -> list:
+    extractor = StreamingExtractor()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(extractor.feed(text[start:start + size]))
+    return events + extractor.close()
+
+
+def test_streamed_and_whole_extraction_agree():
+    assert feed_in_pieces(RESPONSE) == StreamingExtractor().extract(RESPONSE)
+
+
+def test_only_prompt_section_tags_open_sections():
+    events = StreamingExtractor().extract(RESPONSE)
+    sections = [event for event in events if isinstance(event, Section)]
+    assert [section.name for section in sections] == ["audio_system", "interface_controls"]
+    assert "<ul><li>one oscillator per voice</li></ul>" in sections[0].text
+
+    blocks = [event for event in events if isinstance(event, CodeBlock)]
+    assert [block.path for block in blocks] == [("audio_system",), ("interface_controls",)]
+    assert blocks[0].filename == "AudioManager.js"
+    assert blocks[1].filename is None
+
+
+def test_components_are_staged_by_default(tmp_path, caplog):
+    target = tmp_path / "components"
+    existing = target / "managers" / "AudioManager.js"
+    existing.parent.mkdir(parents=True)
+    existing.write_text("// a longer hand-written manager\n" * 50)
+    writer = ComponentWriter(target, staging_dir=tmp_path / "staged")
+
+    with caplog.at_level(logging.WARNING):
+        for event in StreamingExtractor().extract(RESPONSE):
+            writer(event)
+
+    assert existing.read_text() == "// a longer hand-written manager\n" * 50
+    assert "existing component has 50" in caplog.text
+    assert sorted(path.relative_to(tmp_path).as_posix() for path in writer.written) == [
+        "staged/managers/AudioManager.js", "staged/ui/Controls.js"]
+    assert (tmp_path / "staged" / "ui" / "Controls.js").read_text().startswith("const Controls")
+
+
+def test_overwrite_writes_into_the_tree(tmp_path):
+    target = tmp_path / "components"
+    (target / "managers").mkdir(parents=True)
+    (target / "managers" / "AudioManager.js").write_text("old\n")
+    writer = ComponentWriter(target, overwrite=True, staging_dir=tmp_path / "staged")
+    for event in StreamingExtractor().extract(RESPONSE):
+        writer(event)
+
+    assert "export default class AudioManager" in (target / "managers" / "AudioManager.js").read_text()
+    assert not (tmp_path / "staged").exists()
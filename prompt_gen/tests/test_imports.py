@@ -0,0 +1,25 @@
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from harmonic_tess.bench import HEAVY_MODULES, IMPORT_BUDGETS
+from harmonic_tess.cli import COMMANDS
+
+
+@pytest.mark.parametrize("command", sorted(COMMANDS))
+def test_every_command_module_exists(command):
+    assert importlib.util.find_spec(COMMANDS[command][0]) is not None
+
+
+@pytest.mark.parametrize("module", list(IMPORT_BUDGETS))
+def test_entry_points_do_not_import_heavy_modules(module):
+    # timings are left to `bench imports`; what an import pulls in is deterministic
+    script = f"import json, sys; import {module}; print(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=Path(__file__).resolve().parents[1]).stdout
+    loaded = set(json.loads(output))
+    assert [name for name in HEAVY_MODULES if name in loaded] == []
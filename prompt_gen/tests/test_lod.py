@@ -0,0 +1,33 @@
+import numpy as np
+
+from harmonic_tess.lod import LODSelector, PatternPyramid
+from harmonic_tess.mesh import generate_mesh
+
+
+def test_levels_share_the_finest_vertex_array():
+    pyramid = PatternPyramid("square", max_complexity=5)
+    for complexity in range(1, 6):
+        level = pyramid.level(complexity)
+        mesh = generate_mesh("square", complexity)
+        assert np.shares_memory(level.vertices, pyramid.vertices)
+        np.testing.assert_array_equal(level.triangles(), mesh.triangles())
+
+
+def test_selects_the_highest_level_within_budget():
+    selector = LODSelector(PatternPyramid("triangle", max_complexity=6))
+    for complexity in range(1, 7):
+        selector.costs[complexity] = 4.0 ** (complexity - 3)  # 1 ms at level 3
+    assert selector.select(frame_budget=16.0) == 5
+    assert selector.select(frame_budget=0.01) == 1
+    assert selector.select(frame_budget=16.0, vertex_budget=100) == 4
+    assert selector.select(frame_budget=16.0, max_complexity=4) == 4
+
+
+def test_observed_frame_times_step_the_level_down():
+    selector = LODSelector(PatternPyramid("triangle", max_complexity=6), smoothing=1.0)
+    selector.observe(3, 1.0)
+    # unmeasured levels are extrapolated by face count: level 6 is 64 x level 3
+    assert selector.estimated_cost(6) == 64.0
+    assert selector.select(frame_budget=16.0) == 5
+    selector.observe(5, 40.0)
+    assert selector.select(frame_budget=16.0) == 4
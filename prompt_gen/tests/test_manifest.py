@@ -0,0 +1,82 @@
+import logging
+
+import pytest
+
+from harmonic_tess import metrics, pipeline
+from harmonic_tess.manifest import StageManifest
+from harmonic_tess.prompt import FromFile, Stage
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(metrics, "get_metrics", lambda: None)
+
+    def get_completion(prompt, use_cache=True, **kwargs):
+        calls.append(use_cache)
+        return f"completion {len(calls)}"
+
+    monkeypatch.setattr(pipeline, "get_completion", get_completion)
+    return calls
+
+
+@pytest.fixture
+def stage(tmp_path):
+    (tmp_path / "input.txt").write_text("first input")
+    return Stage("test", {"IMMEDIATE_TASK": "do it", "TASK_DESCRIPTION": FromFile("input.txt")},
+                 output_path="output.txt")
+
+
+def run(stage, tmp_path, **kwargs):
+    return pipeline.run_stage(stage, base_dir=tmp_path, echo=False, **kwargs)
+
+
+def test_unchanged_inputs_are_skipped(tmp_path, stage, calls):
+    assert run(stage, tmp_path) == "completion 1"
+    assert run(stage, tmp_path) == "completion 1"
+    assert len(calls) == 1
+
+    (tmp_path / "input.txt").write_text("second input")
+    assert run(stage, tmp_path) == "completion 2"
+    assert (tmp_path / "output.txt").read_text() == "completion 2"
+
+
+def test_deleted_output_is_restored(tmp_path, stage, calls):
+    run(stage, tmp_path)
+    (tmp_path / "output.txt").unlink()
+    assert run(stage, tmp_path) == "completion 1"
+    assert (tmp_path / "output.txt").read_text() == "completion 1"
+    assert len(calls) == 1
+
+
+def test_edited_output_is_kept(tmp_path, stage, calls, caplog):
+    run(stage, tmp_path)
+    (tmp_path / "output.txt").write_text("hand edited")
+    (tmp_path / "input.txt").write_text("second input")
+
+    with caplog.at_level(logging.WARNING):
+        assert run(stage, tmp_path) == "hand edited"
+    assert "was edited" in caplog.text
+    assert (tmp_path / "output.txt").read_text() == "hand edited"
+    assert len(calls) == 1
+    assert StageManifest(tmp_path).edited(tmp_path / "output.txt")
+
+
+def test_force_reruns_without_the_completion_cache(tmp_path, stage, calls):
+    run(stage, tmp_path)
+    (tmp_path / "output.txt").write_text("hand edited")
+    assert run(stage, tmp_path, force=True) == "completion 2"
+    assert calls == [True, False]
+    assert (tmp_path / "output.txt").read_text() == "completion 2"
+
+
+def test_continued_output_keeps_the_edit(tmp_path, calls):
+    (tmp_path / "document.txt").write_text("draft")
+    stage = Stage("test", {"IMMEDIATE_TASK": "continue", "TASK_DESCRIPTION": "the document"},
+                  prefill=FromFile("document.txt"), output_path="document.txt")
+    run(stage, tmp_path)
+    assert (tmp_path / "document.txt").read_text() == "draftcompletion 1"
+
+    (tmp_path / "document.txt").write_text("draft, edited")
+    run(stage, tmp_path)
+    assert (tmp_path / "document.txt").read_text() == "draft, editedcompletion 2"
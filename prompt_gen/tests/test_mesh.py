@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from harmonic_tess.mesh import Mesh, generate_mesh, subdivide_mesh
+from harmonic_tess.tessellation import BASE_SHAPES, generate_pattern
+
+
+@pytest.mark.parametrize("shape", BASE_SHAPES)
+def test_mesh_expands_to_the_triangle_pattern(shape):
+    for complexity in (1, 3, 5):
+        mesh = generate_mesh(shape, complexity)
+        np.testing.assert_array_equal(mesh.triangles(), generate_pattern(shape, complexity))
+
+
+@pytest.mark.parametrize("shape", BASE_SHAPES)
+def test_shared_vertices_are_stored_once(shape):
+    mesh = generate_mesh(shape, 5)
+    assert len(np.unique(mesh.vertices, axis=0)) == len(mesh.vertices)
+    assert mesh.faces.dtype == np.int32 and mesh.faces.max() < len(mesh.vertices)
+
+
+def test_subdivision_appends_midpoints_after_existing_vertices():
+    coarse = generate_mesh("square", 3)
+    fine = subdivide_mesh(coarse)
+    np.testing.assert_array_equal(fine.vertices[:len(coarse.vertices)], coarse.vertices)
+    assert len(fine.faces) == 4 * len(coarse.faces)
+
+
+def test_from_triangles_round_trips():
+    triangles = generate_pattern("triangle", 3)
+    np.testing.assert_array_equal(Mesh.from_triangles(triangles).triangles(), triangles)
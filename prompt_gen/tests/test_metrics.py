@@ -0,0 +1,52 @@
+import pytest
+
+from harmonic_tess import metrics
+from harmonic_tess.metrics import MetricsStore, estimate_cost, percentile, summarize_calls, summarize_elements
+
+
+def call(stage, latency, variant=None, **tokens):
+    row = dict(kind="call", stage=stage, time=0.0, latency=latency, ttft=None, input_tokens=100, output_tokens=10,
+               cache_read_input_tokens=0, cache_creation_input_tokens=0, cost=0.5)
+    if variant:
+        row["variant"] = variant
+    return dict(row, **tokens)
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".sqlite"])
+def test_store_round_trip(tmp_path, suffix):
+    store = MetricsStore(tmp_path / f"calls{suffix}")
+    store.record(call("part1", 1.0))
+    store.record(dict(kind="prompt", stage="part1", time=1.0, elements={"INPUT_DATA": 40, "TOTAL": 40}))
+    assert [row["kind"] for row in store.rows()] == ["call", "prompt"]
+    assert store.rows("prompt")[0]["elements"] == {"INPUT_DATA": 40, "TOTAL": 40}
+
+
+def test_labels_nest_per_block():
+    with metrics.context(stage="part2"):
+        with metrics.context(variant="a"):
+            assert metrics.current_labels() == {"stage": "part2", "variant": "a"}
+        assert metrics.current_labels() == {"stage": "part2"}
+    assert metrics.current_labels() == {}
+
+
+def test_cost_estimate():
+    assert estimate_cost("claude-3-opus-20240229", input_tokens=1_000_000) == pytest.approx(15.0)
+    assert estimate_cost("claude-3-5-haiku-latest", output_tokens=1_000_000, batch=True) == pytest.approx(2.0)
+    assert estimate_cost("claude-3-haiku-20240307", cache_read_input_tokens=1_000_000) == pytest.approx(0.025)
+    assert estimate_cost("unknown-model", input_tokens=10) is None
+
+
+def test_summaries():
+    rows = [call("part1", latency) for latency in (1.0, 2.0, 3.0, 10.0)] + [call("part2", 5.0, variant="a")]
+    part1, part2 = summarize_calls(rows)
+    assert (part1["stage"], part1["calls"], part1["p50_latency"], part1["p95_latency"]) == ("part1", 4, 2.0, 10.0)
+    assert part1["cost_usd"] == 2.0 and part2["input"] == 100
+    assert [row["variant"] for row in summarize_calls(rows, by_variant=True)] == ["-", "a"]
+    assert percentile([], 50) is None
+
+    prompts = [dict(stage="part1", elements={"INPUT_DATA": 40, "EXAMPLES": 10}),
+               dict(stage="part1", elements={"INPUT_DATA": 60, "EXAMPLES": 10})]
+    assert summarize_elements(prompts) == [
+        {"stage": "part1", "element": "INPUT_DATA", "runs": 2, "tokens": 50},
+        {"stage": "part1", "element": "EXAMPLES", "runs": 2, "tokens": 10},
+    ]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from harmonic_tess.audio import PEAK_GAIN
+from harmonic_tess.mesh import generate_mesh
+from harmonic_tess.notes import NoteScheduler, geometry_notes, merge_pitches
+
+
+def test_pattern_loudness_does_not_grow_with_subdivision():
+    for complexity in (2, 5):
+        frequencies, amplitudes = geometry_notes(generate_mesh("hexagon", complexity).triangles())
+        assert amplitudes.sum() == pytest.approx(PEAK_GAIN)
+        assert len(frequencies) == len(amplitudes)
+
+
+def test_close_pitches_merge_loudest_first():
+    frequencies, amplitudes = merge_pitches([220.0, 221.0, 330.0], [0.1, 0.3, 0.2])
+    assert len(frequencies) == 2
+    np.testing.assert_allclose(amplitudes, [0.4, 0.2])
+    assert 220.0 < frequencies[0] < 221.0 and frequencies[1] == pytest.approx(330.0)
+
+
+def test_voice_pool_is_bounded_and_steals_the_quietest():
+    scheduler = NoteScheduler(max_voices=2)
+    scheduler.schedule_notes(0.0, [220.0, 330.0], [0.2, 0.05])
+    # a louder note steals the quieter voice and cuts it short; a quieter one is dropped
+    new = scheduler.schedule_notes(0.2, [440.0, 550.0], [0.1, 0.01])
+    assert [event.frequency for event in new] == [440.0]
+    assert new[0].voice == 1
+    assert scheduler.events[1].duration == pytest.approx(0.2)
+    assert (scheduler.stolen, scheduler.dropped) == (1, 1)
+
+
+def test_whole_pattern_fits_the_voice_pool():
+    scheduler = NoteScheduler(max_voices=16)
+    events = scheduler.schedule(0.0, generate_mesh("triangle", 6).triangles())
+    assert 0 < len(events) <= 16
+    assert len({event.voice for event in events}) == len(events)
+    assert scheduler.event_array().shape == (len(events), 5)
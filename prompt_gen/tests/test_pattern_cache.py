@@ -0,0 +1,43 @@
+import numpy as np
+
+from harmonic_tess.mesh import generate_mesh
+from harmonic_tess.pattern_cache import PatternCache
+from harmonic_tess.transform import apply, rotation, rotation_frames
+
+
+def test_memory_then_disk_hits(tmp_path):
+    cache = PatternCache(tmp_path)
+    mesh = cache.get("square", 4)
+    assert cache.get("square", 4) is mesh
+    assert cache.stats()["misses"] == 1 and cache.stats()["memory_hits"] == 1
+
+    # another process finds the pattern file
+    other = PatternCache(tmp_path)
+    np.testing.assert_array_equal(other.get("square", 4).faces, mesh.faces)
+    assert other.stats()["disk_hits"] == 1
+
+
+def test_transformations_are_applied_per_request(tmp_path):
+    cache = PatternCache(tmp_path)
+    mesh = generate_mesh("triangle", 3)
+    first = cache.transformed("triangle", 3, "rotation", angle=0.3)
+    second = cache.transformed("triangle", 3, "rotation", angle=0.6)
+    np.testing.assert_allclose(first, apply(mesh.vertices, rotation(0.3))[mesh.faces], atol=1e-5)
+    assert not np.allclose(first, second)
+
+    matrices = rotation_frames(4)
+    block = cache.animation(matrices, "triangle", 3)
+    np.testing.assert_allclose(block[2], apply(mesh.vertices, matrices[2]), atol=1e-5)
+
+
+def test_memory_and_disk_are_bounded(tmp_path):
+    one = generate_mesh("hexagon", 5).nbytes
+    cache = PatternCache(tmp_path, memory_bytes=one * 1.5, disk_bytes=one * 1.5)
+    cache.get("hexagon", 5)
+    cache.get("square", 5)
+    cache.get("triangle", 6)
+
+    stats = cache.stats()
+    assert stats["memory_evictions"] >= 1 and stats["disk_evictions"] >= 1
+    assert len(cache.memory) < 3
+    assert len(list(tmp_path.glob("*.htp"))) < 3
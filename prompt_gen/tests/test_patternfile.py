@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from harmonic_tess.mesh import generate_mesh
+from harmonic_tess.patternfile import (
+    library_path, open_pattern, parse_pattern, pattern_bytes, write_library, write_pattern,
+)
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+def test_pattern_round_trip(tmp_path, indexed):
+    mesh = generate_mesh("hexagon", 3)
+    faces = mesh.faces if indexed else None
+    header = dict(complexity=3, shape="hexagon", transformation="reflection", size=2.0)
+    write_pattern(tmp_path / "hexagon.htp", mesh.vertices, faces, **header)
+
+    for pattern in (parse_pattern(pattern_bytes(mesh.vertices, faces, **header)),
+                    open_pattern(tmp_path / "hexagon.htp")):
+        assert (pattern.complexity, pattern.shape, pattern.transformation, pattern.size) == (3, "hexagon",
+                                                                                            "reflection", 2.0)
+        np.testing.assert_array_equal(pattern.vertices, mesh.vertices.astype(np.float32))
+        if indexed:
+            np.testing.assert_array_equal(pattern.faces, mesh.faces)
+        else:
+            assert pattern.faces is None
+
+
+def test_parse_rejects_other_files():
+    with pytest.raises(ValueError, match="not a harmonic tessellation pattern file"):
+        parse_pattern(b"\0" * 64)
+
+
+def test_library_matches_generated_meshes(tmp_path):
+    written = write_library(tmp_path, shapes=["square"], max_complexity=3)
+    assert written == [library_path(tmp_path, "square", complexity) for complexity in (1, 2, 3)]
+    for complexity in (1, 2, 3):
+        pattern = open_pattern(library_path(tmp_path, "square", complexity))
+        mesh = generate_mesh("square", complexity)
+        np.testing.assert_allclose(pattern.vertices, mesh.vertices, atol=1e-6)
+        np.testing.assert_array_equal(pattern.faces, mesh.faces)
@@ -0,0 +1,62 @@
+import pytest
+
+from harmonic_tess.prompt import DEDUPE_MIN_TOKENS, FromFile, PromptBuilder, estimate_tokens, truncate_to_tokens
+
+LARGE = "previous response line\n" * DEDUPE_MIN_TOKENS
+
+
+def builder(tmp_path, **kwargs):
+    (tmp_path / "previous.txt").write_text(LARGE)
+    elements = {
+        "TASK_CONTEXT": "You build tessellations.",
+        "INPUT_DATA": FromFile("previous.txt"),
+        "EXAMPLES": "example " * 400,
+        "TASK_DESCRIPTION": "Here is the previous response:\n{INPUT_DATA}\nRefine it.",
+        "IMMEDIATE_TASK": "Refine the response.",
+    }
+    return PromptBuilder(elements, prefill="<refined>", base_dir=tmp_path, cache_prefix=False, **kwargs)
+
+
+def test_spliced_element_is_sent_once_inline(tmp_path):
+    prompt = builder(tmp_path).build()
+    assert prompt.count(LARGE) == 1
+    assert "Here is the previous response:\n" + LARGE in prompt
+
+    assert builder(tmp_path, dedupe=False).build().count(LARGE) == 2
+
+
+def test_identical_large_elements_are_deduplicated(tmp_path):
+    elements = {"TASK_CONTEXT": LARGE, "PRECOGNITION": LARGE, "IMMEDIATE_TASK": "go", "TASK_DESCRIPTION": "do"}
+    built = PromptBuilder(elements, base_dir=tmp_path)
+    assert (built.prompt_prefix + built.build()).count(LARGE) == 1
+
+
+def test_budget_truncates_lowest_priority_first(tmp_path):
+    unlimited = builder(tmp_path)
+    total = unlimited.token_report()["TOTAL"]
+    fitted = builder(tmp_path, max_input_tokens=total - 100)
+
+    report = fitted.token_report()
+    assert report["TOTAL"] <= total - 100
+    assert list(fitted.truncated) == ["EXAMPLES"]
+    assert report["TASK_DESCRIPTION"] == unlimited.token_report()["TASK_DESCRIPTION"]
+
+
+def test_spliced_element_shrinks_where_it_is_sent(tmp_path):
+    small = builder(tmp_path, max_input_tokens=estimate_tokens(LARGE) // 2)
+    prompt = small.build()
+    assert "INPUT_DATA" in small.truncated
+    assert "Here is the previous response:\n" in prompt and "truncated" in prompt
+    assert small.token_report()["TOTAL"] <= estimate_tokens(LARGE) // 2
+
+
+def test_unreachable_budget_raises(tmp_path):
+    with pytest.raises(ValueError, match="max_input_tokens=5"):
+        builder(tmp_path, max_input_tokens=5).build()
+
+
+def test_truncate_to_tokens_marks_the_cut():
+    assert truncate_to_tokens("short", 10) == "short"
+    assert truncate_to_tokens("x" * 100, 0) == ""
+    cut = truncate_to_tokens("x" * 100, 10)
+    assert cut.startswith("x" * 40) and cut.endswith("[... truncated 15 tokens ...]")
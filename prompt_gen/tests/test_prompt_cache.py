@@ -0,0 +1,33 @@
+from harmonic_tess.client import build_request, request_tokens
+from harmonic_tess.prompt import PromptBuilder
+
+PARAMS = dict(model="claude-3-haiku-20240307", system_prompt="system", prompt="the task", prefill="<answer>",
+              max_tokens=100, token_budget=400, temperature=0.0)
+
+
+def test_static_elements_form_the_cacheable_prefix(tmp_path):
+    elements = {"TASK_CONTEXT": "context", "EXAMPLES": "examples", "INPUT_DATA": "input",
+                "TASK_DESCRIPTION": "describe", "IMMEDIATE_TASK": "now"}
+    builder = PromptBuilder(elements, base_dir=tmp_path)
+    assert builder.prompt_prefix == "context\n\nexamples"
+    assert builder.build() == "input\n\ndescribe\n\nnow"
+
+    uncached = PromptBuilder(elements, base_dir=tmp_path, cache_prefix=False)
+    assert uncached.prompt_prefix == ""
+    assert uncached.build() == "context\n\ninput\n\nexamples\n\ndescribe\n\nnow"
+
+
+def test_prefix_is_sent_first_with_a_cache_breakpoint():
+    request = build_request(dict(PARAMS, prompt_prefix="static"))
+    content = request["messages"][0]["content"]
+    assert content == [
+        {"type": "text", "text": "static", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "the task"},
+    ]
+    assert request_tokens(request) > request_tokens(build_request(PARAMS))
+
+
+def test_no_prefix_sends_plain_text():
+    request = build_request(dict(PARAMS, prompt_prefix=""))
+    assert request["messages"][0]["content"] == "the task"
+    assert request["messages"][1] == {"role": "assistant", "content": "<answer>"}
@@ -0,0 +1,97 @@
+import pytest
+
+from harmonic_tess.fake_server import FakeAnthropicServer
+from harmonic_tess.ratelimit import RequestScheduler, call_with_retries
+
+anthropic = pytest.importorskip("anthropic")
+
+REQUEST = dict(model="claude-3-haiku-20240307", max_tokens=16,
+               messages=[{"role": "user", "content": "hello"}])
+
+
+class FakeClock:
+    """A clock whose sleeps advance it instantly and are recorded, per caller."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = {"scheduler": [], "retry": []}
+
+    def __call__(self):
+        return self.now
+
+    def sleeper(self, name):
+        def sleep(seconds):
+            self.sleeps[name].append(seconds)
+            self.now += seconds
+        return sleep
+
+
+def test_pause_holds_calls_for_exactly_retry_after():
+    clock = FakeClock()
+    scheduler = RequestScheduler(requests_per_minute=50, clock=clock, sleep=clock.sleeper("scheduler"))
+    scheduler.pause(0.2)
+    scheduler.acquire(10)
+    assert clock.sleeps["scheduler"] == [pytest.approx(0.2)]
+    # the pause does not use up the request budget
+    scheduler.acquire(10)
+    assert len(clock.sleeps["scheduler"]) == 1
+
+
+def test_request_rate_is_enforced():
+    clock = FakeClock()
+    scheduler = RequestScheduler(requests_per_minute=60, clock=clock, sleep=clock.sleeper("scheduler"))
+    for _ in range(61):
+        scheduler.acquire(1)
+    # the bucket starts full; the 61st call waits for one request's worth of refill
+    assert clock.sleeps["scheduler"] == [pytest.approx(1.0)]
+
+
+def send_through(server, streaming):
+    client = anthropic.Anthropic(base_url=server.base_url, api_key="fake", max_retries=0)
+
+    def send():
+        if not streaming:
+            return client.messages.create(**REQUEST)
+        with client.messages.stream(**REQUEST) as stream:
+            text = "".join(stream.text_stream)
+            assert text == stream.get_final_message().content[0].text
+            return stream.get_final_message()
+
+    return send
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_retry_after_is_slept_exactly(streaming):
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleeper("scheduler"))
+    with FakeAnthropicServer([429, 429, 200], text="fake completion", retry_after=30) as server:
+        message = call_with_retries(send_through(server, streaming), scheduler, tokens=10, base_delay=0.01,
+                                    max_delay=0.05, sleep=clock.sleeper("retry"))
+
+    assert message.content[0].text == "fake completion"
+    assert [status for _, status in server.requests] == [429, 429, 200]
+    assert clock.sleeps["retry"] == [30.0, 30.0]
+    # the retry sleep covers the scheduler pause, so the next call is admitted straight away
+    assert clock.sleeps["scheduler"] == []
+
+
+def test_overloaded_is_retried_with_bounded_backoff():
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleeper("scheduler"))
+    with FakeAnthropicServer([529, 529, 200]) as server:
+        call_with_retries(send_through(server, False), scheduler, tokens=10, base_delay=0.01, max_delay=0.05,
+                          sleep=clock.sleeper("retry"))
+
+    assert [status for _, status in server.requests] == [529, 529, 200]
+    assert len(clock.sleeps["retry"]) == 2
+    assert all(0 <= delay <= 0.05 for delay in clock.sleeps["retry"])
+
+
+def test_non_retryable_errors_are_raised():
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleeper("scheduler"))
+    with FakeAnthropicServer([400]) as server:
+        with pytest.raises(anthropic.BadRequestError):
+            call_with_retries(send_through(server, False), scheduler, tokens=10, sleep=clock.sleeper("retry"))
+    assert len(server.requests) == 1
+    assert clock.sleeps["retry"] == []
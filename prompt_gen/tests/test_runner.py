@@ -0,0 +1,61 @@
+import json
+
+from harmonic_tess import runner
+from harmonic_tess.prompt import FromFile
+
+
+def record_runs(monkeypatch):
+    calls = []
+
+    def fake_run_stage(stage, overrides=None, output_path=None, **kwargs):
+        calls.append((stage.name, output_path, overrides))
+        return f"{stage.name} -> {output_path}"
+
+    monkeypatch.setattr(runner, "run_stage", fake_run_stage)
+    return calls
+
+
+def test_variant_output_path():
+    assert runner.variant_output_path("out/result.txt", None) == "out/result.txt"
+    assert runner.variant_output_path("out/result.txt", "a") == "out/result.a.txt"
+
+
+def test_dependencies_follow_stage_outputs():
+    dependencies = runner.stage_dependencies([runner.get_stage(name) for name in runner.STAGE_NAMES])
+    assert dependencies == {"part1": set(), "part2": {"part1"}, "part3": set()}
+
+
+def test_variant_output_feeds_dependent_stage(monkeypatch):
+    calls = record_runs(monkeypatch)
+    results = runner.run_pipeline(["part1", "part2"], variants={"part1": [("a", {"INPUT_DATA": "short"})]},
+                                  max_workers=1)
+
+    assert set(results) == {("part1", "a"), ("part2", None), ("part2", "a")}
+    # part1 finishes before anything downstream starts
+    assert [name for name, _, _ in calls][0] == "part1"
+    overrides = {output: overrides for name, output, overrides in calls if name == "part2"}
+    assert overrides["harmonic_tessellation_refined.a.txt"] == {
+        "INPUT_DATA": FromFile("harmonic_tessellation.a.txt"),
+    }
+    assert overrides["harmonic_tessellation_refined.txt"] is None
+
+
+def test_explicit_override_wins_over_upstream_output(monkeypatch):
+    calls = record_runs(monkeypatch)
+    runner.run_pipeline(["part1", "part2"], max_workers=1, variants={
+        "part1": [("a", {})],
+        "part2": [("a", {"INPUT_DATA": "hand written"})],
+    })
+    (overrides,) = [overrides for name, output, overrides in calls if name == "part2"]
+    assert overrides == {"INPUT_DATA": "hand written"}
+
+
+def test_main_reads_variants_file(monkeypatch, tmp_path, capsys):
+    calls = record_runs(monkeypatch)
+    variants = tmp_path / "variants.jsonl"
+    variant = {"variant_id": "b", "stage": "part1", "overrides": {"INPUT_DATA": {"path": "x.md"}}}
+    variants.write_text(json.dumps(variant))
+    runner.main(["part1", "part2", "--variants", str(variants), "--max-workers", "1"])
+
+    assert ("part1", "harmonic_tessellation.b.txt", {"INPUT_DATA": FromFile("x.md")}) in calls
+    assert "part2 [b]:" in capsys.readouterr().out
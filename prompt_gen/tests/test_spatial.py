@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from harmonic_tess.mesh import generate_mesh
+from harmonic_tess.patternfile import library_path, open_pattern, write_library
+from harmonic_tess.spatial import SpatialGrid, grid_bytes, grid_path, open_grid, parse_grid
+
+
+@pytest.fixture(params=["triangle", "hexagon"])
+def mesh(request):
+    return generate_mesh(request.param, 5)
+
+
+@pytest.fixture
+def points(mesh):
+    low, high = mesh.vertices.min(axis=0), mesh.vertices.max(axis=0)
+    # include points outside the pattern's box
+    return np.random.default_rng(7).uniform(low - 0.2, high + 0.2, size=(200, 2))
+
+
+def brute_distances(vertices, point):
+    return np.hypot(*(vertices.astype(np.float32) - np.asarray(point, dtype=np.float32)).T)
+
+
+def test_nearest_matches_brute_force(mesh, points):
+    grid = SpatialGrid.build(mesh.vertices, mesh.faces)
+    for point in points:
+        indices, distances = grid.nearest(point, k=4)
+        expected = np.sort(brute_distances(mesh.vertices, point))[:4]
+        np.testing.assert_allclose(distances, expected, rtol=1e-6)
+        np.testing.assert_allclose(brute_distances(mesh.vertices[indices], point), distances, rtol=1e-6)
+
+
+def test_within_matches_brute_force(mesh, points):
+    grid = SpatialGrid.build(mesh.vertices, mesh.faces)
+    for point in points[:50]:
+        indices, distances = grid.within(point, 0.15)
+        expected = np.flatnonzero(brute_distances(mesh.vertices, point) <= 0.15)
+        assert sorted(indices.tolist()) == sorted(expected.tolist())
+        assert np.all(np.diff(distances) >= 0)
+
+
+def test_face_at_finds_a_containing_face(mesh, points):
+    grid = SpatialGrid.build(mesh.vertices, mesh.faces)
+    centroids = mesh.vertices[mesh.faces].mean(axis=1)
+    for face, centroid in list(enumerate(centroids))[::17]:
+        assert grid.face_at(centroid) == face
+    far = mesh.vertices.max(axis=0) + 10
+    assert grid.face_at(far) == -1
+
+
+def test_grid_file_round_trip(tmp_path):
+    write_library(tmp_path, shapes=["square"], max_complexity=4, spatial=True)
+    path = library_path(tmp_path, "square", 4)
+    pattern = open_pattern(path)
+    grid = open_grid(grid_path(path), pattern)
+    built = SpatialGrid.build(pattern.vertices, pattern.faces)
+    assert grid_bytes(grid) == grid_bytes(built)
+    assert grid.nearest([0.1, 0.2], k=3)[0].tolist() == built.nearest([0.1, 0.2], k=3)[0].tolist()
+
+    with pytest.raises(ValueError, match="grid indexes"):
+        parse_grid(grid_bytes(built), pattern.vertices[:-1], pattern.faces)
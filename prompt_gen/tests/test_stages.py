@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import pytest
+
+from harmonic_tess.prompt import FromFile, PromptBuilder
+from harmonic_tess.stages import STAGE_NAMES, get_stage
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize("name", STAGE_NAMES)
+def test_stages_are_registered_under_their_names(name):
+    stage = get_stage(name)
+    assert stage.name == name
+    assert stage.output_path and stage.system_prompt is not None
+    assert "TASK_DESCRIPTION" in stage.elements
+
+
+def test_unknown_stage():
+    with pytest.raises(KeyError, match="unknown stage 'part4'"):
+        get_stage("part4")
+
+
+@pytest.mark.parametrize("name", STAGE_NAMES)
+def test_stage_prompts_build_from_the_shipped_files(name):
+    stage = get_stage(name)
+    sources = list(stage.elements.values()) + [stage.prefill]
+    missing = [source.path for source in sources if isinstance(source, FromFile)
+               and not (BASE_DIR / source.path).exists()]
+    if missing:
+        pytest.skip(f"input files not in this checkout: {', '.join(missing)}")
+    builder = PromptBuilder.for_stage(stage, base_dir=BASE_DIR)
+    prompt = builder.prompt_prefix + builder.build()
+    assert "{" + "INPUT_DATA" + "}" not in prompt
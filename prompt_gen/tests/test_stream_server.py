@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import numpy as np
+
+from harmonic_tess import stream_server
+from harmonic_tess.pattern_cache import PatternCache
+from harmonic_tess.transform import apply
+
+
+async def fetch(server, request: bytes) -> tuple:
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(request)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    head, _, body = data.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), body
+
+
+def serve(cache, *requests) -> list:
+    async def run():
+        server = await stream_server.StreamServer(port=0, cache=cache).start()
+        try:
+            return [await fetch(server, request) for request in requests]
+        finally:
+            await server.stop()
+
+    return asyncio.run(run())
+
+
+def unchunk(body: bytes) -> list:
+    chunks = []
+    while True:
+        size, _, body = body.partition(b"\r\n")
+        size = int(size, 16)
+        if not size:
+            return chunks
+        chunks.append(body[:size])
+        body = body[size + 2:]
+
+
+def test_stream_starts_with_the_pattern_then_a_keyframe(tmp_path):
+    [(status, body)] = serve(PatternCache(tmp_path),
+                             b"GET /stream?shape=square&complexity=2&fps=60&frames=3 HTTP/1.1\r\n\r\n")
+    assert status == 200
+    messages = [stream_server.decode_message(chunk) for chunk in unchunk(body)]
+    assert [message["kind"] for message in messages] == [
+        stream_server.KIND_PATTERN, stream_server.KIND_KEYFRAME, stream_server.KIND_TRANSFORM,
+        stream_server.KIND_TRANSFORM]
+
+
+def test_errors_get_a_response(tmp_path):
+    class BrokenCache:
+        def get(self, *args):
+            raise RuntimeError("disk on fire")
+
+    responses = serve(BrokenCache(),
+                      b"GET /nowhere HTTP/1.1\r\n\r\n",
+                      b"GET /stream?complexity=99 HTTP/1.1\r\n\r\n",
+                      b"nonsense\r\n\r\n",
+                      b"GET /stream?shape=square&complexity=2 HTTP/1.1\r\n\r\n")
+    assert [status for status, _ in responses] == [404, 400, 400, 500]
+    assert "disk on fire" in json.loads(responses[-1][1])["error"]
+
+
+def test_frame_source_computes_vertices_on_demand(tmp_path):
+    source = stream_server.FrameSource(PatternCache(tmp_path), "square", 2, "rotation", 1.0)
+    assert not hasattr(source, "frames")
+    index = source.frame_count + 5
+    np.testing.assert_allclose(source.vertices(index), apply(source.mesh.vertices, source.matrices[5]))
@@ -0,0 +1,50 @@
+import pytest
+
+from harmonic_tess import metrics, pipeline
+from harmonic_tess.manifest import StageManifest
+from harmonic_tess.prompt import Stage
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def stage(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "get_metrics", lambda: None)
+    return Stage("test", {"TASK_DESCRIPTION": "write", "IMMEDIATE_TASK": "now"}, output_path="output.txt")
+
+
+def partial_files(tmp_path):
+    return list((tmp_path / ".stage_outputs").glob("*.partial"))
+
+
+def test_interrupted_stream_resumes_from_the_partial_file(tmp_path, stage, monkeypatch):
+    seen = []
+
+    def interrupted(prompt, resume_text="", **kwargs):
+        seen.append(resume_text)
+        yield "alpha "
+        # the partial file is written as chunks arrive, not at the end
+        assert partial_files(tmp_path)[0].read_text() == "alpha "
+        yield "beta \n"
+        raise Interrupted()
+
+    monkeypatch.setattr(pipeline, "stream_completion", interrupted)
+    with pytest.raises(Interrupted):
+        pipeline.run_stage(stage, base_dir=tmp_path, stream=True, echo=False)
+    assert not (tmp_path / "output.txt").exists()
+
+    def resumed(prompt, resume_text="", **kwargs):
+        seen.append(resume_text)
+        yield " gamma"
+
+    monkeypatch.setattr(pipeline, "stream_completion", resumed)
+    completion = pipeline.run_stage(stage, base_dir=tmp_path, stream=True, echo=False)
+
+    # trailing whitespace is dropped from the partial text, since the continuation writes it again
+    assert seen == ["", "alpha beta"]
+    assert completion == "alpha beta gamma"
+    assert (tmp_path / "output.txt").read_text() == "alpha beta gamma"
+    assert partial_files(tmp_path) == []
+    assert StageManifest(tmp_path).entry(tmp_path / "output.txt")["output_sha"]
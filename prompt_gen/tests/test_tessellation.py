@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from harmonic_tess.mesh import Mesh
+from harmonic_tess.tessellation import BASE_SHAPES, base_triangles, generate_pattern, subdivide, vertex_list
+
+
+def subdivide_loop(triangles):
+    """`PatternManager.subdivideTriangle`, one triangle at a time."""
+    result = []
+    for p1, p2, p3 in triangles.tolist():
+        m1, m2, m3 = [[(a[0] + b[0]) / 2, (a[1] + b[1]) / 2] for a, b in ((p1, p2), (p2, p3), (p3, p1))]
+        result.extend([[p1, m1, m3], [m1, p2, m2], [m3, m2, p3], [m1, m2, m3]])
+    return np.asarray(result, dtype=np.float32)
+
+
+@pytest.mark.parametrize("shape", BASE_SHAPES)
+def test_subdivision_matches_the_client_order(shape):
+    triangles = base_triangles(shape)
+    for _ in range(3):
+        np.testing.assert_array_equal(subdivide(triangles), subdivide_loop(triangles))
+        triangles = subdivide(triangles)
+    assert len(generate_pattern(shape, 4)) == len(base_triangles(shape)) * 4 ** 3
+    assert vertex_list(triangles).shape == (len(triangles) * 3, 2)
+
+
+def test_hexagon_seam_is_welded():
+    # a fan of six triangles subdivided into k x k rows each has 1 + 3k(k + 1) distinct points
+    for complexity in (1, 4, 8):
+        k = 2 ** (complexity - 1)
+        assert len(Mesh.from_triangles(generate_pattern("hexagon", complexity)).vertices) == 1 + 3 * k * (k + 1)
+
+
+def test_rejects_bad_arguments():
+    with pytest.raises(ValueError, match="unknown base shape"):
+        base_triangles("pentagon")
+    with pytest.raises(ValueError, match="at least 1"):
+        generate_pattern("triangle", 0)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from harmonic_tess.transform import (
+    apply, apply_batch, client_transformation, compose, reflection, rotation, rotation_frames, scale, translation,
+)
+
+POINTS = np.array([[1.0, 0.0], [0.0, 2.0], [-3.0, 1.5]], dtype=np.float32)
+
+
+def test_compose_applies_in_the_order_given():
+    matrix = compose(scale(2.0), translation(1.0, 0.0))
+    np.testing.assert_allclose(apply(POINTS, matrix), POINTS * 2 + [1.0, 0.0])
+    np.testing.assert_allclose(apply(POINTS, rotation(np.pi / 2)), np.stack([-POINTS[:, 1], POINTS[:, 0]], axis=1),
+                               atol=1e-6)
+
+
+def test_rotation_frames_match_single_rotations():
+    matrices = rotation_frames(10, fps=30, angular_velocity=1.5, before=reflection())
+    block = apply_batch(POINTS, matrices)
+    for index in range(10):
+        expected = apply(POINTS, compose(reflection(), rotation(index / 30 * 1.5)))
+        np.testing.assert_allclose(block[index], expected, atol=1e-6)
+
+
+def test_client_transformations():
+    np.testing.assert_allclose(apply(POINTS, client_transformation("reflection")), POINTS * [-1, 1])
+    np.testing.assert_allclose(apply(POINTS, client_transformation("none")), POINTS)
+    with pytest.raises(ValueError, match="unknown transformation"):
+        client_transformation("shear")